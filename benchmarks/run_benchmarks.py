@@ -0,0 +1,490 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+Name                 : Benchmarks
+Description          : Times the barcode encoders, SVG writers and layout
+                       items and compares the results against a baseline.
+Date                 : 17-10-2026
+copyright            : (C) 2026 by John Gitau
+email                : gkahiu@gmail.com
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 3 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+import argparse
+import fnmatch
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import timeit
+
+# Run from a checkout without installing the plugin. The vendored
+# libraries are imported from the extlibs folder, rather than through the
+# plugin package which requires QGIS, so that the encoder suites can run
+# with any Python interpreter.
+_ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(_ROOT_DIR, 'qrbarcodeitem', 'extlibs'))
+sys.path.insert(1, _ROOT_DIR)
+
+# pylint: disable=wrong-import-position
+import barcode
+import segno
+from barcode.writer import (
+    CompactSVGWriter,
+    SVGWriter
+)
+
+DEF_BASELINE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    'baseline.json'
+)
+
+# Payload of the QR codes, repeated to fill the version
+QR_DATA = 'https://example.org/qr?id=12345'
+MICRO_QR_DATA = '12345'
+MICRO_ERROR_LEVELS = {
+    'M1': (None,),
+    'M2': ('L', 'M'),
+    'M3': ('L', 'M'),
+    'M4': ('L', 'M', 'Q')
+}
+
+# Lengths of the values of linear barcodes with variable length
+LINEAR_LENGTHS = (8, 32, 128)
+_DIGITS = '0123456789' * 13
+_TEXT = 'QRBARCODE-ITEM-' * 9
+
+# Value factories for each linear barcode type, aliases are excluded
+LINEAR_VALUES = {
+    'ean8': lambda _: _DIGITS[:7],
+    'ean13': lambda _: _DIGITS[:12],
+    'ean14': lambda _: _DIGITS[:13],
+    'jan': lambda _: '45' + _DIGITS[:10],
+    'upca': lambda _: _DIGITS[:11],
+    'isbn13': lambda _: '978' + _DIGITS[:9],
+    'isbn10': lambda _: _DIGITS[:9],
+    'issn': lambda _: _DIGITS[:7],
+    'pzn': lambda _: _DIGITS[:6],
+    'code39': lambda n: _TEXT[:n],
+    'code128': lambda n: _TEXT.lower()[:n],
+    'itf': lambda n: _DIGITS[:n],
+    'gs1_128': lambda n: _DIGITS[:n]
+}
+VARIABLE_LENGTH_TYPES = ('code39', 'code128', 'itf', 'gs1_128')
+
+
+def qr_data(version, error):
+    """
+    :return: Returns the data, in byte mode, that fills a QR code of the
+    given version and error level.
+    :rtype: str
+    """
+    capacity = segno.consts.SYMBOL_CAPACITY[version][
+        segno.consts.ERROR_MAPPING[error]
+    ]
+    # Mode indicator and character count bits
+    overhead = 4 + (8 if version < 10 else 16)
+    length = (capacity - overhead) // 8
+
+    return (QR_DATA * (length // len(QR_DATA) + 1))[:length]
+
+
+def segno_cases():
+    """
+    :return: Returns benchmarks of QR code encoding for all versions and
+    error levels.
+    :rtype: generator
+    """
+    for version in range(1, 41):
+        for error in ('L', 'M', 'Q', 'H'):
+            yield (
+                f'segno.make/{version}-{error}',
+                lambda v=version, e=error, d=qr_data(version, error):
+                segno.make(d, version=v, error=e, boost_error=False)
+            )
+    for version, errors in MICRO_ERROR_LEVELS.items():
+        for error in errors:
+            yield (
+                f'segno.make/{version}-{error or "-"}',
+                lambda v=version, e=error: segno.make(
+                    MICRO_QR_DATA,
+                    version=v,
+                    error=e,
+                    boost_error=False
+                )
+            )
+    for version in (1, 10, 40):
+        yield (
+            f'segno.plan_capacity/{version}',
+            lambda d=qr_data(version, 'L'): segno.plan_capacity(d)
+        )
+
+
+def barcode_cases():
+    """
+    :return: Returns benchmarks of linear barcode encoding for each type
+    and, for types with variable length, different input lengths.
+    :rtype: generator
+    """
+    for barcode_type, value_factory in LINEAR_VALUES.items():
+        lengths = LINEAR_LENGTHS \
+            if barcode_type in VARIABLE_LENGTH_TYPES else (None,)
+        for length in lengths:
+            value = value_factory(length)
+            name = f'barcode.get/{barcode_type}'
+            if length is not None:
+                name = f'{name}-{length}'
+            yield (
+                name,
+                lambda t=barcode_type, v=value: barcode.get(t, v).build()
+            )
+
+
+def writer_cases():
+    """
+    :return: Returns benchmarks of the SVG writers of linear barcodes and
+    QR codes.
+    :rtype: generator
+    """
+    options = {
+        'quiet_zone': 1.5,
+        'font_size': 4,
+        'background': '#FFFFFF',
+        'foreground': '#000000'
+    }
+    for length in LINEAR_LENGTHS:
+        value = _TEXT.lower()[:length]
+        for writer_cls in (SVGWriter, CompactSVGWriter):
+            yield (
+                f'writer/{writer_cls.__name__}-code128-{length}',
+                lambda w=writer_cls, v=value: barcode.get(
+                    'code128',
+                    v,
+                    writer=w()
+                ).render(dict(options))
+            )
+
+    for version in (1, 10, 25, 40):
+        qr = segno.make(qr_data(version, 'M'), version=version, error='M')
+        yield (
+            f'writer/segno-svg-{version}',
+            lambda q=qr: q.save(
+                io.BytesIO(),
+                kind='svg',
+                scale=10,
+                border=1,
+                xmldecl=False,
+                svgns=False,
+                nl=False
+            )
+        )
+        yield (
+            f'writer/segno-svg-multicolor-{version}',
+            lambda q=qr: q.save(
+                io.BytesIO(),
+                kind='svg',
+                finder_dark='#0000FF',
+                data_light='#FFFF00'
+            )
+        )
+
+
+def item_cases():
+    """
+    :return: Returns end-to-end benchmarks of generating the barcodes of
+    layout items in a headless QGIS application, none if QGIS is not
+    available.
+    :rtype: generator
+    """
+    try:
+        # pylint: disable=import-outside-toplevel
+        from qgis.core import (
+            QgsApplication,
+            QgsPrintLayout,
+            QgsProject
+        )
+        from qrbarcodeitem.layout.abstract_barcode import (
+            RENDER_MODE_PAINTER,
+            RENDER_MODE_SVG
+        )
+        from qrbarcodeitem.layout.barcode_painter import BarcodeShapeCache
+        from qrbarcodeitem.layout.linear_barcode_item import \
+            LinearBarcodeLayoutItem
+        from qrbarcodeitem.layout.linear_metadata import \
+            register_linear_barcode_metadata
+        from qrbarcodeitem.layout.qrcode_item import QrCodeLayoutItem
+        from qrbarcodeitem.layout.svg_cache import SvgCache
+    except ImportError:
+        print('QGIS not found, skipping layout item benchmarks.',
+              file=sys.stderr)
+        return
+
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    if QgsApplication.instance() is None:
+        app = QgsApplication([], False)
+        app.initQgis()
+        # Keep a reference to the application
+        item_cases.app = app
+    register_linear_barcode_metadata()
+
+    layout = QgsPrintLayout(QgsProject.instance())
+    layout.initializeDefaults()
+
+    def generate(item):
+        # New value for each call so that the caches are not used
+        generate.count += 1
+        SvgCache.instance().clear()
+        BarcodeShapeCache.instance().clear()
+        item.generate_code(f'QRBARCODE {generate.count}')
+    generate.count = 0
+
+    for item_cls in (QrCodeLayoutItem, LinearBarcodeLayoutItem):
+        for render_mode in (RENDER_MODE_SVG, RENDER_MODE_PAINTER):
+            for in_memory in (True, False):
+                if render_mode == RENDER_MODE_PAINTER and not in_memory:
+                    continue
+                item = item_cls(layout)
+                item.in_memory = in_memory
+                item.render_mode = render_mode
+                if in_memory and not item.in_memory:
+                    continue
+                storage = 'memory' if in_memory else 'file'
+                yield (
+                    f'item/{item_cls.__name__}-{render_mode}-{storage}',
+                    lambda i=item: generate(i)
+                )
+
+
+SUITES = {
+    'segno': segno_cases,
+    'barcode': barcode_cases,
+    'writer': writer_cases,
+    'item': item_cases
+}
+
+
+def time_case(func, repeat, min_time):
+    """
+    Times a benchmark function.
+    :param func: Function to time.
+    :type func: callable
+    :param repeat: Number of timing runs.
+    :type repeat: int
+    :param min_time: Minimum duration, in seconds, of each run. The number
+    of calls in a run is increased until it takes at least this long.
+    :type min_time: float
+    :return: Returns the minimum, median and standard deviation of the
+    time, in seconds, per call and the number of calls per run.
+    :rtype: dict
+    """
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        if timer.timeit(number) >= min_time:
+            break
+        number *= 2
+    runs = [t / number for t in timer.repeat(repeat, number)]
+
+    return {
+        'min': min(runs),
+        'median': statistics.median(runs),
+        'stdev': statistics.stdev(runs) if len(runs) > 1 else 0.0,
+        'number': number
+    }
+
+
+def run(suites, pattern=None, repeat=5, min_time=0.05):
+    """
+    Runs the benchmarks.
+    :param suites: Names of the suites to run.
+    :type suites: list
+    :param pattern: Shell-style pattern for filtering benchmarks by name.
+    :type pattern: str
+    :param repeat: Number of timing runs of each benchmark.
+    :type repeat: int
+    :param min_time: Minimum duration, in seconds, of each run.
+    :type min_time: float
+    :return: Returns the results, keyed by benchmark name.
+    :rtype: dict
+    """
+    results = {}
+    for suite in suites:
+        for name, func in SUITES[suite]():
+            if pattern and not fnmatch.fnmatch(name, pattern):
+                continue
+            results[name] = time_case(func, repeat, min_time)
+            print(
+                f'{name:<50}{results[name]["min"] * 1e6:>12.1f} us',
+                file=sys.stderr
+            )
+
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compares the results with those of the baseline.
+    :param results: Results of the current run.
+    :type results: dict
+    :param baseline: Results of the baseline run.
+    :type baseline: dict
+    :param tolerance: Maximum allowed slowdown as a fraction of the
+    baseline time e.g. 0.25 for 25%.
+    :type tolerance: float
+    :return: Returns a list of (name, baseline time, current time, ratio)
+    tuples of the benchmarks that are slower than allowed.
+    :rtype: list
+    """
+    regressions = []
+    for name, result in results.items():
+        base_result = baseline.get(name, None)
+        if base_result is None or base_result['min'] <= 0:
+            continue
+        ratio = result['min'] / base_result['min']
+        if ratio > 1 + tolerance:
+            regressions.append(
+                (name, base_result['min'], result['min'], ratio)
+            )
+
+    return regressions
+
+
+def _metadata():
+    # Describes the environment of the benchmark run.
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'numpy': segno.encoder.USE_NUMPY
+    }
+
+
+def parse_args(argv=None):
+    """
+    Parses the command-line arguments.
+    :param argv: Arguments excluding the program name.
+    :type argv: list
+    :return: Returns the parsed arguments.
+    :rtype: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(
+        description='Runs the benchmarks of the barcode encoders, SVG '
+                    'writers and layout items.'
+    )
+    parser.add_argument(
+        '--suite',
+        action='append',
+        choices=list(SUITES),
+        help='Suite to run, can be repeated (default: all).'
+    )
+    parser.add_argument(
+        '--filter',
+        default=None,
+        help='Shell-style pattern of the benchmark names to run.'
+    )
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument(
+        '--min-time',
+        type=float,
+        default=0.05,
+        help='Minimum duration, in seconds, of each timing run.'
+    )
+    parser.add_argument(
+        '--output',
+        default=None,
+        help='Path of the JSON file for the results (default: stdout).'
+    )
+    parser.add_argument(
+        '--baseline',
+        default=DEF_BASELINE,
+        help='JSON file of the results to compare against.'
+    )
+    parser.add_argument(
+        '--save-baseline',
+        action='store_true',
+        help='Save the results as the new baseline instead of comparing.'
+    )
+    parser.add_argument(
+        '--no-compare',
+        action='store_true',
+        help='Only write the results without comparing them with the '
+             'baseline.'
+    )
+    parser.add_argument(
+        '--tolerance',
+        type=float,
+        default=0.25,
+        help='Allowed slowdown relative to the baseline (default: 0.25).'
+    )
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Runs the benchmarks, writes the results and compares them with the
+    baseline. Timings depend on the machine hence the baseline is not
+    committed, it has to be saved on the machine running the comparison.
+    :return: Returns 1 if there are regressions, 2 if there is no baseline
+    to compare against, else 0.
+    :rtype: int
+    """
+    args = parse_args(argv)
+    suites = args.suite or list(SUITES)
+    output = {
+        'metadata': _metadata(),
+        'results': run(suites, args.filter, args.repeat, args.min_time)
+    }
+    content = json.dumps(output, indent=2, sort_keys=True)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as baseline_file:
+            baseline_file.write(content)
+        print(f'Baseline saved to {args.baseline}', file=sys.stderr)
+        return 0
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            output_file.write(content)
+    else:
+        print(content)
+
+    if args.no_compare:
+        return 0
+    if not os.path.exists(args.baseline):
+        # Fail rather than report success without detecting regressions
+        print(
+            f'ERROR: No baseline found at {args.baseline}, run with '
+            '--save-baseline on this machine to create one or use '
+            '--no-compare.',
+            file=sys.stderr
+        )
+        return 2
+
+    with open(args.baseline, encoding='utf-8') as baseline_file:
+        baseline = json.load(baseline_file)['results']
+    regressions = compare(output['results'], baseline, args.tolerance)
+    for name, base_time, cur_time, ratio in regressions:
+        print(
+            f'REGRESSION {name}: {base_time * 1e6:.1f} us -> '
+            f'{cur_time * 1e6:.1f} us ({ratio:.2f}x)',
+            file=sys.stderr
+        )
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,473 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+Name                 : Layout export CLI
+Description          : Headless command-line tool for exporting layouts,
+                       and atlases, containing barcode items.
+Date                 : 17-10-2026
+copyright            : (C) 2026 by John Gitau
+email                : gkahiu@gmail.com
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 3 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from collections import namedtuple
+from contextlib import ExitStack
+
+from qgis.core import (
+    QgsApplication,
+    QgsLayoutExporter,
+    QgsProject
+)
+
+from qrbarcodeitem.layout.abstract_barcode import (
+    AbstractBarcodeLayoutItem,
+    RENDER_MODE_PAINTER,
+    RENDER_MODE_SVG
+)
+from qrbarcodeitem.layout.batch_renderer import prewarm_layout_atlas
+from qrbarcodeitem.layout.linear_metadata import \
+    register_linear_barcode_metadata
+from qrbarcodeitem.layout.preflight import preflight_layout
+from qrbarcodeitem.layout.registry import register_barcode_items
+from qrbarcodeitem.layout.svg_cache import SvgCache
+from qrbarcodeitem.layout.svg_tracker import SvgFileTracker
+
+FORMATS = ('pdf', 'svg', 'png')
+
+# Export time of a page, or atlas feature, and the resulting file.
+PageTiming = namedtuple(
+    'PageTiming',
+    ['page', 'seconds', 'status', 'path']
+)
+
+# Directory, format and resolution (None for that of the layout) of the
+# exported files.
+ExportOptions = namedtuple(
+    'ExportOptions',
+    ['output_dir', 'fmt', 'dpi']
+)
+
+
+class ExportError(Exception):
+    """Exception when a layout cannot be exported."""
+    pass
+
+
+def parse_args(argv=None):
+    """
+    Parses the command-line arguments.
+    :param argv: Arguments excluding the program name, defaults to
+    sys.argv.
+    :type argv: list
+    :return: Returns the parsed arguments.
+    :rtype: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m qrbarcodeitem.export_cli',
+        description='Exports a print layout, or its atlas, containing QR '
+                    'code and linear barcode items without the QGIS GUI.'
+    )
+    parser.add_argument('project', help='Path to the QGIS project file.')
+    parser.add_argument(
+        '--layout',
+        required=True,
+        help='Name of the print layout to export.'
+    )
+    parser.add_argument(
+        '--format',
+        choices=FORMATS,
+        default='pdf',
+        help='Output format (default: pdf).'
+    )
+    parser.add_argument(
+        '--output-dir',
+        default='.',
+        help='Directory for the exported files (default: current dir).'
+    )
+    parser.add_argument(
+        '--dpi',
+        type=float,
+        default=None,
+        help='Export resolution, defaults to that of the layout.'
+    )
+    parser.add_argument(
+        '--atlas',
+        action='store_true',
+        help='Export one file for each atlas feature.'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Number of processes exporting atlas features in parallel, 0 '
+             'to use all CPUs (default: 1).'
+    )
+    parser.add_argument(
+        '--render-mode',
+        choices=(RENDER_MODE_SVG, RENDER_MODE_PAINTER),
+        default=None,
+        help='Render mode of the barcode items, defaults to that saved in '
+             'the project.'
+    )
+    parser.add_argument(
+        '--prewarm',
+        action='store_true',
+        help='Generate the barcodes of all atlas features before exporting. '
+             'Cannot be used with more than one worker.'
+    )
+    parser.add_argument(
+        '--preflight',
+        action='store_true',
+        help='Validate the barcode values of all atlas features and abort '
+             'the export if any of them is invalid.'
+    )
+    # Range of atlas features exported by a worker process
+    parser.add_argument(
+        '--feature-range',
+        default=None,
+        help=argparse.SUPPRESS
+    )
+    args = parser.parse_args(argv)
+    if args.workers < 0:
+        parser.error('--workers cannot be negative')
+    if args.workers == 0:
+        args.workers = os.cpu_count() or 1
+    if args.prewarm and args.workers > 1:
+        parser.error('--prewarm cannot be used with more than one worker')
+
+    return args
+
+
+def start_application():
+    """
+    Starts a QGIS application without the GUI and registers the barcode
+    items and linear barcode metadata.
+    :return: Returns the initialized application.
+    :rtype: QgsApplication
+    """
+    # No display is required for rendering layouts
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    app = QgsApplication([], False)
+    app.initQgis()
+    register_barcode_items()
+    register_linear_barcode_metadata()
+
+    return app
+
+
+def load_layout(project_path, layout_name):
+    """
+    Loads the project and gets the layout with the given name.
+    :param project_path: Path to the QGIS project file.
+    :type project_path: str
+    :param layout_name: Name of the print layout.
+    :type layout_name: str
+    :return: Returns the print layout.
+    :rtype: QgsPrintLayout
+    """
+    project = QgsProject.instance()
+    if not project.read(project_path):
+        raise ExportError(
+            f'Unable to read project {project_path}: {project.error()}'
+        )
+
+    layout = project.layoutManager().layoutByName(layout_name)
+    if layout is None:
+        raise ExportError(f'Layout {layout_name} not found.')
+
+    return layout
+
+
+def set_render_mode(layout, render_mode):
+    """
+    Sets the render mode of all barcode items in the layout.
+    :param layout: Layout containing the barcode items.
+    :type layout: QgsLayout
+    :param render_mode: Either RENDER_MODE_SVG or RENDER_MODE_PAINTER.
+    :type render_mode: str
+    """
+    for item in layout.items():
+        if isinstance(item, AbstractBarcodeLayoutItem):
+            item.render_mode = render_mode
+
+
+def split_range(count, workers):
+    """
+    Splits a number of atlas features into contiguous ranges of similar
+    size.
+    :param count: Number of atlas features.
+    :type count: int
+    :param workers: Number of ranges.
+    :type workers: int
+    :return: Returns a list of (start, end) tuples, end is exclusive.
+    :rtype: list
+    """
+    workers = max(1, min(workers, count))
+    size, remainder = divmod(count, workers)
+    ranges = []
+    start = 0
+    for i in range(workers):
+        end = start + size + (1 if i < remainder else 0)
+        ranges.append((start, end))
+        start = end
+
+    return ranges
+
+
+def _parse_range(text, count):
+    # Returns the (start, end) range of the '--feature-range' argument.
+    try:
+        start, end = (int(v) for v in text.split(':'))
+    except ValueError as ve:
+        raise ExportError(f'Invalid feature range: {text}') from ve
+
+    return max(0, start), min(end, count)
+
+
+def _export_file(exporter, path, options):
+    # Exports the current state of the layout to a file.
+    if options.fmt == 'pdf':
+        settings = QgsLayoutExporter.PdfExportSettings()
+        export_func = exporter.exportToPdf
+    elif options.fmt == 'svg':
+        settings = QgsLayoutExporter.SvgExportSettings()
+        export_func = exporter.exportToSvg
+    else:
+        settings = QgsLayoutExporter.ImageExportSettings()
+        export_func = exporter.exportToImage
+    if options.dpi is not None:
+        settings.dpi = options.dpi
+
+    result = export_func(path, settings)
+    if result == QgsLayoutExporter.Success:
+        return 'ok'
+
+    return f'error:{int(result)}'
+
+
+def _timed_export(exporter, page, path, options):
+    # Exports the layout and measures the time taken.
+    start_time = time.perf_counter()
+    status = _export_file(exporter, path, options)
+    timing = PageTiming(page, time.perf_counter() - start_time, status, path)
+    # Tab-separated page number, seconds, status and path
+    print(
+        f'{page}\t{timing.seconds:.3f}\t{status}\t{path}',
+        flush=True
+    )
+
+    return timing
+
+
+def export_layout(layout, options):
+    """
+    Exports the layout to a single file. Multi-page layouts are written
+    to one file for each page in the SVG and PNG formats.
+    :param layout: Layout to export.
+    :type layout: QgsPrintLayout
+    :param options: Directory, format and resolution of the exported file.
+    :type options: ExportOptions
+    :return: Returns the export timing.
+    :rtype: list
+    """
+    exporter = QgsLayoutExporter(layout)
+    path = os.path.join(
+        options.output_dir,
+        f'{layout.name()}.{options.fmt}'
+    )
+
+    return [_timed_export(exporter, 1, path, options)]
+
+
+def export_atlas(layout, options, start=0, end=None):
+    """
+    Exports one file for each atlas feature, named using the atlas file
+    name expression.
+    :param layout: Layout whose atlas will be exported.
+    :type layout: QgsPrintLayout
+    :param options: Directory, format and resolution of the exported
+    files.
+    :type options: ExportOptions
+    :param start: Index of the first atlas feature to export.
+    :type start: int
+    :param end: Index after the last atlas feature to export, defaults to
+    the number of features.
+    :type end: int
+    :return: Returns the export timing of each feature.
+    :rtype: list
+    """
+    atlas = layout.atlas()
+    count = atlas.updateFeatures()
+    if end is None or end > count:
+        end = count
+    if not atlas.beginRender():
+        raise ExportError('Unable to render the atlas.')
+
+    exporter = QgsLayoutExporter(layout)
+    timings = []
+    try:
+        for i in range(start, end):
+            if not atlas.seekTo(i):
+                continue
+            name = atlas.currentFilename() or f'{layout.name()}_{i + 1}'
+            path = os.path.join(options.output_dir, f'{name}.{options.fmt}')
+            timings.append(_timed_export(exporter, i + 1, path, options))
+    finally:
+        atlas.endRender()
+
+    return timings
+
+
+def _worker_command(args, feature_range):
+    # Command for exporting a range of atlas features in a subprocess.
+    cmd = [
+        sys.executable, '-m', 'qrbarcodeitem.export_cli',
+        args.project,
+        '--layout', args.layout,
+        '--format', args.format,
+        '--output-dir', args.output_dir,
+        '--atlas',
+        '--workers', '1',
+        '--feature-range', f'{feature_range[0]}:{feature_range[1]}'
+    ]
+    if args.dpi is not None:
+        cmd.extend(['--dpi', str(args.dpi)])
+    if args.render_mode is not None:
+        cmd.extend(['--render-mode', args.render_mode])
+
+    return cmd
+
+
+def run_workers(args, count):
+    """
+    Exports the atlas features in parallel worker processes, each
+    exporting a contiguous range of features. Timing lines of the workers
+    are written directly to stdout.
+    :param args: Parsed command-line arguments.
+    :type args: argparse.Namespace
+    :param count: Number of atlas features.
+    :type count: int
+    :return: Returns True if all the workers succeeded.
+    :rtype: bool
+    """
+    env = dict(os.environ)
+    plugins_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env['PYTHONPATH'] = os.pathsep.join(
+        p for p in (plugins_dir, env.get('PYTHONPATH')) if p
+    )
+    with ExitStack() as stack:
+        processes = [
+            stack.enter_context(
+                subprocess.Popen(_worker_command(args, feature_range), env=env)
+            )
+            for feature_range in split_range(count, args.workers)
+        ]
+        return_codes = [p.wait() for p in processes]
+
+    return all(code == 0 for code in return_codes)
+
+
+def run_preflight(layout):
+    """
+    Validates the barcode values of all atlas features, the invalid values
+    are printed to stderr.
+    :param layout: Layout whose barcode items will be validated.
+    :type layout: QgsLayout
+    :raises ExportError: If any of the values is invalid.
+    """
+    failure_count = 0
+    for report in preflight_layout(layout):
+        for result in report.failures:
+            print(
+                f'Invalid\t{report.item.displayName()}\t'
+                f'{result.feature_id}\t{result.value}\t'
+                f'{" ".join(result.errors)}',
+                file=sys.stderr
+            )
+        failure_count += report.failure_count
+
+    if failure_count:
+        raise ExportError(
+            f'{failure_count} barcode value(s) failed validation.'
+        )
+
+
+def _export(args):
+    # Exports the layout, returns True if all pages were exported.
+    layout = load_layout(args.project, args.layout)
+    if args.render_mode is not None:
+        set_render_mode(layout, args.render_mode)
+    os.makedirs(args.output_dir, exist_ok=True)
+    options = ExportOptions(args.output_dir, args.format, args.dpi)
+
+    if not args.atlas:
+        timings = export_layout(layout, options)
+        return all(t.status == 'ok' for t in timings)
+
+    if not layout.atlas().enabled():
+        raise ExportError(f'Atlas is not enabled in layout {args.layout}.')
+
+    if args.preflight and args.feature_range is None:
+        run_preflight(layout)
+
+    count = layout.atlas().updateFeatures()
+    if args.feature_range is None and args.workers > 1 and count > 1:
+        return run_workers(args, count)
+
+    start, end = 0, count
+    if args.feature_range is not None:
+        start, end = _parse_range(args.feature_range, count)
+    elif args.prewarm:
+        prewarm_layout_atlas(layout, workers=args.workers)
+
+    timings = export_atlas(layout, options, start, end)
+
+    return all(t.status == 'ok' for t in timings)
+
+
+def main(argv=None):
+    """
+    Entry point of the command-line tool.
+    :param argv: Arguments excluding the program name, defaults to
+    sys.argv.
+    :type argv: list
+    :return: Returns the exit code, 0 if all pages were exported.
+    :rtype: int
+    """
+    args = parse_args(argv)
+    app = start_application()
+    start_time = time.perf_counter()
+    try:
+        status = _export(args)
+    except ExportError as ee:
+        print(f'Error: {ee}', file=sys.stderr)
+        status = False
+    finally:
+        SvgCache.instance().clear()
+        SvgFileTracker.instance().clean_up()
+        app.exitQgis()
+
+    if args.feature_range is None:
+        print(
+            f'Total\t{time.perf_counter() - start_time:.3f}',
+            file=sys.stderr
+        )
+
+    return 0 if status else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
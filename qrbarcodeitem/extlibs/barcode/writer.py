@@ -2,6 +2,7 @@ import gzip
 import os
 import xml.dom
 from typing import BinaryIO
+from xml.sax.saxutils import escape, quoteattr
 
 from .version import version
 
@@ -48,6 +49,7 @@ def create_svg_object(with_doctype=False):
 
 
 SIZE = "{0:.3f}"
+SVG_NS = "http://www.w3.org/2000/svg"
 COMMENT = "Autogenerated with python-barcode {} adapted for the " \
           "qrbarcode plugin".format(version)
 PATH = os.path.dirname(os.path.abspath(__file__))
@@ -326,3 +328,89 @@ class SVGWriter(BaseWriter):
         Content should be a barcode rendered by this writer.
         """
         fp.write(content)
+
+
+def _compact_size(value):
+    """Formats a size like `SIZE` without trailing zeros."""
+    return SIZE.format(value).rstrip("0").rstrip(".")
+
+
+class CompactSVGWriter(SVGWriter):
+    """SVG writer which builds the document from strings instead of a DOM.
+
+    The bars are combined into a single `<path>` element with one
+    rectangle (`M x y h w v h h -w z`) per bar and the modules with the
+    background color are not drawn at all as they are already covered by
+    the background rectangle. The output is rendered the same as the
+    output of `SVGWriter` but is a fraction of its size.
+    """
+
+    def __init__(self):
+        SVGWriter.__init__(self)
+        self._width = None
+        self._height = None
+        self._bars = []
+        self._texts = []
+
+    def _init(self, code):
+        self._width, self._height = self.calculate_size(
+            len(code[0]), len(code), self.dpi
+        )
+        self._bars = []
+        self._texts = []
+
+    def _create_module(self, xpos, ypos, width, color):
+        if color == self.background:
+            return
+        self._bars.append(
+            "M{} {}h{}v{}h-{}z".format(
+                _compact_size(xpos),
+                _compact_size(ypos),
+                _compact_size(width),
+                _compact_size(self.module_height),
+                _compact_size(width),
+            )
+        )
+
+    def _create_text(self, xpos, ypos):
+        if self.human != "":
+            barcodetext = self.human
+        else:
+            barcodetext = self.text
+        style = quoteattr(
+            "fill:{};font-size:{}pt;text-anchor:middle;".format(
+                self.foreground, self.font_size
+            )
+        )
+        for subtext in barcodetext.split("\n"):
+            self._texts.append(
+                '<text x="{}" y="{}" style={}>{}</text>'.format(
+                    _compact_size(xpos), _compact_size(ypos), style, escape(subtext)
+                )
+            )
+            ypos += pt2mm(self.font_size) + self.text_line_distance
+
+    def _finish(self):
+        parts = [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            '<svg xmlns="{}" version="1.1" width="{}" height="{}">'.format(
+                SVG_NS, SIZE.format(self._width), SIZE.format(self._height)
+            ),
+            "<!--{}-->".format(COMMENT),
+            '<g id="barcode_group">',
+            '<rect width="100%" height="100%" style={}/>'.format(
+                quoteattr("fill:{}".format(self.background))
+            ),
+        ]
+        if self._bars:
+            parts.append(
+                '<path d="{}" style={}/>'.format(
+                    "".join(self._bars),
+                    quoteattr("fill:{};".format(self.foreground)),
+                )
+            )
+        parts.extend(self._texts)
+        parts.append("</g></svg>")
+        self._bars = []
+        self._texts = []
+        return "".join(parts).encode("UTF-8")
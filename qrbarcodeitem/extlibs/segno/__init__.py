@@ -22,8 +22,8 @@ except NameError:  # pragma: no cover
 
 __version__ = '1.1.0'
 
-__all__ = ('make', 'make_qr', 'make_micro', 'make_sequence', 'QRCode',
-           'QRCodeSequence', 'DataOverflowError')
+__all__ = ('make', 'make_cached', 'make_qr', 'make_micro', 'make_sequence', 'QRCode',
+           'QRCodeSequence', 'DataOverflowError', 'plan_capacity')
 
 
 # <https://wiki.python.org/moin/PortingToPy3k/BilingualQuickRef#New_Style_Classes>
@@ -138,6 +138,36 @@ def make(content, error=None, version=None, mode=None, mask=None, encoding=None,
                                  eci, micro, boost_error=boost_error))
 
 
+def make_cached(content, error=None, version=None, mode=None, mask=None,
+                encoding=None, eci=False, micro=None, boost_error=True):
+    """\
+    Creates a (Micro) QR Code and memoizes the encoding result.
+
+    Accepts the same parameters as :py:func:`make`. Creating a QR Code with
+    the same content and parameters again reuses the encoded matrix, see
+    :py:func:`segno.encoder.encode_cached`. The matrix of the returned
+    :py:class:`QRCode` is a tuple of :py:class:`bytes` instances.
+
+    :rtype: QRCode
+    """
+    return QRCode(encoder.encode_cached(content, error, version, mode, mask,
+                                        encoding, eci, micro,
+                                        boost_error=boost_error))
+
+
+def plan_capacity(content, mode=None, encoding=None, eci=False, micro=None):
+    """\
+    Returns the minimal (Micro) QR Code version per error level without
+    creating a QR Code.
+
+    See :py:func:`segno.encoder.plan_capacity` for a description of the
+    result.
+
+    :rtype: segno.encoder.CapacityPlan
+    """
+    return encoder.plan_capacity(content, mode, encoding, eci, micro)
+
+
 def make_qr(content, error=None, version=None, mode=None, mask=None,
             encoding=None, eci=False, boost_error=True):
     """\
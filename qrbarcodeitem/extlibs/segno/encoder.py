@@ -16,10 +16,12 @@ from __future__ import absolute_import, division
 from operator import itemgetter, gt, lt, xor
 from functools import partial, reduce
 from itertools import islice, chain, product
+from bisect import bisect_left
 import re
 import math
+import threading
 import codecs
-from collections import namedtuple
+from collections import namedtuple, OrderedDict
 from . import consts
 _PY2 = False
 try:  # pragma: no cover
@@ -34,11 +36,23 @@ except ImportError:  # pragma: no cover
     numeric = Number
     str = unicode
     range = xrange
+try:  # pragma: no cover
+    import numpy as _np
+except ImportError:  # pragma: no cover
+    _np = None
 import sys
 _MAX_PENALTY_SCORE = sys.maxsize
 del sys
 
-__all__ = ('encode', 'encode_sequence', 'DataOverflowError')
+# Evaluate the QR Code mask patterns with NumPy array operations if available.
+# The chosen mask is identical to the one chosen by the pure Python code.
+USE_NUMPY = _np is not None
+
+__all__ = ('encode', 'encode_sequence', 'plan_capacity', 'DataOverflowError')
+
+# Translation tables between bits (0x0, 0x1) and binary digits (b'0', b'1')
+_BITS_TO_ASCII = bytes.maketrans(b'\0\1', b'01')
+_ASCII_TO_BITS = bytes.maketrans(b'01', b'\0\1')
 
 # <https://wiki.python.org/moin/PortingToPy3k/BilingualQuickRef#New_Style_Classes>
 __metaclass__ = type
@@ -102,6 +116,59 @@ def encode(content, error=None, version=None, mode=None, mask=None,
     return _encode(segments, error, version, mask, eci, boost_error)
 
 
+# Bounded LRU cache of encoded codes, see encode_cached. Codes may be
+# encoded in worker threads, hence the cache is guarded by a lock.
+_CODE_CACHE = OrderedDict()
+_CODE_CACHE_LOCK = threading.Lock()
+CODE_CACHE_SIZE = 256
+
+
+def encode_cached(content, error=None, version=None, mode=None, mask=None,
+                  encoding=None, eci=False, micro=None, boost_error=True):
+    """\
+    Creates a (Micro) QR code and memoizes the result.
+
+    Same as :py:func:`encode` but the results of the last
+    :py:data:`CODE_CACHE_SIZE` distinct calls are kept so that encoding the
+    same content with the same parameters again is free. The matrix of
+    the returned named tuple is immutable (a tuple of :py:class:`bytes`).
+
+    This function is thread-safe. The cache is locked while it is accessed
+    but not while the content is encoded.
+
+    :rtype: namedtuple
+    """
+    key = (type(content), content, error, version, mode, mask, encoding, eci,
+           micro, boost_error)
+    try:
+        hash(key)
+    except TypeError:  # Unhashable content, i.e. a bytearray
+        key = None
+    if key is not None:
+        with _CODE_CACHE_LOCK:
+            code = _CODE_CACHE.get(key)
+            if code is not None:
+                _CODE_CACHE.move_to_end(key)
+                return code
+    code = encode(content, error, version, mode, mask, encoding, eci, micro,
+                  boost_error)
+    code = code._replace(matrix=tuple([bytes(row) for row in code.matrix]))
+    if key is not None and CODE_CACHE_SIZE > 0:
+        with _CODE_CACHE_LOCK:
+            _CODE_CACHE[key] = code
+            while len(_CODE_CACHE) > CODE_CACHE_SIZE:
+                _CODE_CACHE.popitem(last=False)
+    return code
+
+
+def clear_code_cache():
+    """\
+    Removes all codes from the cache of :py:func:`encode_cached`.
+    """
+    with _CODE_CACHE_LOCK:
+        _CODE_CACHE.clear()
+
+
 def encode_sequence(content, error=None, version=None, mode=None,
                     mask=None, encoding=None, eci=False, boost_error=True,
                     symbol_count=None):
@@ -249,12 +316,11 @@ def _encode(segments, error, version, mask, eci, boost_error, sa_info=None):
     write_pad_codewords(buff, version, capacity, len(buff))
     # ISO/IEC 18004:2015(E) -- 7.6 Constructing the final message codeword sequence (page 45)
     buff = make_final_message(version, error, buff)
-    # Matrix with timing pattern and reserved format / version regions
-    matrix = make_matrix(version)
+    # Matrix with timing, finder and alignment patterns and reserved format /
+    # version regions
     # ISO/IEC 18004:2015 -- 6.3.3 Finder pattern (page 16)
-    add_finder_patterns(matrix, is_micro)
     # ISO/IEC 18004:2015 -- 6.3.6 Alignment patterns (page 17)
-    add_alignment_patterns(matrix, version)
+    matrix = tuple([bytearray(row) for row in get_version_template(version).matrix])
     # ISO/IEC 18004:2015 -- 7.7 Codeword placement in matrix (page 46)
     add_codewords(matrix, buff, version)
     # ISO/IEC 18004:2015(E) -- 7.8.2 Data mask patterns (page 50)
@@ -338,7 +404,7 @@ def write_terminator(buff, capacity, ver, length):
     :param length: Length of the data bit stream.
     """
     # ISO/IEC 18004:2015 -- 7.4.9 Terminator (page 32)
-    buff.extend([0] * min(capacity - length, consts.TERMINATOR_LENGTH[ver]))
+    buff.append_bits(0, min(capacity - length, consts.TERMINATOR_LENGTH[ver]))
 
 
 def write_padding_bits(buff, version, length):
@@ -357,7 +423,7 @@ def write_padding_bits(buff, version, length):
     # the final bit (least significant bit) of the data stream to extend it
     # to the codeword boundary. [...]
     if version not in (consts.VERSION_M1, consts.VERSION_M3):
-        buff.extend([0] * (8 - (length % 8)))
+        buff.append_bits(0, 8 - (length % 8))
 
 
 def write_pad_codewords(buff, version, capacity, length):
@@ -378,13 +444,11 @@ def write_pad_codewords(buff, version, capacity, length):
     # codeword is 4 bits long. The Pad Codeword used in the final data symbol
     # character position in Micro QR Code versions M1 and M3 symbols shall be
     # represented as 0000.
-    write = buff.extend
     if version in (consts.VERSION_M1, consts.VERSION_M3):
-        write([0] * (capacity - length))
+        buff.append_bits(0, capacity - length)
     else:
-        pad_codewords = ((1, 1, 1, 0, 1, 1, 0, 0), (0, 0, 0, 1, 0, 0, 0, 1))
-        for i in range(capacity // 8 - length // 8):
-            write(pad_codewords[i % 2])
+        num_pad_codewords = max(capacity // 8 - length // 8, 0)
+        buff.append_bytes((b'\xec\x11' * ((num_pad_codewords + 1) // 2))[:num_pad_codewords])
 
 
 def add_finder_patterns(matrix, is_micro):
@@ -475,23 +539,54 @@ def add_codewords(matrix, codewords, version):
 
     ISO/IEC 18004:2015(E) -- 7.7.3 Symbol character placement (page 46)
 
+    The modules are filled in a single pass using the placement order of the
+    version template, see :py:func:`get_version_template`. The matrix must
+    be a copy of the template matrix.
+
     :param matrix: The matrix to add the codewords into.
     :param codewords: Sequence of bits
     :param int version: The (Micro) QR Code version constant.
     """
     matrix_size = len(matrix)
+    template = get_version_template(version)
+    bits = codewords.getbits() if isinstance(codewords, Buffer) else bytearray(codewords)
+    codeword_length = len(bits)
+    num_modules = len(template.placement)
+    if codeword_length > num_modules:  # pragma: no cover
+        raise ValueError('Internal error: Adding codewords to matrix failed. '
+                         'Added {0} of {1} codewords'.format(num_modules, codeword_length))
+    # Modules without a codeword keep the value 0x2
+    modules = b''.join(matrix) + bytes(bits) + b'\2' * (num_modules - codeword_length)
+    modules = bytes(template.gather(modules))
+    for i, row in enumerate(matrix):
+        offset = i * matrix_size
+        row[:] = modules[offset:offset + matrix_size]
+
+
+def _make_placement(matrix, version):
+    """\
+    Returns the indices (row * size + col) of the modules of the encoding
+    region in the order of the codeword placement.
+
+    ISO/IEC 18004:2015(E) -- 7.7.3 Symbol character placement (page 46)
+
+    :param matrix: Matrix where the modules of the encoding region have the
+            value 0x2.
+    :param int version: The (Micro) QR Code version constant.
+    :rtype: tuple
+    """
+    matrix_size = len(matrix)
     is_micro = version < 1
     # Necessary for M1 and M3: The algorithm would start at the upper right
     # corner, see <https://github.com/heuer/segno/issues/36>
     inc = 0 if version not in (consts.VERSION_M1, consts.VERSION_M3) else 2
-    idx = 0  # Pointer to the current codeword
     # ISO/IEC 18004:2015(E) - page 48
     # [...] An alternative method for placement in the symbol [...] is to regard
     # the interleaved codeword sequence as a single bit stream, which is placed
     # (starting with the most significant bit) in the two-module wide columns
     # alternately upwards and downwards from the right to left of the symbol.
     # [...]
-    codeword_length = len(codewords)
+    placement = []
     range_two = range(2)
     for right in range(matrix_size - 1, 0, -2):
         if not is_micro and right <= 6:
@@ -503,13 +598,9 @@ def add_codewords(matrix, codewords, version):
                 if not is_micro:
                     upwards ^= j < 6
                 i = (matrix_size - 1 - vertical) if upwards else vertical
-                row = matrix[i]
-                if row[j] == 0x2 and idx < codeword_length:
-                    row[j] = codewords[idx]
-                    idx += 1
-    if idx != len(codewords):  # pragma: no cover
-        raise ValueError('Internal error: Adding codewords to matrix failed. '
-                         'Added {0} of {1} codewords'.format(idx, len(codewords)))
+                if matrix[i][j] == 0x2:
+                    placement.append(i * matrix_size + j)
+    return tuple(placement)
 
 
 def make_final_message(version, error, buff):
@@ -523,9 +614,6 @@ def make_final_message(version, error, buff):
     :param buff: Byte buffer.
     :return: Byte buffer representing the final message.
     """
-    def to_binary(val, length=8):
-        return ((val >> i) & 1 for i in reversed(range(length)))
-
     ec_infos = consts.ECC[version][error]
     data_blocks, error_blocks = make_blocks(ec_infos, buff)
     cw_four = None
@@ -534,14 +622,14 @@ def make_final_message(version, error, buff):
         # to represent the last codeword.
         # datablocks[0] is save since Micro QR Codes use just one datablock and
         # one error block
-        cw_four = to_binary(data_blocks[0].pop(-1) >> 4, 4)
+        cw_four = data_blocks[0].pop(-1) >> 4
     res = Buffer()
     # Write codewords
-    res.extend(chain(*map(to_binary, (x for x in chain.from_iterable(zip_longest(*data_blocks)) if x is not None))))
+    res.append_bytes(bytes(x for x in chain.from_iterable(zip_longest(*data_blocks)) if x is not None))
     if cw_four is not None:
-        res.extend(cw_four)
+        res.append_bits(cw_four, 4)
     # Write error codewords
-    res.extend(chain(*map(to_binary, (x for x in chain.from_iterable(zip_longest(*error_blocks)) if x is not None))))
+    res.append_bytes(bytes(x for x in chain.from_iterable(zip_longest(*error_blocks)) if x is not None))
     # ISO/IEC 18004:2015(E) -- 7.6 Constructing the final message codeword sequence
     # [...] In certain QR Code versions, however, where the number of modules
     # available for data and error correction codewords is not an exact multiple
@@ -555,7 +643,7 @@ def make_final_message(version, error, buff):
         remainder = 3
     elif version in (21, 22, 23, 24, 25, 26, 27):
         remainder = 4
-    res.extend(b'\0' * remainder)
+    res.append_bits(0, remainder)
     return res
 
 
@@ -570,29 +658,54 @@ def make_blocks(ec_infos, buff):
     data_blocks, error_blocks = [], []
     append_data_block = data_blocks.append
     append_error_block = error_blocks.append
-    gen_log = consts.GALIOS_LOG
-    gen_exp = consts.GALIOS_EXP
     for ec_info in ec_infos:
         num_error_words = ec_info.num_total - ec_info.num_data
-        gen = consts.GEN_POLY[num_error_words]
-        range_error_words = range(num_error_words)
+        gen_table = get_generator_table(num_error_words)
+        shift = (num_error_words - 1) * 8
+        mask = (1 << (num_error_words * 8)) - 1
         for i in range(ec_info.num_blocks):
             block = bytearray(islice(codewords, ec_info.num_data))
             append_data_block(block)
-            len_data = len(block)
-            error_block = bytearray(block)
-            error_block.extend([0] * num_error_words)
-            # Extended synthetic division, see http://research.swtch.com/field
-            for k in range(len_data):
-                coef = error_block[k]
-                if coef != 0:  # log(0) is undefined
-                    lcoef = gen_log[coef]
-                    for n in range_error_words:
-                        error_block[k + n + 1] ^= gen_exp[lcoef + gen[n]]
-            append_error_block(error_block[len_data:])
+            # Polynomial division as linear feedback shift register where the
+            # remainder (the error codewords) is kept in a single integer
+            remainder = 0
+            for codeword in block:
+                remainder = ((remainder << 8) & mask) ^ gen_table[(remainder >> shift) ^ codeword]
+            append_error_block(bytearray(remainder.to_bytes(num_error_words, 'big')))
     return data_blocks, error_blocks
 
 
+# Cache of the generator polynomial multiplication tables,
+# see get_generator_table
+_GENERATOR_TABLES = {}
+
+
+def get_generator_table(num_error_words):
+    """\
+    Returns the products of the generator polynomial for the provided
+    number of error correction codewords with each possible codeword.
+
+    Each product is represented as (big endian) integer of `num_error_words`
+    bytes so that the Reed-Solomon error correction codewords can be
+    computed with integer shifts and XOR.
+
+    :param int num_error_words: Number of error correction codewords.
+    :rtype: tuple
+    """
+    table = _GENERATOR_TABLES.get(num_error_words)
+    if table is None:
+        gen_log = consts.GALIOS_LOG
+        gen_exp = consts.GALIOS_EXP
+        gen = consts.GEN_POLY[num_error_words]
+        table = [0]  # log(0) is undefined, the product is zero
+        for coef in range(1, 256):
+            lcoef = gen_log[coef]
+            table.append(int.from_bytes(bytes(gen_exp[lcoef + g] for g in gen), 'big'))
+        table = tuple(table)
+        _GENERATOR_TABLES[num_error_words] = table
+    return table
+
+
 def find_and_apply_best_mask(matrix, version, is_micro, proposed_mask=None):
     """\
     Applies all mask patterns against the provided QR Code matrix and returns
@@ -624,39 +737,230 @@ def find_and_apply_best_mask(matrix, version, is_micro, proposed_mask=None):
         is_better = gt
         best_score = -1
         eval_mask = evaluate_micro_mask
-    # Matrix to check if a module belongs to the encoding region
-    # or to the function patterns
-    function_matrix = make_matrix(version)
-    add_finder_patterns(function_matrix, is_micro)
-    add_alignment_patterns(function_matrix, version)
-    if not is_micro:
-        function_matrix[-8][8] = 0x1
-
-    def is_encoding_region(i, j):
-        return function_matrix[i][j] > 0x1
-
-    mask_patterns = get_data_mask_functions(is_micro)
+    template = get_version_template(version)
     # If the user supplied a mask pattern, the evaluation step is skipped
     if proposed_mask is not None:
-        apply_mask(matrix, mask_patterns[proposed_mask], matrix_size,
-                   is_encoding_region)
+        for row, mask_row in zip(matrix, template.masks[proposed_mask]):
+            row[:] = _xor_row(row, mask_row, matrix_size)
         return proposed_mask, matrix
-
+    if USE_NUMPY and not is_micro:
+        return _np_find_and_apply_best_mask(matrix, template.matrix)
     best_matrix = None
-    for mask_number, mask_pattern in enumerate(mask_patterns):
-        # A lot(!!!) faster than m = copy.deepcopy(matrix)
-        m = [bytearray(ba) for ba in matrix]
-        apply_mask(m, mask_pattern, matrix_size, is_encoding_region)
+    for mask_number, mask_rows in enumerate(template.masks):
+        # Row-wise XOR of the precomputed mask, faster than copying the
+        # matrix and applying the mask function module by module
+        m = tuple([_xor_row(row, mask_row, matrix_size)
+                   for row, mask_row in zip(matrix, mask_rows)])
         # NOTE: DO NOT add format / version info in advance of evaluation
         # See ISO/IEC 18004:2015(E) -- 7.8. Data masking (page 50)
         score = eval_mask(m, matrix_size)
         if is_better(score, best_score):
             best_score = score
             best_pattern = mask_number
-            best_matrix = tuple(m)
+            best_matrix = m
     return best_pattern, best_matrix
 
 
+def _xor_row(row, mask_row, matrix_size):
+    """\
+    Returns a new row with the provided mask applied.
+
+    :param row: A row of the matrix (bytearray)
+    :param int mask_row: The row of the mask as (big endian) integer.
+    :param int matrix_size: width or height of the matrix
+    :rtype: bytearray
+    """
+    return bytearray((int.from_bytes(row, 'big') ^ mask_row).to_bytes(matrix_size, 'big'))
+
+
+_VersionTemplate = namedtuple('_VersionTemplate', 'matrix masks placement gather')
+
+# Cache of the version templates, see get_version_template
+_VERSION_TEMPLATES = {}
+
+
+def get_version_template(version):
+    """\
+    Returns the parts of a (Micro) QR Code symbol which depend only on the
+    version.
+
+    The template provides
+        * ``matrix``: The matrix (tuple of bytes) with the timing, finder and
+          alignment patterns and the reserved format / version regions. The
+          modules of the encoding region have the value 0x2.
+        * ``masks``: A tuple with the data mask patterns (see
+          :py:func:`get_data_mask_functions`) where each pattern is a tuple of
+          rows as (big endian) integers. The bits are limited to the encoding
+          region so that a mask can be applied with a row-wise XOR.
+        * ``placement``: The indices (row * size + col) of the modules of the
+          encoding region in codeword placement order.
+        * ``gather``: A function which returns all modules of the matrix (row
+          by row) from a sequence of the matrix modules followed by the
+          codeword bits.
+
+    The templates are created once per version and cached.
+
+    :param int version: The (Micro) QR Code version constant.
+    :rtype: _VersionTemplate
+    """
+    template = _VERSION_TEMPLATES.get(version)
+    if template is None:
+        template = _make_version_template(version)
+        _VERSION_TEMPLATES[version] = template
+    return template
+
+
+def _make_version_template(version):
+    """\
+    Creates the template for the provided version.
+
+    :param int version: The (Micro) QR Code version constant.
+    :rtype: _VersionTemplate
+    """
+    is_micro = version < 1
+    matrix = make_matrix(version)
+    add_finder_patterns(matrix, is_micro)
+    add_alignment_patterns(matrix, version)
+    matrix_size = len(matrix)
+    module_range = range(matrix_size)
+    masks = []
+    for mask_pattern in get_data_mask_functions(is_micro):
+        mask_rows = []
+        for i, row in enumerate(matrix):
+            mask_row = bytearray(matrix_size)
+            for j in module_range:
+                # Only modules of the encoding region are masked
+                if row[j] > 0x1 and mask_pattern(i, j):
+                    mask_row[j] = 0x1
+            mask_rows.append(int.from_bytes(mask_row, 'big'))
+        masks.append(tuple(mask_rows))
+    placement = _make_placement(matrix, version)
+    # Modules outside the encoding region are taken from the matrix, the
+    # others from the codeword bits which follow the matrix modules
+    num_modules = matrix_size ** 2
+    gather = list(range(num_modules))
+    for idx, pos in enumerate(placement):
+        gather[pos] = num_modules + idx
+    return _VersionTemplate(tuple([bytes(row) for row in matrix]), tuple(masks),
+                            placement, itemgetter(*gather))
+
+
+def _np_mask_patterns(matrix_size):
+    """\
+    Returns the eight QR Code data mask patterns as boolean array of shape
+    (8, size, size).
+
+    ISO/IEC 18004:2015(E) -- 7.8.2 Data mask patterns (page 50)
+
+    :param int matrix_size: width or height of the matrix
+    """
+    i, j = _np.indices((matrix_size, matrix_size))
+    ij = i * j
+    return _np.array(((i + j) % 2 == 0,
+                      i % 2 == 0,
+                      j % 3 == 0,
+                      (i + j) % 3 == 0,
+                      (i // 2 + j // 3) % 2 == 0,
+                      (ij % 2) + (ij % 3) == 0,
+                      ((ij % 2) + (ij % 3)) % 2 == 0,
+                      (((i + j) % 2) + (ij % 3)) % 2 == 0))
+
+
+def _np_find_and_apply_best_mask(matrix, function_matrix):
+    """\
+    NumPy variant of :py:func:`find_and_apply_best_mask` for QR Codes which
+    evaluates all eight mask patterns at once.
+
+    :param matrix: A matrix (tuple of bytearrays)
+    :param function_matrix: Matrix where the values of the encoding region
+            are greater than 0x1, i.e. the matrix of the version template.
+    :rtype: tuple
+    :return: A tuple of the best data mask pattern index and the best matrix.
+    """
+    matrix_size = len(matrix)
+    base = _np.frombuffer(b''.join(matrix), dtype=_np.uint8) \
+        .reshape(matrix_size, matrix_size)
+    region = _np.frombuffer(b''.join(function_matrix), dtype=_np.uint8) \
+        .reshape(matrix_size, matrix_size) > 0x1
+    candidates = base ^ (_np_mask_patterns(matrix_size) & region)
+    scores = [sum(score) for score in _np_mask_scores(candidates)]
+    best_pattern = scores.index(min(scores))
+    best_matrix = tuple(bytearray(row.tobytes()) for row in candidates[best_pattern])
+    return best_pattern, best_matrix
+
+
+def _np_mask_scores(candidates):
+    """\
+    Returns the penalty scores (N1, N2, N3, N4) of each matrix.
+
+    The results are identical to :py:func:`mask_scores`, including the way
+    overlapping 1 : 1 : 3 : 1 : 1 patterns are counted.
+
+    :param candidates: uint8 array of shape (number of matrices, size, size)
+    :rtype: list
+    :return: A list of tuples of penalty scores (ints): ``(n1, n2, n3, n4)``.
+    """
+    count, matrix_size = candidates.shape[:2]
+    # Rows and columns of each matrix
+    lines = _np.concatenate((candidates, candidates.transpose(0, 2, 1)), axis=1)
+    # N1: A run of 5 + i modules scores 3 + i which is the number of windows
+    # of five same colored modules plus two for each run
+    same = lines[:, :, 1:] == lines[:, :, :-1]
+    windows = same[:, :, :-3] & same[:, :, 1:-2] & same[:, :, 2:-1] & same[:, :, 3:]
+    run_starts = windows[:, :, 0].sum(axis=1) \
+        + (windows[:, :, 1:] & ~same[:, :, :-4]).sum(axis=(1, 2))
+    scores_n1 = windows.sum(axis=(1, 2)) + 2 * run_starts
+    # N2
+    top_left = candidates[:, :-1, :-1]
+    scores_n2 = 3 * ((top_left == candidates[:, :-1, 1:])
+                     & (top_left == candidates[:, 1:, :-1])
+                     & (top_left == candidates[:, 1:, 1:])).sum(axis=(1, 2))
+    # N3: Occurrences of the pattern which are preceded or followed by four
+    # light modules or are located at the start or end of the row / column
+    last_idx = matrix_size - 6
+    occurrences = _np.ones((count, 2 * matrix_size, last_idx), dtype=bool)
+    for k, bit in enumerate((0x1, 0x0, 0x1, 0x1, 0x1, 0x0, 0x1)):
+        occurrences &= lines[:, :, k:last_idx + k] == bit
+    dark_sums = _np.zeros((count, 2 * matrix_size, matrix_size + 1), dtype=_np.int32)
+    _np.cumsum(lines, axis=2, out=dark_sums[:, :, 1:])
+    idx = _np.arange(last_idx)
+    before = _np.maximum(idx - 4, 0)
+    after = _np.minimum(idx + 11, matrix_size)
+    light_area = (dark_sums[:, :, idx] == dark_sums[:, :, before]) \
+        | (dark_sums[:, :, after] == dark_sums[:, :, idx + 7])
+    light_area[:, :, 0] = True
+    light_area[:, :, -1] = True
+    counted = occurrences & light_area
+    scores_n3 = 40 * counted.sum(axis=(1, 2))
+    # After a counted occurrence the search continues behind the pattern,
+    # overlapping occurrences four or six modules later are skipped. These
+    # rare cases are re-evaluated sequentially.
+    overlaps = _np.zeros(occurrences.shape, dtype=bool)
+    overlaps[:, :, 4:] = occurrences[:, :, 4:] & counted[:, :, :-4]
+    overlaps[:, :, 6:] |= occurrences[:, :, 6:] & counted[:, :, :-6]
+    for mask_idx, line_idx in zip(*_np.nonzero(overlaps.any(axis=2))):
+        line_counted = counted[mask_idx, line_idx]
+        score = 0
+        offset = 0
+        for pos in _np.flatnonzero(occurrences[mask_idx, line_idx]):
+            if pos < offset:
+                continue
+            if line_counted[pos]:
+                score += 40
+                offset = pos + 7
+            else:
+                offset = pos + 4
+        scores_n3[mask_idx] += score - 40 * int(line_counted.sum())
+    # N4
+    scores = []
+    for n1, n2, n3, dark_modules in zip(scores_n1.tolist(), scores_n2.tolist(),
+                                        scores_n3.tolist(),
+                                        candidates.sum(axis=(1, 2)).tolist()):
+        percent = float(dark_modules) / (matrix_size ** 2)
+        scores.append((n1, n2, n3, 10 * int(abs(percent * 100 - 50) / 5)))
+    return scores
+
+
 def apply_mask(matrix, mask_pattern, matrix_size, is_encoding_region):
     """\
     Applies the provided mask pattern on the `matrix`.
@@ -1072,9 +1376,8 @@ def make_segment(data, mode, encoding=None):
     elif segment_mode == consts.MODE_BYTE:
         # ISO/IEC 18004:2015(E) -- 7.4.5 Byte mode (page 27)
         if _PY2:  # pragma: no cover
-            segment_data = (ord(b) for b in segment_data)
-        for b in segment_data:
-            append_bits(b, 8)
+            segment_data = bytearray(segment_data)
+        buff.append_bytes(segment_data)
     elif segment_mode == consts.MODE_HANZI:
         # GBT 18284-2000 -- 6.4.5 Hanzi mode (page 18)
         if _PY2:  # pragma: no cover
@@ -1116,7 +1419,7 @@ def make_segment(data, mode, encoding=None):
             # c) Add least significant byte to product from b);
             # d) Convert result to a 13-bit binary string.
             append_bits(((diff >> 8) * 0xc0) + (diff & 0xff), 13)
-    return _Segment(buff.getbits(), char_count, segment_mode, segment_encoding)
+    return _Segment(buff, char_count, segment_mode, segment_encoding)
 
 
 def make_matrix(version, reserve_regions=True, add_timing=True):
@@ -1396,6 +1699,118 @@ def find_version(segments, error, eci, micro, is_sa=False):
     raise DataOverflowError('Data too large. No {0}QR Code can handle the provided data'.format(help_txt))
 
 
+# Minimal version and remaining capacity, in bits, for some content
+VersionFit = namedtuple('VersionFit', 'version error capacity bit_length remaining')
+
+# Minimal version for each error level and whether a Micro QR Code can hold
+# the content
+CapacityPlan = namedtuple('CapacityPlan', 'levels micro')
+
+# QR Code version ranges which use the same char count indicator lengths,
+# i.e. the bit length of the content is constant within a range
+_QR_VERSION_RANGES = ((1, 9), (10, 26), (27, 40))
+
+# Capacity of QR Code versions 1 .. 40 per error level, ascending
+_QR_CAPACITIES = {error: [consts.SYMBOL_CAPACITY[version][error] for version in range(1, 41)]
+                  for error in (consts.ERROR_LEVEL_L, consts.ERROR_LEVEL_M,
+                                consts.ERROR_LEVEL_Q, consts.ERROR_LEVEL_H)}
+
+
+def _find_micro_version(segments, error, eci, is_sa=False):
+    """\
+    Returns the minimal Micro QR Code version which can hold the segments.
+
+    :rtype: VersionFit or None
+    """
+    if eci:
+        return None
+    for version in consts.MICRO_VERSIONS:
+        if error is not None and version == consts.VERSION_M1:
+            continue
+        ver_error = consts.ERROR_LEVEL_L if error is None and version != consts.VERSION_M1 else error
+        try:
+            capacity = consts.SYMBOL_CAPACITY[version][ver_error]
+            bit_length = segments.bit_length_with_overhead(version, eci, is_sa)
+        except KeyError:  # Error level or mode not supported by the version
+            continue
+        if capacity >= bit_length:
+            return VersionFit(version, ver_error, capacity, bit_length, capacity - bit_length)
+    return None
+
+
+def find_minimal_version(segments, error, eci=False, micro=None, is_sa=False):
+    """\
+    Returns the minimal (Micro) QR Code version for the provided segments.
+
+    Returns the same version as :py:func:`find_version` but the QR Code
+    versions are found by a binary search within the version ranges which
+    share the same bit length of the content.
+
+    :param segments: Iterable of Segment instances.
+    :param error: The error correction level constant.
+    :type error: int or None
+    :param bool eci: Indicates if the ECI mode should be used.
+    :param micro: Boolean value if a Micro QR Code should be created or ``None``
+    :type micro: bool or None
+    :param bool is_sa: Indicator if Structured Append is used.
+    :return: The version, the error level, the capacity, the bit length of
+            the content and the remaining bits or ``None`` if the content
+            does not fit into a (Micro) QR Code.
+    :rtype: VersionFit or None
+    """
+    assert not (eci and micro)
+    if micro or micro is None:
+        fit = _find_micro_version(segments, error, eci, is_sa)
+        if fit is not None or micro:
+            return fit
+    if error is None:
+        error = consts.ERROR_LEVEL_L
+    capacities = _QR_CAPACITIES[error]
+    for first, last in _QR_VERSION_RANGES:
+        bit_length = segments.bit_length_with_overhead(first, eci, is_sa)
+        if capacities[last - 1] < bit_length:
+            continue
+        version = bisect_left(capacities, bit_length, first - 1, last - 1) + 1
+        capacity = capacities[version - 1]
+        return VersionFit(version, error, capacity, bit_length, capacity - bit_length)
+    return None
+
+
+def plan_capacity(content, mode=None, encoding=None, eci=False, micro=None):
+    """\
+    Returns the minimal version for each error level without encoding the
+    content.
+
+    Contrary to :py:func:`encode`, the error correction, codeword
+    placement and masking are skipped, so this is a cheap way to check if
+    the content fits into a given version or error level.
+
+    :param content: The data to encode, see :py:func:`segno.make`
+    :param mode: The mode, see :py:func:`segno.make`
+    :param encoding: The encoding, see :py:func:`segno.make`
+    :param bool eci: Indicates if the ECI mode should be used.
+    :param micro: Boolean value if a Micro QR Code should be created or ``None``
+    :type micro: bool or None
+    :return: A named tuple ``(levels, micro)``. ``levels`` maps the error
+            level constants, and ``None`` for the error level chosen by
+            :py:func:`encode` if no error level is provided, to a
+            :py:class:`VersionFit` or ``None`` if the content does not fit
+            with that error level. ``micro`` indicates if any Micro QR Code
+            can hold the content.
+    :rtype: CapacityPlan
+    """
+    segments = prepare_data(content, normalize_mode(mode), encoding)
+    levels = {}
+    for error in (None,) + tuple(_QR_CAPACITIES):
+        if eci and micro:
+            fit = None
+        else:
+            fit = find_minimal_version(segments, error, eci, micro)
+        levels[error] = fit
+    micro_fit = _find_micro_version(segments, None, eci)
+    return CapacityPlan(levels, micro_fit is not None)
+
+
 def calc_matrix_size(ver):
     """\
     Returns the matrix size according to the provided `version`.
@@ -1620,8 +2035,8 @@ class _Segment(tuple):
     """\
     Represents a data segment.
 
-    A segment provides the (encoding specific) byte data, the data length,
-    the QR Code mode, and the used encoding. The latter is ``None`` iff mode
+    A segment provides the (encoding specific) data as :py:class:`Buffer`,
+    the data length, the QR Code mode, and the used encoding. The latter is ``None`` iff mode
     is not "byte".
 
     Note that `data_length` may not be equal to len(data)!
@@ -1641,34 +2056,71 @@ class _Segment(tuple):
 
 class Buffer:
     """\
-    Wraps a :cls:`bytearray` and provides some useful methods to add bits.
+    Bit buffer which keeps the bits packed into an integer and provides some
+    useful methods to add bits.
     """
-    __slots__ = ['_data']
+    __slots__ = ['_value', '_length']
 
     def __init__(self, iterable=()):
-        self._data = bytearray(iterable)
+        self._value = 0
+        self._length = 0
+        self.extend(iterable)
 
     def extend(self, iterable):
-        self._data.extend(iterable)
+        """\
+        Appends the bits of another :py:class:`Buffer` or an iterable of bits
+        (0x0 or 0x1).
+        """
+        if isinstance(iterable, Buffer):
+            self.append_bits(iterable._value, iterable._length)
+            return
+        bits = bytes(bytearray(iterable))
+        if bits:
+            self.append_bits(int(bits.translate(_BITS_TO_ASCII), 2), len(bits))
 
     def append_bits(self, val, length):
-        self._data.extend((val >> i) & 1 for i in reversed(range(length)))
+        """\
+        Appends the `length` least significant bits of `val`.
+        """
+        if length > 0:
+            self._value = (self._value << length) | (val & ((1 << length) - 1))
+            self._length += length
+
+    def append_bytes(self, data):
+        """\
+        Appends the bits of the provided bytes.
+        """
+        if data:
+            self.append_bits(int.from_bytes(data, 'big'), len(data) * 8)
 
     def getbits(self):
-        return self._data
+        """\
+        Returns the content as :cls:`bytearray` with one bit per element.
+        """
+        if not self._length:
+            return bytearray()
+        return bytearray('{0:0{1}b}'.format(self._value, self._length)
+                         .encode('ascii').translate(_ASCII_TO_BITS))
 
     def toints(self):
         """\
         Returns an iterable of integers interpreting the content of `seq`
         as sequence of binary numbers of length 8.
         """
-        return (int(''.join(map(str, g)), 2) for g in zip_longest(*[iter(self._data)] * 8, fillvalue=0))
+        # Missing bits of the last integer are zero
+        padding = -self._length % 8
+        return iter((self._value << padding).to_bytes((self._length + padding) // 8, 'big'))
+
+    def __add__(self, other):
+        res = Buffer(self)
+        res.extend(other)
+        return res
 
     def __len__(self):
-        return len(self._data)
+        return self._length
 
     def __getitem__(self, item):
-        return self._data[item]
+        return self.getbits()[item]
 
 
 class _StructuredAppendInfo(tuple):
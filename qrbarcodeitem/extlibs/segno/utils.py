@@ -12,6 +12,7 @@ DOES NOT belong to the public API.
 """
 from __future__ import absolute_import, unicode_literals
 from itertools import chain, repeat
+from operator import getitem
 try:  # pragma: no cover
     range = xrange
 except NameError:  # pragma: no cover
@@ -175,21 +176,61 @@ def matrix_iter_verbose(matrix, version, scale=1, border=None):
             default quiet zone (4 for QR Codes, 2 for Micro QR Codes).
     :raises: :py:exc:`ValueError` if an illegal scale or border value is provided
     """
-    from qrbarcodeitem.extlibs.segno import encoder
     check_valid_border(border)
     scale = int(scale)
     check_valid_scale(scale)
     border = get_border(version, border)
     width, height = get_symbol_size(version, scale=1, border=0)
+    border_bits = bytes(border)
+    light_row = bytes(width + 2 * border)
+    for i, types in enumerate(_get_module_types(version, border), -border):
+        bits = border_bits + bytes(matrix[i]) + border_bits if 0 <= i < height else light_row
+        # Module types are looked up by bit, i.e. (light type, dark type)[bit]
+        types = map(getitem, types, bits)
+        row = tuple(chain.from_iterable(repeat(t, scale) for t in types)) if scale > 1 else tuple(types)
+        for s in repeat(None, scale):
+            yield row
+
+
+# Cache of the module types, see _get_module_types
+_MODULE_TYPES = {}
+
+
+def _get_module_types(version, border):
+    """\
+    Returns the module types of a symbol including the quiet zone.
+
+    The result is a tuple of rows, each row is a tuple which provides the
+    module type of a light and a dark module for each column:
+    ``(light module type, dark module type)``. The module types depend only
+    on the version and the border, so they are created once and cached.
+
+    :param int version: A version constant.
+    :param int border: The border size.
+    :rtype: tuple
+    """
+    key = (version, border)
+    module_types = _MODULE_TYPES.get(key)
+    if module_types is None:
+        module_types = _make_module_types(version, border)
+        _MODULE_TYPES[key] = module_types
+    return module_types
+
+
+def _make_module_types(version, border):
+    """\
+    Creates the module types of a symbol, see :py:func:`_get_module_types`.
+    """
+    from . import encoder
+    width, height = get_symbol_size(version, scale=1, border=0)
     is_micro = version < 1
     # Create an empty matrix with invalid 0x2 values
     alignment_matrix = encoder.make_matrix(version, reserve_regions=False, add_timing=False)
     encoder.add_alignment_patterns(alignment_matrix, version)
 
-    def get_bit(i, j):
+    def get_bit(i, j, val):
         # Check if we operate upon the matrix or the "virtual" border
         if 0 <= i < height and 0 <= j < width:
-            val = matrix[i][j]
             if not is_micro:
                 # Alignment pattern
                 alignment_val = alignment_matrix[i][j]
@@ -225,7 +266,5 @@ def matrix_iter_verbose(matrix, version, scale=1, border=None):
             return consts.TYPE_QUIET_ZONE
 
     size_range = range(-border, width + border)
-    for i in size_range:
-        row = tuple(chain.from_iterable(repeat(get_bit(i, j), scale) for j in size_range))
-        for s in repeat(None, scale):
-            yield row
+    return tuple([tuple([(get_bit(i, j, 0x0), get_bit(i, j, 0x1)) for j in size_range])
+                  for i in size_range])
@@ -23,7 +23,7 @@ import base64
 import gzip
 from xml.sax.saxutils import quoteattr, escape
 from struct import pack
-from itertools import chain, repeat
+from itertools import chain, groupby, repeat
 import functools
 from functools import partial
 from functools import reduce
@@ -169,18 +169,14 @@ def write_svg(matrix, version, out, colormap, scale=1, border=None, xmldecl=True
 
     def matrix_to_lines_verbose():
         j = -.5  # stroke width / 2
-        invalid_color = -1
         for row in matrix_iter_verbose(matrix, version, scale=1, border=border):
-            last_color = invalid_color
-            x1, x2 = 0, 0
+            x1 = 0
             j += 1
-            for c in (colormap[mt] for mt in row):
-                if last_color != invalid_color and last_color != c:
-                    yield last_color, (x1, x2, j)
-                    x1 = x2
-                x2 += 1
-                last_color = c
-            yield last_color, (x1, x2, j)
+            # Runs of modules with the same color
+            for c, run in groupby(map(colormap.__getitem__, row)):
+                x2 = x1 + sum(1 for _ in run)
+                yield c, (x1, x2, j)
+                x1 = x2
 
     width, height, border = _valid_width_height_and_border(version, scale, border)
     unit = unit or ''
@@ -194,6 +190,45 @@ def write_svg(matrix, version, out, colormap, scale=1, border=None, xmldecl=True
     is_multicolor = len(set(colormap.values())) > 2
     need_background = not is_multicolor and colormap[consts.TYPE_QUIET_ZONE] is not None and not draw_transparent
     need_svg_group = scale != 1 and (need_background or is_multicolor)
+    scale_info = ' transform="scale({})"'.format(scale) if scale != 1 else ''
+    p = '<path{}{}'.format(scale_info if not need_svg_group else '',
+                           '' if not lineclass else ' class={}'.format(quoteattr(lineclass)))
+
+    def path_start(color):
+        path = p
+        clr = svg_color(color)
+        if clr is not None:
+            opacity = None
+            if isinstance(clr, tuple):
+                clr, opacity = clr
+            path += ' stroke={}'.format(quoteattr(clr))
+            if opacity is not None:
+                path += ' stroke-opacity={}'.format(quoteattr(str(opacity)))
+        return path + ' d="'
+
+    def background_path(path):
+        # This code is necessary since the path was generated like the other
+        # paths but the background path is special: It has no stroke- but a
+        # fill-color and it needs to be closed. Further, it has no class attribute.
+        return re.sub(r'\sclass="[^"]+"', '',
+                      path.replace('stroke', 'fill')
+                          .replace('"/>', 'v{0}h-{1}z"/>'.format(height // scale, width // scale)))
+
+    svg_start, svg_end = _svg_start_and_end(width, height, unit, xmldecl, omit_encoding, encoding,
+                                            svgns, svgversion, omitsize, svgid, svgclass, title,
+                                            desc, scale_info if need_svg_group else None, nl)
+    dark = colormap[consts.TYPE_DATA_DARK]
+    background = colormap[consts.TYPE_QUIET_ZONE] if need_background else None
+    if not is_multicolor and dark is not None and dark != background:
+        # Common case of two colors: Write the path data row by row instead
+        # of building the whole document in advance
+        with writable(out, 'wt', encoding=encoding) as f:
+            f.write(svg_start)
+            _write_svg_dark_path(f, matrix, border, path_start(dark),
+                                 background_path(path_start(background) + 'M0 0h{}"/>'.format(width // scale))
+                                 if need_background else None)
+            f.write(svg_end)
+        return
     if is_multicolor:
         miter = matrix_to_lines_verbose()
     else:
@@ -216,20 +251,8 @@ def write_svg(matrix, version, out, colormap, scale=1, border=None, xmldecl=True
         except KeyError:
             pass
     paths = {}
-    scale_info = ' transform="scale({})"'.format(scale) if scale != 1 else ''
-    p = '<path{}{}'.format(scale_info if not need_svg_group else '',
-                           '' if not lineclass else ' class={}'.format(quoteattr(lineclass)))
     for color, coord in coordinates.items():
-        path = p
-        clr = svg_color(color)
-        if clr is not None:
-            opacity = None
-            if isinstance(clr, tuple):
-                clr, opacity = clr
-            path += ' stroke={}'.format(quoteattr(clr))
-            if opacity is not None:
-                path += ' stroke-opacity={}'.format(quoteattr(str(opacity)))
-        path += ' d="'
+        path = path_start(color)
         path += ''.join('{moveto}{x} {y}h{l}'.format(moveto=('m' if i > 0 else 'M'),
                                                      x=x, l=length,
                                                      y=(int(y) if int(y) == y else y))
@@ -237,13 +260,18 @@ def write_svg(matrix, version, out, colormap, scale=1, border=None, xmldecl=True
         path += '"/>'
         paths[color] = path
     if need_background:
-        # This code is necessary since the path was generated by the loop above
-        # but the background path is special: It has no stroke- but a fill-color
-        # and it needs to be closed. Further, it has no class attribute.
         k = colormap[consts.TYPE_QUIET_ZONE]
-        paths[k] = re.sub(r'\sclass="[^"]+"', '',
-                          paths[k].replace('stroke', 'fill')
-                                  .replace('"/>', 'v{0}h-{1}z"/>'.format(height // scale, width // scale)))
+        paths[k] = background_path(paths[k])
+    with writable(out, 'wt', encoding=encoding) as f:
+        f.write(svg_start + ''.join(sorted(paths.values(), key=len)) + svg_end)
+
+
+def _svg_start_and_end(width, height, unit, xmldecl, omit_encoding, encoding, svgns,
+                       svgversion, omitsize, svgid, svgclass, title, desc, group_scale_info, nl):
+    """\
+    Returns the start of the SVG document up to the first path and the end
+    of the document, see :py:func:`write_svg` for the parameters.
+    """
     svg = ''
     if xmldecl:
         svg += '<?xml version="1.0"'
@@ -268,16 +296,93 @@ def write_svg(matrix, version, out, colormap, scale=1, border=None, xmldecl=True
         svg += '<title>{}</title>'.format(escape(title))
     if desc is not None:
         svg += '<desc>{}</desc>'.format(escape(desc))
-    if need_svg_group:
-        svg += '<g{}>'.format(scale_info)
-    svg += ''.join(sorted(paths.values(), key=len))
-    if need_svg_group:
-        svg += '</g>'
-    svg += '</svg>'
+    svg_end = '</svg>'
+    if group_scale_info is not None:
+        svg += '<g{}>'.format(group_scale_info)
+        svg_end = '</g>' + svg_end
     if nl:
-        svg += '\n'
-    with writable(out, 'wt', encoding=encoding) as f:
-        f.write(svg)
+        svg_end += '\n'
+    return svg, svg_end
+
+
+def _svg_path_rows(path_start, matrix, border):
+    """\
+    Returns an iterable of strings which form the path of the dark modules.
+
+    The first string is the start of the path element, the others contain
+    the path data of one row; the last one closes the element.
+
+    :param str path_start: Start of the path element up to the path data.
+    :param matrix: An iterable of bytearrays.
+    :param int border: Size of the quiet zone.
+    """
+    yield path_start
+    x, y = 0, 0  # End of the previous line
+    moveto = 'M'
+    row = []
+    for (x1, y1), (x2, y2) in matrix_to_lines(matrix, border, border + .5):
+        if y1 != y and row:
+            yield ''.join(row)
+            row = []
+        dy = y1 - y
+        row.append('{moveto}{x} {y}h{l}'.format(moveto=moveto, x=x1 - x, l=x2 - x1,
+                                                 y=(int(dy) if int(dy) == dy else dy)))
+        moveto = 'm'
+        x, y = x2, y1
+    row.append('"/>')
+    yield ''.join(row)
+
+
+def _write_chunked(write, strings, chunk_size=8192):
+    """\
+    Writes the strings in chunks of about `chunk_size` characters to avoid
+    the overhead of many small writes.
+    """
+    chunk, length = [], 0
+    for string in strings:
+        chunk.append(string)
+        length += len(string)
+        if length >= chunk_size:
+            write(''.join(chunk))
+            chunk, length = [], 0
+    if chunk:
+        write(''.join(chunk))
+
+
+def _write_svg_dark_path(f, matrix, border, path_start, bg_path):
+    """\
+    Writes the path of the dark modules and the background path (if any).
+
+    The paths are written in the same order as the (non-streaming)
+    :py:func:`write_svg` code which sorts the paths by length. Since the
+    background path is short, only the start of the dark path is kept in
+    memory until it is known which path comes first. Afterwards, the rows
+    are written in small chunks.
+
+    :param f: File-like object supporting to write strings.
+    :param matrix: An iterable of bytearrays.
+    :param int border: Size of the quiet zone.
+    :param str path_start: Start of the path element up to the path data.
+    :param bg_path: The background path or ``None``.
+    """
+    write = f.write
+    rows = _svg_path_rows(path_start, matrix, border)
+    if bg_path is None:
+        _write_chunked(write, rows)
+        return
+    held, held_length = [], 0
+    for row in rows:
+        held.append(row)
+        held_length += len(row)
+        if held_length > len(bg_path):
+            break
+    if held_length > len(bg_path):
+        write(bg_path)
+        write(''.join(held))
+        _write_chunked(write, rows)
+    else:
+        write(''.join(held))
+        write(bg_path)
 
 
 _replace_quotes = partial(re.compile(br'(=)"([^"]+)"').sub, br"\1'\2'")
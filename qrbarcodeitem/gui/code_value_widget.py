@@ -26,7 +26,8 @@ from qgis.PyQt.QtWidgets import (
     QWidget
 )
 from qgis.PyQt.QtCore import (
-    pyqtSignal
+    pyqtSignal,
+    QTimer
 )
 from qgis.gui import (
     QgsExpressionBuilderDialog,
@@ -36,12 +37,24 @@ from qgis.core import QgsApplication
 
 
 class CodeValueWidget(QWidget):
-    """Widget for specifying barcode or QR code values."""
+    """
+    Widget for specifying barcode or QR code values. The 'value_changed'
+    signal is only emitted once the user has stopped typing for the
+    debounce interval, so that the barcode is not encoded on every
+    keystroke.
+    """
     value_changed = pyqtSignal(str)
 
+    # Delay, in milliseconds, after the last edit before emitting the value
+    DEF_DEBOUNCE_INTERVAL = 300
+
     def __init__(self, item_widget):
         super().__init__(item_widget)
         self._item_widget = item_widget
+        self._debounce_timer = QTimer(self)
+        self._debounce_timer.setSingleShot(True)
+        self._debounce_timer.setInterval(self.DEF_DEBOUNCE_INTERVAL)
+        self._debounce_timer.timeout.connect(self._emit_value_changed)
         self._value_text_edit = QTextEdit()
         self._value_text_edit.setLineWrapMode(
             QTextEdit.LineWrapMode.WidgetWidth
@@ -71,6 +84,26 @@ class CodeValueWidget(QWidget):
         """
         return self._value_text_edit
 
+    @property
+    def debounce_interval(self):
+        """
+        :return: Returns the delay, in milliseconds, after the last edit
+        before the value_changed signal is emitted.
+        :rtype: int
+        """
+        return self._debounce_timer.interval()
+
+    @debounce_interval.setter
+    def debounce_interval(self, interval):
+        """
+        Sets the delay after the last edit before the value_changed signal
+        is emitted.
+        :param interval: Delay in milliseconds, 0 to emit the signal once
+        control returns to the event loop.
+        :type interval: int
+        """
+        self._debounce_timer.setInterval(interval)
+
     @property
     def code_value(self):
         """
@@ -106,9 +139,22 @@ class CodeValueWidget(QWidget):
         self._value_text_edit.setStyleSheet(stylesheet)
 
     def _on_code_value_changed(self):
-        # Slot raised when the code value changes.
-        code_txt = self.code_value
-        self.value_changed.emit(code_txt)
+        # Slot raised when the code value changes, restarts the timer so
+        # that only the last of successive edits is emitted.
+        self._debounce_timer.start()
+
+    def _emit_value_changed(self):
+        # Slot raised when the user has stopped editing the code value.
+        self.value_changed.emit(self.code_value)
+
+    def flush(self):
+        """
+        Immediately emits the value_changed signal if there is an edit
+        that has not been emitted yet.
+        """
+        if self._debounce_timer.isActive():
+            self._debounce_timer.stop()
+            self._emit_value_changed()
 
     def _on_insert_expression(self):
         # Slot raised to insert an expression.
@@ -149,3 +195,6 @@ class CodeValueWidget(QWidget):
         :type status: bool
         """
         self._value_text_edit.blockSignals(status)
+        # Discard edits that have not been emitted
+        if status:
+            self._debounce_timer.stop()
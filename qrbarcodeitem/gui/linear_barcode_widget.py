@@ -144,6 +144,8 @@ class LinearBarcodeLayoutItemWidget(QgsLayoutItemBaseWidget): # pylint: disable=
         if item.type() != LINEAR_BARCODE_TYPE:
             return False
 
+        # Apply pending edits to the previous item
+        self._cd_value_widget.flush()
         self._barcode_item = item
         self._prop_widget.setItem(self._barcode_item)
         self._update_gui_values()
@@ -229,17 +231,19 @@ class LinearBarcodeLayoutItemWidget(QgsLayoutItemBaseWidget): # pylint: disable=
             return
 
         # Check valid characters
-        valid_chars = []
-        for ch in cd_val:
-            if self._current_meta.is_character_allowed(ch):
-                valid_chars.append(ch)
-
-        sanitized_txt = ''.join(valid_chars)
+        sanitized_txt, invalid_positions = \
+            self._current_meta.validator().validate(cd_val)
 
         # Notify user if there were invalid chars
-        if len(sanitized_txt) != len(cd_val):
+        if invalid_positions:
+            positions = ', '.join(str(p + 1) for p in invalid_positions[:10])
+            if len(invalid_positions) > 10:
+                positions = f'{positions}...'
             self.add_warning_message(
-                self.tr('Barcode data contains invalid characters.')
+                self.tr(
+                    f'Barcode data contains invalid characters at '
+                    f'position(s) {positions}.'
+                )
             )
             is_invalid = True
 
@@ -275,7 +279,7 @@ class LinearBarcodeLayoutItemWidget(QgsLayoutItemBaseWidget): # pylint: disable=
         self._barcode_item.blockSignals(True)
         try:
             self._barcode_item.barcode_type = self._current_meta.type_id()
-            self._barcode_item.code_value = user_value
+            self._barcode_item.set_code_value(user_value, background=True)
         except BarcodeException as bc_ex:
             self.add_warning_message(str(bc_ex))
             is_invalid = True
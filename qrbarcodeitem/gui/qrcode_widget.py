@@ -18,6 +18,8 @@ email                : gkahiu@gmail.com
  ***************************************************************************/
 """
 from qgis.PyQt.QtWidgets import (
+    QCheckBox,
+    QComboBox,
     QGridLayout,
     QLabel,
     QVBoxLayout
@@ -34,6 +36,8 @@ from qgis.gui import (
 from qgis.core import (
     QgsLayoutItem
 )
+from qrbarcodeitem.layout.abstract_barcode import BarcodeException
+from qrbarcodeitem.layout.encoders import qrcode_designator
 from qrbarcodeitem.layout.qrcode_item import QR_CODE_TYPE
 from qrbarcodeitem.gui.code_value_widget import CodeValueWidget
 from qrbarcodeitem.utils import color_from_name
@@ -41,6 +45,14 @@ from qrbarcodeitem.utils import color_from_name
 
 class QrCodeLayoutItemWidget(QgsLayoutItemBaseWidget): # pylint: disable=too-few-public-methods
     """Widget for configuring a QrCodeLayoutItem."""
+
+    # Versions, error levels and number of mask patterns by QR code type
+    _MICRO_VERSIONS = ('M1', 'M2', 'M3', 'M4')
+    _VERSIONS = tuple(str(v) for v in range(1, 41))
+    _MICRO_ERROR_LEVELS = ('L', 'M', 'Q')
+    _ERROR_LEVELS = ('L', 'M', 'Q', 'H')
+    _ERROR_RECOVERY = {'L': 7, 'M': 15, 'Q': 25, 'H': 30}
+
     def __init__(self, parent, layout_object):
         super().__init__(parent, layout_object)
         self._qrcode_item = layout_object
@@ -62,10 +74,14 @@ class QrCodeLayoutItemWidget(QgsLayoutItemBaseWidget): # pylint: disable=too-few
         self._cd_value_widget.value_changed.connect(
             self._on_code_value_changed
         )
+        # Version and remaining capacity for the current value
+        self._capacity_lbl = QLabel()
+        self._capacity_lbl.setWordWrap(True)
         value_groupbox = QgsCollapsibleGroupBoxBasic(self.tr('Data'))
         gp_layout = QVBoxLayout()
         gp_layout.setContentsMargins(0, 0, 0, 0)
         gp_layout.addWidget(self._cd_value_widget)
+        gp_layout.addWidget(self._capacity_lbl)
         value_groupbox.setLayout(gp_layout)
 
         # Item appearance
@@ -101,6 +117,8 @@ class QrCodeLayoutItemWidget(QgsLayoutItemBaseWidget): # pylint: disable=too-few
 
         appearance_groupbox.setLayout(appearance_layout)
 
+        encoding_groupbox = self._setup_encoding_group()
+
         # Properties widget
         self._prop_widget = QgsLayoutItemPropertiesWidget(self, layout_object)
         self._prop_widget.showBackgroundGroup(False)
@@ -110,12 +128,60 @@ class QrCodeLayoutItemWidget(QgsLayoutItemBaseWidget): # pylint: disable=too-few
         layout.setContentsMargins(0, 0, 0, 0)
         layout.addWidget(lbl_title)
         layout.addWidget(value_groupbox)
+        layout.addWidget(encoding_groupbox)
         layout.addWidget(appearance_groupbox)
         layout.addWidget(self._prop_widget)
 
         # Set layout
         self.setLayout(layout)
 
+    def _setup_encoding_group(self):
+        """
+        Creates the group box for the encoding options i.e. micro QR code,
+        version, error correction level, boost and mask pattern.
+        :return: Returns the encoding group box.
+        :rtype: QgsCollapsibleGroupBoxBasic
+        """
+        encoding_groupbox = QgsCollapsibleGroupBoxBasic(self.tr('Encoding'))
+        encoding_layout = QGridLayout()
+        self._chk_micro = QCheckBox(self.tr('Micro QR code'))
+        self._chk_micro.stateChanged.connect(self._on_micro_changed)
+        encoding_layout.addWidget(self._chk_micro, 0, 0, 1, 2)
+
+        lbl_version = QLabel(self.tr('Version'))
+        self._version_cbo = QComboBox()
+        self._version_cbo.currentIndexChanged.connect(
+            self._on_version_changed
+        )
+        encoding_layout.addWidget(lbl_version, 1, 0)
+        encoding_layout.addWidget(self._version_cbo, 1, 1)
+
+        lbl_error = QLabel(self.tr('Error correction'))
+        self._error_cbo = QComboBox()
+        self._error_cbo.currentIndexChanged.connect(
+            self._on_error_level_changed
+        )
+        encoding_layout.addWidget(lbl_error, 2, 0)
+        encoding_layout.addWidget(self._error_cbo, 2, 1)
+
+        self._chk_boost_error = QCheckBox(
+            self.tr('Boost error correction level')
+        )
+        self._chk_boost_error.stateChanged.connect(
+            self._on_boost_error_changed
+        )
+        encoding_layout.addWidget(self._chk_boost_error, 3, 0, 1, 2)
+
+        lbl_mask = QLabel(self.tr('Mask pattern'))
+        self._mask_cbo = QComboBox()
+        self._mask_cbo.currentIndexChanged.connect(self._on_mask_changed)
+        encoding_layout.addWidget(lbl_mask, 4, 0)
+        encoding_layout.addWidget(self._mask_cbo, 4, 1)
+        encoding_layout.setColumnStretch(1, 1)
+        encoding_groupbox.setLayout(encoding_layout)
+
+        return encoding_groupbox
+
     def _on_code_value_changed(self, txt):
         # Slot raised when the code value changes.
         self._qrcode_item.beginCommand(
@@ -123,9 +189,166 @@ class QrCodeLayoutItemWidget(QgsLayoutItemBaseWidget): # pylint: disable=too-few
             QgsLayoutItem.UndoLabelText
         )
         self._qrcode_item.blockSignals(True)
-        self._qrcode_item.code_value = txt
+        self._qrcode_item.set_code_value(txt, background=True)
         self._qrcode_item.blockSignals(False)
         self._qrcode_item.endCommand()
+        self._update_capacity_info()
+
+    def _update_capacity_info(self):
+        # Shows the version and remaining capacity of the QR code for the
+        # current value, which is computed without encoding the value.
+        value = self._qrcode_item.computed_value()
+        if not value:
+            self._capacity_lbl.clear()
+            return
+
+        is_invalid = False
+        try:
+            fit = self._qrcode_item.version_fit(value)
+            if fit is not None:
+                info = self.tr(
+                    'Version {0}, {1} bits remaining.'
+                ).format(qrcode_designator(fit), fit.remaining)
+                if not self._qrcode_item.is_micro and \
+                        self._qrcode_item.capacity_plan(value).micro:
+                    info = self.tr('{0} Fits in a micro QR code.').format(
+                        info
+                    )
+            elif self._qrcode_item.version is not None:
+                info = self.tr('Data too large for version {0}.').format(
+                    self._qrcode_item.version
+                )
+                is_invalid = True
+            elif self._qrcode_item.is_micro:
+                info = self.tr('Data too large for a micro QR code.')
+                is_invalid = True
+            else:
+                info = self.tr('Data too large for a QR code.')
+                is_invalid = True
+        except BarcodeException as bc_ex:
+            info = str(bc_ex)
+            is_invalid = True
+
+        self._capacity_lbl.setStyleSheet(
+            'color:#ff0000;' if is_invalid else ''
+        )
+        self._capacity_lbl.setText(info)
+
+    def _populate_encoding_widgets(self):
+        # Loads the versions, error levels and masks supported by the QR
+        # code type of the item and selects the current values.
+        is_micro = self._qrcode_item.is_micro
+        versions = self._MICRO_VERSIONS if is_micro else self._VERSIONS
+        levels = self._MICRO_ERROR_LEVELS if is_micro \
+            else self._ERROR_LEVELS
+        mask_count = 4 if is_micro else 8
+
+        self._version_cbo.blockSignals(True)
+        self._version_cbo.clear()
+        self._version_cbo.addItem(self.tr('Automatic'), None)
+        for version in versions:
+            self._version_cbo.addItem(version, version)
+        self._version_cbo.setCurrentIndex(
+            max(self._version_cbo.findData(self._qrcode_item.version), 0)
+        )
+        self._version_cbo.blockSignals(False)
+
+        self._error_cbo.blockSignals(True)
+        self._error_cbo.clear()
+        self._error_cbo.addItem(self.tr('Automatic'), None)
+        for level in levels:
+            self._error_cbo.addItem(
+                self.tr('{0} (recovers {1}% of data)').format(
+                    level,
+                    self._ERROR_RECOVERY[level]
+                ),
+                level
+            )
+        self._error_cbo.setCurrentIndex(
+            max(self._error_cbo.findData(self._qrcode_item.error_level), 0)
+        )
+        self._error_cbo.blockSignals(False)
+
+        self._mask_cbo.blockSignals(True)
+        self._mask_cbo.clear()
+        self._mask_cbo.addItem(self.tr('Automatic'), None)
+        for mask in range(mask_count):
+            self._mask_cbo.addItem(str(mask), mask)
+        self._mask_cbo.setCurrentIndex(
+            max(self._mask_cbo.findData(self._qrcode_item.mask), 0)
+        )
+        self._mask_cbo.blockSignals(False)
+
+    def _set_item_property(self, name, value, command_text):
+        # Sets a property of the item as an undoable command.
+        self._qrcode_item.beginCommand(
+            command_text,
+            QgsLayoutItem.UndoCustomCommand
+        )
+        self._qrcode_item.blockSignals(True)
+        self._qrcode_item.begin_update()
+        setattr(self._qrcode_item, name, value)
+        self._qrcode_item.end_update(background=True)
+        self._qrcode_item.blockSignals(False)
+        self._qrcode_item.endCommand()
+        self._update_capacity_info()
+
+    def _on_micro_changed(self, state): # pylint: disable=unused-argument
+        # Slot raised when the QR code type changes. Options that are not
+        # supported by the new type are reset to automatic.
+        is_micro = self._chk_micro.isChecked()
+        self._qrcode_item.beginCommand(
+            self.tr('Change QR code type'),
+            QgsLayoutItem.UndoCustomCommand
+        )
+        self._qrcode_item.blockSignals(True)
+        # Encode the code once, in the background, for all the changes
+        self._qrcode_item.begin_update()
+        self._qrcode_item.version = None
+        if is_micro:
+            if self._qrcode_item.error_level not in self._MICRO_ERROR_LEVELS:
+                self._qrcode_item.error_level = None
+            if self._qrcode_item.mask is not None and \
+                    self._qrcode_item.mask > 3:
+                self._qrcode_item.mask = None
+        self._qrcode_item.is_micro = is_micro
+        self._qrcode_item.end_update(background=True)
+        self._qrcode_item.blockSignals(False)
+        self._qrcode_item.endCommand()
+        self._populate_encoding_widgets()
+        self._update_capacity_info()
+
+    def _on_version_changed(self, index):
+        # Slot raised when the version changes.
+        self._set_item_property(
+            'version',
+            self._version_cbo.itemData(index),
+            self.tr('Change QR code version')
+        )
+
+    def _on_error_level_changed(self, index):
+        # Slot raised when the error correction level changes.
+        self._set_item_property(
+            'error_level',
+            self._error_cbo.itemData(index),
+            self.tr('Change error correction level')
+        )
+
+    def _on_boost_error_changed(self, state): # pylint: disable=unused-argument
+        # Slot raised when boosting of the error level is toggled.
+        self._set_item_property(
+            'boost_error',
+            self._chk_boost_error.isChecked(),
+            self.tr('Change boost error correction level')
+        )
+
+    def _on_mask_changed(self, index):
+        # Slot raised when the mask pattern changes.
+        self._set_item_property(
+            'mask',
+            self._mask_cbo.itemData(index),
+            self.tr('Change mask pattern')
+        )
 
     def setNewItem(self, item):
         """
@@ -134,6 +357,8 @@ class QrCodeLayoutItemWidget(QgsLayoutItemBaseWidget): # pylint: disable=too-few
         if item.type() != QR_CODE_TYPE:
             return False
 
+        # Apply pending edits to the previous item
+        self._cd_value_widget.flush()
         self._qrcode_item = item
         self._prop_widget.setItem(self._qrcode_item)
         self._update_gui_values()
@@ -150,6 +375,15 @@ class QrCodeLayoutItemWidget(QgsLayoutItemBaseWidget): # pylint: disable=too-few
         )
         self._cd_value_widget.block_value_widget_signals(False)
 
+        self._chk_micro.blockSignals(True)
+        self._chk_micro.setChecked(self._qrcode_item.is_micro)
+        self._chk_micro.blockSignals(False)
+        self._chk_boost_error.blockSignals(True)
+        self._chk_boost_error.setChecked(self._qrcode_item.boost_error)
+        self._chk_boost_error.blockSignals(False)
+        self._populate_encoding_widgets()
+        self._update_capacity_info()
+
         self._data_clr_btn.blockSignals(True)
         self._data_clr_btn.setColor(
             color_from_name(self._qrcode_item.data_color, '#000000')
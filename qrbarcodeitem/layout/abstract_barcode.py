@@ -18,12 +18,14 @@ email                : gkahiu@gmail.com
  ***************************************************************************/
 """
 from qgis.PyQt.QtCore import (
+    QBuffer,
+    QByteArray,
     QCoreApplication,
+    QDir,
+    QIODevice,
     QPointF,
     QRect,
-    QStandardPaths,
     QSize,
-    QTemporaryFile,
     Qt,
     QUuid
 )
@@ -32,15 +34,39 @@ from qgis.PyQt.QtGui import (
     QPainter
 )
 from qgis.PyQt.QtSvg import QSvgGenerator
+from qgis.PyQt.QtWidgets import QGraphicsItem
 from qgis.core import (
     Qgis,
-    QgsExpression,
     QgsLayoutItem,
     QgsLayoutItemPicture,
+    QgsLayoutObject,
     QgsMessageLog
 )
 
-from qrbarcodeitem.layout.svg_tracker import SvgFileTracker
+from qrbarcodeitem.layout.code_expression import CompiledCodeValue
+from qrbarcodeitem.layout.encoders import EncodingError
+from qrbarcodeitem.layout.render_mixin import BarcodeRenderMixin
+from qrbarcodeitem.layout.svg_tracker import (
+    SvgFileTracker,
+    svg_temp_dir
+)
+
+# Embedded 'base64:' picture sources are supported from QGIS 3.16
+SUPPORTS_EMBEDDED_SVG = Qgis.QGIS_VERSION_INT >= 31600
+
+# Item render modes, the barcode is either rendered from an SVG document
+# or painted directly.
+RENDER_MODE_SVG = 'svg'
+RENDER_MODE_PAINTER = 'painter'
+
+
+def _release_item_file(item_id):
+    # Slot that releases the SVG file shown by a deleted item. It does not
+    # reference the item which no longer exists when it is called.
+    def release(*args): # pylint: disable=unused-argument
+        SvgFileTracker.instance().set_item_file(item_id, None)
+
+    return release
 
 
 class BarcodeException(Exception):
@@ -48,16 +74,33 @@ class BarcodeException(Exception):
     pass
 
 
-class AbstractBarcodeLayoutItem(QgsLayoutItemPicture):
-    """Base class for barcode layout."""
+class AbstractBarcodeLayoutItem(BarcodeRenderMixin, QgsLayoutItemPicture): # pylint: disable=abstract-method
+    """
+    Base class for barcode layout. Encoding and caching of the barcode
+    content is provided by BarcodeRenderMixin.
+    """
 
     def __init__(self, layout):
         super().__init__(layout)
         self._code_value = ''
-        temp_location = QStandardPaths.writableLocation(
-            QStandardPaths.StandardLocation.TempLocation
-        )
-        self._temp_dir = f'{temp_location}/qrbarbarcode'
+        self._compiled_value = None
+        self._temp_dir = svg_temp_dir()
+        self._in_memory = SUPPORTS_EMBEDDED_SVG
+        self._render_mode = RENDER_MODE_SVG
+        # Key of the value and render options of the current picture
+        self._render_key = None
+        self._render_value = None
+        # Shape of the barcode when it is painted directly
+        self._shape = None
+        # Identifies the item in the SVG file tracker, unlike uuid() it does
+        # not change when the item is read from XML or pasted.
+        self._tracker_id = QUuid.createUuid().toString()
+        self._shown_file = None
+        # Number of nested begin_update calls and whether the barcode has to
+        # be generated when the last one ends.
+        self._update_depth = 0
+        self._update_pending = False
+        self.destroyed.connect(_release_item_file(self._tracker_id))
 
         # Set picture properties
         self.setResizeMode(QgsLayoutItemPicture.Zoom)
@@ -72,6 +115,65 @@ class AbstractBarcodeLayoutItem(QgsLayoutItemPicture):
         """
         return self._temp_dir
 
+    @property
+    def in_memory(self):
+        """
+        :return: Returns True if the generated SVG is passed to the picture
+        renderer directly from memory, else False if it is written to a
+        file in the temp dir.
+        :rtype: bool
+        """
+        return self._in_memory
+
+    @in_memory.setter
+    def in_memory(self, status):
+        """
+        Set True to render the SVG in memory without writing it to a file
+        in the temp dir. Only applicable in QGIS versions that support
+        embedded picture sources, otherwise it is ignored.
+        :param status: True to render in memory, else False.
+        :type status: bool
+        """
+        status = status and SUPPORTS_EMBEDDED_SVG
+        if self._in_memory != status:
+            self._in_memory = status
+            self._render_key = None
+            self.update_item()
+
+    @property
+    def render_mode(self):
+        """
+        :return: Returns the mode for rendering the barcode, either
+        RENDER_MODE_SVG or RENDER_MODE_PAINTER.
+        :rtype: str
+        """
+        return self._render_mode
+
+    @render_mode.setter
+    def render_mode(self, mode):
+        """
+        Sets the mode for rendering the barcode. In RENDER_MODE_PAINTER,
+        the barcode is painted directly on the layout without generating,
+        and parsing, an SVG document.
+        :param mode: Either RENDER_MODE_SVG or RENDER_MODE_PAINTER.
+        :type mode: str
+        """
+        if mode not in (RENDER_MODE_SVG, RENDER_MODE_PAINTER):
+            raise ValueError(f'Invalid render mode: {mode}')
+
+        if self._render_mode != mode:
+            self._render_mode = mode
+            self._render_key = None
+            self.update_item()
+
+    def is_painted(self):
+        """
+        :return: Returns True if the barcode is painted directly, else
+        False if it is rendered from an SVG document.
+        :rtype: bool
+        """
+        return self._render_mode == RENDER_MODE_PAINTER
+
     @property
     def code_value(self):
         """
@@ -88,16 +190,40 @@ class AbstractBarcodeLayoutItem(QgsLayoutItemPicture):
         :param value: Absolute value or expression text.
         :type value: str
         """
+        self.set_code_value(value)
+
+    def set_code_value(self, value, background=False):
+        """
+        Sets the code value and generates the corresponding barcode.
+        :param value: Absolute value or expression text.
+        :type value: str
+        :param background: True to encode the barcode in a background task
+        e.g. when the value is being edited in the layout designer, else
+        False to encode it immediately.
+        :type background: bool
+        """
         if value == self._code_value:
             return
 
         self._code_value = value
-        self.generate_code()
+        self._compiled_value = None
+        if background:
+            self.generate_code_async()
+        else:
+            self.generate_code()
+
+    def _gen_svg_path(self, name=None):
+        """
+        Generate a file path in temp folder.
+        :param name: Base name of the file, a unique name will be generated
+        if not specified.
+        :type name: str
+        """
+        QDir().mkpath(self._temp_dir)
+        if not name:
+            name = QUuid.createUuid().toString()
 
-    def _gen_svg_path(self):
-        """Generate a file path in temp folder."""
-        uuid = QUuid.createUuid().toString()
-        return f'{self._temp_dir}/{uuid}.svg'
+        return f'{self._temp_dir}/{name}.svg'
 
     def computed_value(self):
         """
@@ -107,6 +233,18 @@ class AbstractBarcodeLayoutItem(QgsLayoutItemPicture):
         """
         return self.evaluate_expression(self._code_value)
 
+    @property
+    def compiled_value(self):
+        """
+        :return: Returns the code_value parsed into literal text and
+        expressions. It is only compiled once for each code_value.
+        :rtype: CompiledCodeValue
+        """
+        if self._compiled_value is None:
+            self._compiled_value = CompiledCodeValue(self._code_value)
+
+        return self._compiled_value
+
     def evaluate_expression(self, value):
         """
         Computes the resulting value based on the current expression context.
@@ -115,76 +253,247 @@ class AbstractBarcodeLayoutItem(QgsLayoutItemPicture):
         :return: Returns the value based on the current expression context.
         :rtype: str
         """
-        exp_ctx = self.createExpressionContext()
+        if value == self._code_value:
+            compiled_value = self.compiled_value
+        else:
+            compiled_value = CompiledCodeValue(value)
 
-        return QgsExpression.replaceExpressionText(
-            value,
-            exp_ctx
-        )
+        # Static values do not require an expression context
+        if compiled_value.is_static():
+            return compiled_value.text
+
+        return compiled_value.evaluate(self.createExpressionContext())
 
     def update_item(self):
         """
         Generates the barcode and refreshes the item if data has been
-        specified.
+        specified. This is deferred until 'end_update' if several
+        properties are being changed.
         """
-        if self.computed_value():
-            self.generate_code()
+        if self._update_depth > 0:
+            self._update_pending = True
+            return
+
+        value = self.computed_value()
+        if value:
+            self.generate_code(value)
         else:
-            self.setPicturePath('')
+            self._clear_picture()
+
+    def begin_update(self):
+        """
+        Defers generating the barcode when several properties are changed
+        at once so that it is only generated once in 'end_update'.
+        """
+        self._update_depth += 1
+
+    def end_update(self, background=False):
+        """
+        Generates the barcode, if any property changed since the matching
+        'begin_update' call, once all nested updates have ended.
+        :param background: True to encode the barcode in a background task
+        e.g. when the properties are changed in the layout designer, else
+        False to encode it immediately.
+        :type background: bool
+        """
+        self._update_depth = max(0, self._update_depth - 1)
+        if self._update_depth > 0 or not self._update_pending:
+            return
+
+        self._update_pending = False
+        if background:
+            self.generate_code_async()
+        else:
+            self.update_item()
 
     def refreshPicture(self, exp_ctx=None): # pylint: disable=unused-argument
         """Override default behaviour for refreshing the item."""
         self.update_item()
 
+    def refreshDataDefinedProperty(
+            self,
+            prop=QgsLayoutObject.AllProperties
+    ):
+        """
+        Override default behaviour so that the picture is not reloaded, the
+        source of the picture is the generated barcode.
+        """
+        if prop == QgsLayoutObject.PictureSource:
+            return
+        if prop == QgsLayoutObject.AllProperties:
+            # Picture properties only apply to the picture source
+            QgsLayoutItem.refreshDataDefinedProperty(self, prop)
+            return
+
+        super().refreshDataDefinedProperty(prop)
+
     def refresh(self):
         """
-        Refresh item.
+        Refresh item. The picture is only generated, and the cached
+        rendering invalidated, if the evaluated value or render options
+        have changed.
         """
-        super().refresh()
-        self.invalidateCache()
+        render_key = self._render_key
+        # Skip reloading the picture in QgsLayoutItemPicture.refresh
+        QgsLayoutItem.refresh(self)
         self.update_item()
+        if render_key is None or render_key != self._render_key:
+            self.invalidateCache()
 
-    def generate_code(self):
+    def generate_code(self, value=None):
         """
         Generates the barcode image and sets the image in the picture item.
+        SVG content is reused from the process-wide cache if a barcode with
+        the same value and render options has already been generated. This
+        is a no-op if the value and render options are similar to those of
+        the current picture.
+        :param value: Computed value of the barcode, it will be evaluated
+        from the code_value if not specified.
+        :type value: str
         :return: Returns True if the code was successfully generated, else
         False.
         :rtype: bool
         """
         status = False
-        if not self.computed_value():
-            self.setPicturePath('')
+        # Supersedes any pending background encoding
+        self.cancel_encoding()
+        if value is None:
+            value = self.computed_value()
+        if not value:
+            self._clear_picture()
             return status
 
-        svg_file = QTemporaryFile()
+        key = self.render_key(value)
+        if key == self._render_key:
+            return True
+
         try:
-            if svg_file.open():
-                svg_path = f'{svg_file.fileName()}.svg'
-                self._gen_image(svg_path)
-                self.setPicturePath(svg_path)
-                SvgFileTracker.instance().add_file(svg_path)
-                status = True
+            if self.is_painted():
+                self._set_shape(key, value)
+                return True
+
+            svg_source = self.cached_svg(key)
+            if svg_source is None:
+                svg_source = self.cache_svg(key, self.render_svg(value))
+            self._set_svg(key, value, svg_source)
+            status = True
         except BarcodeException as bc_ex:
-            # Set error image
-            self.set_error_image()
-            QgsMessageLog.logMessage(
-                repr(bc_ex),
-                'QRBarcodeItem',
-                level=Qgis.Critical
-            )
-        finally:
-            svg_file.close()
+            self._set_encoding_error(bc_ex)
 
         return status
 
-    def _gen_image(self, file_path):
+    def _set_svg(self, key, value, svg_source):
+        # Sets the item picture from the cached SVG content.
+        self._shape = None
+        if self._in_memory:
+            self.set_svg_data(svg_source)
+            self._show_file(None)
+        else:
+            self.setPicturePath(svg_source)
+            self._show_file(svg_source)
+        self._render_key = key
+        self._render_value = value
+
+    def _set_encoding_error(self, bc_ex):
+        # Sets the error image and logs the exception.
+        self.set_error_image()
+        QgsMessageLog.logMessage(
+            repr(bc_ex),
+            'QRBarcodeItem',
+            level=Qgis.Critical
+        )
+
+    def _clear_picture(self):
+        # Removes the barcode from the item.
+        self._render_key = None
+        self._shape = None
+        self.setPicturePath('')
+        self._show_file(None)
+
+    def _set_shape(self, key, value):
+        # Sets the shape of the barcode to be painted.
+        shape = self.cached_shape(key, value)
+
+        # Release the picture of the previous render mode
+        if self.picturePath():
+            self.setPicturePath('')
+            self._show_file(None)
+        self._shape = shape
+        self._render_key = key
+        self._render_value = value
+        self.update()
+
+    def _show_file(self, file_path):
+        # Records the SVG file shown by the item so that the previous one
+        # can be deleted if it is no longer used.
+        self._shown_file = file_path
+        SvgFileTracker.instance().set_item_file(self._tracker_id, file_path)
+
+    def itemChange(self, change, value):
+        """
+        Releases the SVG file shown by the item when it is removed from the
+        layout so that it can be evicted, it is shown again if the item is
+        added back.
+        """
+        if change == QGraphicsItem.GraphicsItemChange.ItemSceneHasChanged:
+            SvgFileTracker.instance().set_item_file(
+                self._tracker_id,
+                None if value is None else self._shown_file
+            )
+
+        return super().itemChange(change, value)
+
+    def render_geometry(self, value):
+        """
+        Generates the geometry for painting the barcode directly.
+        :param value: Computed value of the barcode.
+        :type value: str
+        :return: Returns the geometry of the barcode.
+        :rtype: BarcodeGeometry
+        """
+        try:
+            return self.geometry_encoder()(value, self.render_options())
+        except EncodingError as ee:
+            raise BarcodeException(str(ee)) from ee
+
+    def draw(self, context):
+        """
+        Paints the barcode shape in RENDER_MODE_PAINTER. In RENDER_MODE_SVG,
+        designer previews are also painted from the cached shape while
+        exports draw the picture from the SVG document. The picture is
+        drawn while the shape of a preview is encoded in the background.
+        """
+        shape = self._shape
+        if shape is None and self._is_preview_render():
+            shape = self._preview_shape()
+        if shape is None:
+            super().draw(context)
+            return
+
+        render_context = context.renderContext()
+        painter = render_context.painter()
+        painter.save()
+        # Painter is scaled to dots, so scale back to layout units
+        painter.scale(
+            render_context.scaleFactor(),
+            render_context.scaleFactor()
+        )
+        rect = self.rect()
+        shape.paint(painter, rect.width(), rect.height())
+        painter.restore()
+
+    def render_svg(self, value):
         """
-        Generate barcode image and save in the temp dir. To be implemented
-        by subclasses.
-        :param file_path: File path to be used for generating the temp SVG.
-        :type file_path: str
+        Generates the barcode as an in-memory SVG document.
+        :param value: Computed value of the barcode.
+        :type value: str
+        :return: Returns the content of the SVG document.
+        :rtype: bytes
         """
-        raise NotImplementedError
+        try:
+            return self.svg_encoder()(value, self.render_options())
+        except EncodingError as ee:
+            raise BarcodeException(str(ee)) from ee
 
     def writePropertiesToElement(self, el, document, context):
         """Override saving of item properties."""
@@ -202,6 +511,7 @@ class AbstractBarcodeLayoutItem(QgsLayoutItemPicture):
     def _write_base_properties_to_el(self, el):
         """Write base properties to DOM element."""
         el.setAttribute('codeValue', self._code_value)
+        el.setAttribute('renderMode', self._render_mode)
 
     def _write_props_to_el(self, el, document, context): # pylint: disable=unused-argument
         """
@@ -215,7 +525,14 @@ class AbstractBarcodeLayoutItem(QgsLayoutItemPicture):
         status = super().readPropertiesFromElement(element, document, context)
 
         if status:
+            # Picture source is not persisted so force regeneration
+            self._render_key = None
             self._code_value = element.attribute('codeValue')
+            self._compiled_value = None
+            render_mode = element.attribute('renderMode', RENDER_MODE_SVG)
+            if render_mode not in (RENDER_MODE_SVG, RENDER_MODE_PAINTER):
+                render_mode = RENDER_MODE_SVG
+            self._render_mode = render_mode
             status = self._read_props_from_el(element, document, context)
 
         return status
@@ -243,10 +560,17 @@ class AbstractBarcodeLayoutItem(QgsLayoutItemPicture):
         :param color: Font color
         :type color: QColor
         """
+        self._render_key = None
+        self._shape = None
         w, h = 200, 50
-        svg_path = self._gen_svg_path()
         svg_gen = QSvgGenerator()
-        svg_gen.setFileName(svg_path)
+        if self._in_memory:
+            svg_buffer = QBuffer(QByteArray())
+            svg_buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+            svg_gen.setOutputDevice(svg_buffer)
+        else:
+            svg_path = self._gen_svg_path()
+            svg_gen.setFileName(svg_path)
         svg_gen.setTitle('QrBarCodeLayoutItem')
         svg_gen.setDescription(
             'Image generated by QrBarCodeLayoutItem plugin'
@@ -263,8 +587,14 @@ class AbstractBarcodeLayoutItem(QgsLayoutItemPicture):
         p.drawText(QPointF(10, 20), text)
         p.end()
 
-        # Set picture path
-        self.setPicturePath(svg_path)
+        # Set picture
+        if self._in_memory:
+            self.set_svg_data(bytes(svg_buffer.data()))
+            self._show_file(None)
+        else:
+            SvgFileTracker.instance().add_file(svg_path)
+            self.setPicturePath(svg_path)
+            self._show_file(svg_path)
 
     def _str_to_bool(self, str_val):
         # Returns a boolean value from the string representation.
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+Name                 : Barcode painter
+Description          : Paints barcodes directly using a QPainter from
+                       cached paths without rendering SVG documents.
+Date                 : 17-10-2026
+copyright            : (C) 2026 by John Gitau
+email                : gkahiu@gmail.com
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 3 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+from collections import OrderedDict
+
+from qgis.PyQt.QtCore import (
+    QPointF,
+    QRectF,
+    Qt
+)
+from qgis.PyQt.QtGui import (
+    QColor,
+    QFont,
+    QFontMetricsF,
+    QPainterPath
+)
+
+from qrbarcodeitem.utils import Singleton
+
+# Font size, in pixels, used for laying out the text before it is scaled.
+_BASE_FONT_SIZE = 100
+
+# Factor for converting points to SVG user units, same as the Qt SVG
+# renderer.
+_PT_TO_USER_UNITS = 1.25
+
+
+class BarcodeShape:
+    """
+    Geometry of a barcode together with the QPainterPath of its modules,
+    which is only built once and reused for every repaint of the items
+    showing the barcode.
+    """
+
+    def __init__(self, geometry):
+        """
+        :param geometry: Geometry of the barcode.
+        :type geometry: BarcodeGeometry
+        """
+        self._geometry = geometry
+        self._path = None
+        self._background = QColor(geometry.background) \
+            if geometry.background else None
+        self._foreground = QColor(geometry.foreground)
+        self._font = None
+        self._texts = None
+
+    @property
+    def geometry(self):
+        """
+        :return: Returns the geometry of the barcode.
+        :rtype: BarcodeGeometry
+        """
+        return self._geometry
+
+    @property
+    def path(self):
+        """
+        :return: Returns the path of the modules drawn in the foreground
+        color. Adjacent modules are merged so that they are not separated
+        by antialiasing seams and the path has fewer elements to fill.
+        :rtype: QPainterPath
+        """
+        if self._path is None:
+            path = QPainterPath()
+            path.setFillRule(Qt.FillRule.WindingFill)
+            for x, y, w, h in self._geometry.rects:
+                path.addRect(x, y, w, h)
+            self._path = path.simplified()
+
+        return self._path
+
+    def _layout_texts(self):
+        # Computes the font and the position of each text line.
+        self._font = QFont()
+        self._font.setPixelSize(_BASE_FONT_SIZE)
+        metrics = QFontMetricsF(self._font)
+        self._texts = [
+            (x, y, QPointF(-metrics.horizontalAdvance(text) / 2.0, 0), text)
+            for x, y, text in self._geometry.texts
+        ]
+
+    def paint(self, painter, width, height):
+        """
+        Paints the barcode scaled to fit, and centered in, the given area.
+        Shapes are drawn as vector paths hence exports remain vector
+        output.
+        :param painter: Painter whose coordinates are in the units of the
+        area.
+        :type painter: QPainter
+        :param width: Width of the area.
+        :type width: float
+        :param height: Height of the area.
+        :type height: float
+        """
+        geometry = self._geometry
+        if geometry.width <= 0 or geometry.height <= 0:
+            return
+
+        scale = min(width / geometry.width, height / geometry.height)
+        painter.save()
+        painter.translate(
+            (width - geometry.width * scale) / 2.0,
+            (height - geometry.height * scale) / 2.0
+        )
+        painter.scale(scale, scale)
+        painter.setPen(Qt.PenStyle.NoPen)
+
+        if self._background is not None:
+            painter.setBrush(self._background)
+            painter.drawRect(QRectF(0, 0, geometry.width, geometry.height))
+
+        painter.setBrush(self._foreground)
+        painter.drawPath(self.path)
+
+        if geometry.texts:
+            self._paint_texts(painter)
+
+        painter.restore()
+
+    def _paint_texts(self, painter):
+        # Paints the text lines anchored at the middle of their baseline.
+        if self._texts is None:
+            self._layout_texts()
+
+        text_scale = self._geometry.font_size * _PT_TO_USER_UNITS / \
+            _BASE_FONT_SIZE
+        painter.setFont(self._font)
+        painter.setPen(self._foreground)
+        for x, y, pos, text in self._texts:
+            painter.save()
+            painter.translate(x, y)
+            painter.scale(text_scale, text_scale)
+            painter.drawText(pos, text)
+            painter.restore()
+
+
+@Singleton
+class BarcodeShapeCache:
+    """
+    Maps content keys to the shapes of barcodes that are painted directly
+    so that barcodes with the same value and render options are only
+    encoded, and their paths built, once. Least recently used entries are
+    removed once the maximum number of entries is exceeded.
+    """
+    DEF_MAX_ENTRIES = 1000
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._max_entries = self.DEF_MAX_ENTRIES
+
+    @property
+    def max_entries(self):
+        """
+        :return: Returns the maximum number of entries in the cache.
+        :rtype: int
+        """
+        return self._max_entries
+
+    @max_entries.setter
+    def max_entries(self, count):
+        """
+        Sets the maximum number of entries in the cache and evicts the least
+        recently used entries if the limit is exceeded.
+        :param count: Maximum number of entries.
+        :type count: int
+        """
+        self._max_entries = count
+        self._evict()
+
+    def shape(self, key):
+        """
+        Gets the shape corresponding to the given key.
+        :param key: Content key as computed by 'svg_cache_key'.
+        :type key: str
+        :return: Returns the shape of the barcode or None if there is no
+        entry for the key.
+        :rtype: BarcodeShape
+        """
+        shape = self._entries.get(key, None)
+        if shape is not None:
+            self._entries.move_to_end(key)
+
+        return shape
+
+    def add(self, key, geometry):
+        """
+        Adds the geometry of a barcode to the cache.
+        :param key: Content key as computed by 'svg_cache_key'.
+        :type key: str
+        :param geometry: Geometry of the barcode.
+        :type geometry: BarcodeGeometry
+        :return: Returns the shape for painting the barcode.
+        :rtype: BarcodeShape
+        """
+        shape = BarcodeShape(geometry)
+        self._entries[key] = shape
+        self._entries.move_to_end(key)
+        self._evict()
+
+        return shape
+
+    def _evict(self):
+        # Remove least recently used entries until within limits.
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Removes all entries."""
+        self._entries.clear()
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,374 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+Name                 : BarcodeBatchRenderer
+Description          : Generates barcodes for many values at once using
+                       the render options of a barcode layout item.
+Date                 : 17-10-2026
+copyright            : (C) 2026 by John Gitau
+email                : gkahiu@gmail.com
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 3 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+from collections import namedtuple
+
+from qgis.PyQt.QtCore import (
+    QFile,
+    QIODevice
+)
+from qgis.core import (
+    QgsExpression,
+    QgsExpressionContextScope,
+    QgsFeatureRequest
+)
+
+from qrbarcodeitem.layout.abstract_barcode import (
+    AbstractBarcodeLayoutItem,
+    BarcodeException
+)
+from qrbarcodeitem.layout.code_expression import (
+    is_null,
+    variant_to_str
+)
+from qrbarcodeitem.layout.encoders import encode_many
+from qrbarcodeitem.layout.svg_cache import SvgCache
+
+# Result of rendering a single value, 'svg_data' is None and 'error'
+# contains the reason if the barcode could not be generated.
+BatchRenderResult = namedtuple(
+    'BatchRenderResult',
+    ['value', 'key', 'svg_data', 'error']
+)
+
+
+class BarcodeBatchRenderer:
+    """
+    Generates the SVG content of barcodes for an iterable of values based
+    on the type and render options of a template barcode item. The
+    generated content is added to the process-wide SVG cache so that items
+    with similar options can reuse it e.g. by pre-warming the cache before
+    exporting an atlas.
+    """
+
+    def __init__(self, item):
+        """
+        :param item: Barcode item whose type and render options will be
+        used for generating the barcodes.
+        :type item: AbstractBarcodeLayoutItem
+        """
+        self._item = item
+
+    @property
+    def item(self):
+        """
+        :return: Returns the template barcode item.
+        :rtype: AbstractBarcodeLayoutItem
+        """
+        return self._item
+
+    def render_value(self, value):
+        """
+        Generates the SVG content for a single value. Content is read from
+        the cache if it has already been generated.
+        :param value: Computed value of the barcode.
+        :type value: str
+        :return: Returns the result of rendering the value.
+        :rtype: BatchRenderResult
+        """
+        key = self._item.render_key(value)
+        svg_source = self._item.cached_svg(key)
+        if svg_source is not None and not self._item.in_memory:
+            svg_source = self._read_svg_file(svg_source)
+        if svg_source is not None:
+            return BatchRenderResult(value, key, svg_source, None)
+
+        try:
+            svg_data = self._item.render_svg(value)
+        except BarcodeException as bc_ex:
+            return BatchRenderResult(value, key, None, str(bc_ex))
+
+        self._item.cache_svg(key, svg_data)
+
+        return BatchRenderResult(value, key, svg_data, None)
+
+    @staticmethod
+    def _read_svg_file(path):
+        # Returns the content of a cached SVG file or None if unreadable.
+        svg_file = QFile(path)
+        if not svg_file.open(QIODevice.OpenModeFlag.ReadOnly):
+            return None
+
+        svg_data = bytes(svg_file.readAll())
+        svg_file.close()
+
+        return svg_data
+
+    def iter_render(self, values):
+        """
+        Lazily generates the SVG content of each value so that encoding
+        can be interleaved with other work.
+        :param values: Computed values of the barcodes.
+        :type values: iterable
+        :return: Returns a generator of the rendering results in the same
+        order as the values.
+        :rtype: generator
+        """
+        for value in values:
+            yield self.render_value(value)
+
+    def render(self, values):
+        """
+        Generates the SVG content of each value.
+        :param values: Computed values of the barcodes.
+        :type values: iterable
+        :return: Returns the rendering results in the same order as the
+        values.
+        :rtype: list
+        """
+        return list(self.iter_render(values))
+
+    def _uncached_values(self, values, limit):
+        # Returns the keys and values of unique values not yet cached.
+        if limit is None:
+            limit = SvgCache.instance().max_entries
+
+        keys = set()
+        pending = []
+        for value in values:
+            if len(pending) >= limit:
+                break
+            if not value:
+                continue
+
+            key = self._item.render_key(value)
+            if key in keys:
+                continue
+            keys.add(key)
+            if not self._item.is_cached(key):
+                pending.append((key, value))
+
+        return pending
+
+    def prewarm(self, values, limit=None, workers=1):
+        """
+        Generates and caches the SVG content of values that are not yet in
+        the cache. Duplicate and empty values are skipped. Values that
+        cannot be encoded are not cached, the error image will be shown
+        when the item is rendered.
+        :param values: Computed values of the barcodes.
+        :type values: iterable
+        :param limit: Maximum number of barcodes to generate. Defaults to
+        the maximum number of entries in the cache so that pre-rendered
+        content is not evicted before it is used.
+        :type limit: int
+        :param workers: Number of worker processes for encoding the
+        values, None to use all CPUs. Values are encoded in the current
+        process if 1 or if worker processes are not supported, see
+        'supports_process_pool'.
+        :type workers: int
+        :return: Returns the number of barcodes that were generated.
+        :rtype: int
+        """
+        pending = self._uncached_values(values, limit)
+        if workers == 1:
+            results = self._render_serially(pending)
+        else:
+            results = encode_many(
+                self._item.svg_encoder(),
+                [value for _, value in pending],
+                self._item.render_options(),
+                workers
+            )
+
+        count = 0
+        for (key, _), (_, svg_data, _) in zip(pending, results):
+            if svg_data is None:
+                continue
+            self._item.cache_svg(key, svg_data)
+            count += 1
+
+        return count
+
+    def _render_serially(self, pending):
+        # Renders values in the current process, same output as workers.
+        for _, value in pending:
+            try:
+                yield value, self._item.render_svg(value), None
+            except BarcodeException as bc_ex:
+                yield value, None, str(bc_ex)
+
+    def atlas_values(self, atlas=None):
+        """
+        Evaluates the code value of the item for each feature in the atlas
+        coverage layer, honouring the atlas filter.
+        :param atlas: Atlas whose coverage features will be used, defaults
+        to the atlas of the item's layout.
+        :type atlas: QgsLayoutAtlas
+        :return: Returns a generator of the computed values.
+        :rtype: generator
+        """
+        for _, value in atlas_feature_values(self._item, atlas):
+            yield value
+
+    def prewarm_atlas(self, atlas=None, limit=None, workers=1):
+        """
+        Generates and caches the barcodes of all atlas features before the
+        atlas is exported.
+        :param atlas: Atlas whose coverage features will be used, defaults
+        to the atlas of the item's layout.
+        :type atlas: QgsLayoutAtlas
+        :param limit: Maximum number of barcodes to generate, see 'prewarm'.
+        :type limit: int
+        :param workers: Number of worker processes, see 'prewarm'.
+        :type workers: int
+        :return: Returns the number of barcodes that were generated.
+        :rtype: int
+        """
+        return self.prewarm(self.atlas_values(atlas), limit, workers)
+
+
+def _atlas_expressions(atlas):
+    # Sort, page name and file name expressions of the atlas that are
+    # evaluated for each feature, None if not specified.
+    expressions = {}
+    for name, text in (
+            ('sort', atlas.sortExpression() if atlas.sortFeatures() else ''),
+            ('page_name', atlas.pageNameExpression()),
+            ('filename', atlas.filenameExpression())
+    ):
+        exp = QgsExpression(text) if text else None
+        expressions[name] = exp if exp and not exp.hasParserError() else None
+
+    return expressions
+
+
+def _atlas_features(atlas, layer, compiled_value, ctx):
+    # Features of the coverage layer in the order of the atlas pages, with
+    # only the attributes and geometries required by the expressions.
+    expressions = _atlas_expressions(atlas)
+    needs_geometry = compiled_value.needs_geometry()
+    columns = compiled_value.referenced_columns()
+
+    request = QgsFeatureRequest()
+    # Similar to QgsLayoutAtlas.updateFeatures, the filter can reference
+    # project and layout variables.
+    request.setExpressionContext(ctx)
+    filter_exp = atlas.filterExpression()
+    if atlas.filterFeatures() and filter_exp:
+        request.setFilterExpression(filter_exp)
+        expressions['filter'] = QgsExpression(filter_exp)
+    for exp in expressions.values():
+        if exp is not None:
+            needs_geometry = needs_geometry or exp.needsGeometry()
+            columns.update(exp.referencedColumns())
+    if not needs_geometry:
+        request.setFlags(QgsFeatureRequest.NoGeometry)
+    if QgsFeatureRequest.ALL_ATTRIBUTES not in columns:
+        request.setSubsetOfAttributes(list(columns), layer.fields())
+
+    features = list(layer.getFeatures(request))
+    sort_exp = expressions['sort']
+    if sort_exp is not None:
+        def sort_key(feature):
+            ctx.setFeature(feature)
+            value = sort_exp.evaluate(ctx)
+            # NULL values are sorted first
+            if is_null(value):
+                return False, None
+            return True, value
+
+        features.sort(key=sort_key, reverse=not atlas.sortAscending())
+
+    return features, expressions
+
+
+def atlas_feature_values(item, atlas=None):
+    """
+    Evaluates the code value of a barcode item for each feature in the
+    atlas coverage layer, honouring the atlas filter and sort order.
+    Features are requested with only the attributes referenced by the
+    expressions, and without geometries unless they are required. The
+    atlas variables are set for each feature as when the page is exported.
+    :param item: Barcode item whose code value will be evaluated.
+    :type item: AbstractBarcodeLayoutItem
+    :param atlas: Atlas whose coverage features will be used, defaults to
+    the atlas of the item's layout.
+    :type atlas: QgsLayoutAtlas
+    :return: Returns a generator of tuples containing the feature id and
+    the computed value. A single tuple with a feature id of None is
+    generated if the code value does not contain any expression.
+    :rtype: generator
+    """
+    if atlas is None:
+        layout = item.layout()
+        atlas = layout.atlas() if hasattr(layout, 'atlas') else None
+    if atlas is None or not atlas.enabled():
+        return
+    layer = atlas.coverageLayer()
+    if layer is None:
+        return
+
+    compiled_value = item.compiled_value
+    if compiled_value.is_static():
+        yield None, compiled_value.text
+        return
+
+    ctx = item.createExpressionContext()
+    ctx.setFields(layer.fields())
+    features, expressions = _atlas_features(
+        atlas,
+        layer,
+        compiled_value,
+        ctx
+    )
+    # Override the atlas variables of the current atlas feature. They are
+    # not static as they change for each feature.
+    scope = QgsExpressionContextScope()
+    ctx.appendScope(scope)
+    scope.setVariable('atlas_totalfeatures', len(features))
+    for number, feature in enumerate(features, 1):
+        scope.setFeature(feature)
+        scope.setVariable('atlas_featurenumber', number)
+        scope.setVariable('atlas_feature', feature)
+        scope.setVariable('atlas_featureid', feature.id())
+        scope.setVariable('atlas_geometry', feature.geometry())
+        for name, variable in (
+                ('page_name', 'atlas_pagename'),
+                ('filename', 'atlas_filename')
+        ):
+            exp = expressions[name]
+            value = exp.evaluate(ctx) if exp is not None else None
+            scope.setVariable(variable, variant_to_str(value))
+        yield feature.id(), compiled_value.evaluate(ctx)
+
+
+def prewarm_layout_atlas(layout, atlas=None, workers=1):
+    """
+    Pre-renders the barcodes of all barcode items in the layout for each
+    feature of the atlas before the atlas is exported.
+    :param layout: Layout containing the barcode items.
+    :type layout: QgsLayout
+    :param atlas: Atlas whose coverage features will be used, defaults to
+    the atlas of the layout.
+    :type atlas: QgsLayoutAtlas
+    :param workers: Number of worker processes, see
+    'BarcodeBatchRenderer.prewarm'.
+    :type workers: int
+    :return: Returns the number of barcodes that were generated.
+    :rtype: int
+    """
+    count = 0
+    for item in layout.items():
+        if isinstance(item, AbstractBarcodeLayoutItem):
+            renderer = BarcodeBatchRenderer(item)
+            count += renderer.prewarm_atlas(atlas, workers=workers)
+
+    return count
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+Name                 : CompiledCodeValue
+Description          : Code value parsed once into literal text and
+                       expressions for evaluation against different
+                       expression contexts.
+Date                 : 17-10-2026
+copyright            : (C) 2026 by John Gitau
+email                : gkahiu@gmail.com
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 3 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+import re
+
+from qgis.PyQt.QtCore import QVariant
+from qgis.core import (
+    QgsExpression,
+    QgsFields
+)
+
+# Same pattern used by QgsExpression.replaceExpressionText
+_EXP_BLOCK_RX = re.compile(r'\[%(.*?)%\]', re.DOTALL)
+
+
+def is_null(value):
+    """
+    :param value: Result of evaluating an expression.
+    :type value: object
+    :return: Returns True if the value is NULL i.e. None or a null QVariant.
+    :rtype: bool
+    """
+    return value is None or (isinstance(value, QVariant) and value.isNull())
+
+
+def variant_to_str(value):
+    """
+    Converts the result of an expression to text.
+    :param value: Result of evaluating an expression.
+    :type value: object
+    :return: Returns the value as text, an empty string if it is NULL.
+    :rtype: str
+    """
+    if value is None:
+        return ''
+    if isinstance(value, QVariant):
+        return '' if value.isNull() else value.toString()
+
+    return QVariant(value).toString()
+
+
+class CompiledCodeValue:
+    """
+    Code value text parsed into literal chunks and QgsExpression objects
+    for the '[% ... %]' blocks. Evaluating it against a context gives the
+    same result as QgsExpression.replaceExpressionText without re-parsing
+    the text for every evaluation. The expressions are prepared again
+    whenever the fields of the context change, so that field references
+    are not resolved using the indices of a different layer, or the value
+    of a referenced variable changes since preparing an expression caches
+    the nodes that only depend on static variables e.g. the atlas feature.
+    """
+
+    def __init__(self, text):
+        self._text = text
+        # Each chunk is a tuple of literal text and an expression (or None)
+        # together with the original block text used if evaluation fails.
+        self._chunks = []
+        self._expressions = []
+        self._variables = set()
+        # Fields and values of the referenced variables of the context the
+        # expressions were last prepared against.
+        self._prepared_fields = None
+        self._prepared_variables = {}
+        self._compile()
+
+    @property
+    def text(self):
+        """
+        :return: Returns the code value text that was compiled.
+        :rtype: str
+        """
+        return self._text
+
+    def _compile(self):
+        # Split text into literal chunks and expressions.
+        pos = 0
+        literal = ''
+        for match in _EXP_BLOCK_RX.finditer(self._text):
+            literal += self._text[pos:match.start()]
+            pos = match.end()
+            exp = QgsExpression(match.group(1).strip())
+            if exp.hasParserError():
+                # Leave the block as is, similar to replaceExpressionText
+                literal += match.group(0)
+                continue
+
+            self._chunks.append((literal, exp, match.group(0)))
+            self._expressions.append(exp)
+            self._variables.update(exp.referencedVariables())
+            literal = ''
+
+        literal += self._text[pos:]
+        if literal:
+            self._chunks.append((literal, None, ''))
+
+    def is_static(self):
+        """
+        :return: Returns True if the text does not contain any valid
+        expression hence evaluates to the same value in any context.
+        :rtype: bool
+        """
+        return not self._expressions
+
+    def expressions(self):
+        """
+        :return: Returns the expressions in the code value.
+        :rtype: list
+        """
+        return self._expressions
+
+    def referenced_columns(self):
+        """
+        :return: Returns the names of the attributes referenced by the
+        expressions.
+        :rtype: set
+        """
+        columns = set()
+        for exp in self._expressions:
+            columns.update(exp.referencedColumns())
+
+        return columns
+
+    def needs_geometry(self):
+        """
+        :return: Returns True if any of the expressions requires the
+        feature geometry.
+        :rtype: bool
+        """
+        return any(exp.needsGeometry() for exp in self._expressions)
+
+    def prepare(self, context):
+        """
+        Prepares the expressions for evaluation against the given context,
+        field references are resolved using the fields of the context.
+        :param context: Expression context.
+        :type context: QgsExpressionContext
+        """
+        for exp in self._expressions:
+            exp.prepare(context)
+        self._prepared_fields = QgsFields(context.fields())
+        self._prepared_variables = self._variable_values(context)
+
+    def _variable_values(self, context):
+        # Values of the variables referenced by the expressions.
+        return {name: context.variable(name) for name in self._variables}
+
+    def _is_prepared(self, context):
+        # True if the expressions were prepared against the same fields
+        # and values of the referenced variables as in the context.
+        if self._prepared_fields is None or \
+                context.fields() != self._prepared_fields:
+            return False
+
+        return self._variable_values(context) == self._prepared_variables
+
+    def evaluate(self, context):
+        """
+        Computes the value based on the given expression context. The
+        expressions are prepared if the fields of the context, or the
+        values of the referenced variables, differ from those they were
+        prepared against.
+        :param context: Expression context.
+        :type context: QgsExpressionContext
+        :return: Returns the evaluated value.
+        :rtype: str
+        """
+        if not self._expressions:
+            return self._text
+
+        if not self._is_prepared(context):
+            self.prepare(context)
+
+        values = []
+        for literal, exp, block_text in self._chunks:
+            values.append(literal)
+            if exp is None:
+                continue
+
+            result = exp.evaluate(context)
+            if exp.hasEvalError():
+                values.append(block_text)
+            else:
+                values.append(variant_to_str(result))
+
+        return ''.join(values)
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+Name                 : BarcodeEncodeTask
+Description          : Background task for encoding barcodes so that the
+                       layout designer does not block while the value of
+                       an item is being edited.
+Date                 : 17-10-2026
+copyright            : (C) 2026 by John Gitau
+email                : gkahiu@gmail.com
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 3 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+from qgis.core import QgsTask
+
+from qrbarcodeitem.layout.encoders import EncodingError
+
+
+class BarcodeEncodeTask(QgsTask):
+    """
+    Runs a module-level encoding function, such as the SVG or geometry
+    encoder of an item, in a worker thread. The encoder does not use any Qt
+    objects hence it is safe to run outside the main thread. The callback
+    is invoked in the main thread once the task has finished, unless the
+    task has been cancelled.
+    """
+
+    def __init__(self, description, encoder, value, options, callback):
+        """
+        :param description: Description of the task.
+        :type description: str
+        :param encoder: Function called with the value and render options.
+        :type encoder: callable
+        :param value: Computed value of the barcode.
+        :type value: str
+        :param options: Render options of the item.
+        :type options: dict
+        :param callback: Function called with the task once it has
+        finished.
+        :type callback: callable
+        """
+        super().__init__(description)
+        self._encoder = encoder
+        self._value = value
+        self._options = options
+        self._callback = callback
+        self.result = None
+        self.error = None
+
+    @property
+    def value(self):
+        """
+        :return: Returns the computed value being encoded.
+        :rtype: str
+        """
+        return self._value
+
+    def run(self):
+        """
+        Encodes the value. Errors are saved in 'error' rather than raised
+        as exceptions cannot propagate out of the worker thread. Unexpected
+        exceptions are also reported through 'error' so that the item shows
+        the error image instead of the task terminating.
+        :return: Returns True if the value was successfully encoded, else
+        False.
+        :rtype: bool
+        """
+        if self.isCanceled():
+            return False
+
+        try:
+            self.result = self._encoder(self._value, self._options)
+        except EncodingError as ee:
+            self.error = str(ee)
+            return False
+        except Exception as ex:  # pylint: disable=broad-except
+            self.error = f'{type(ex).__name__}: {ex}'
+            return False
+
+        return not self.isCanceled()
+
+    def finished(self, result): # pylint: disable=unused-argument
+        """
+        Invokes the callback in the main thread.
+        """
+        if self.isCanceled() or self._callback is None:
+            return
+
+        self._callback(self)
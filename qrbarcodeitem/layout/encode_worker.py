@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+Name                 : Encode worker
+Description          : Initializes spawned worker processes so that the
+                       barcode encoders can be imported without QGIS.
+Date                 : 17-10-2026
+copyright            : (C) 2026 by John Gitau
+email                : gkahiu@gmail.com
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 3 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+
+This file is run, rather than imported, in each spawned worker process
+before the encoding function is unpickled. Importing the encoders would
+otherwise execute the plugin package, which loads QGIS. The plugin package
+is registered without executing it so that only the encoders and the
+vendored libraries are imported.
+"""
+import os
+import sys
+import types
+
+
+def register_plugin_package(plugin_dir):
+    """
+    Registers the plugin package without executing its module.
+    :param plugin_dir: Directory of the plugin package.
+    :type plugin_dir: str
+    """
+    name = os.path.basename(plugin_dir)
+    if name in sys.modules:
+        return
+
+    package = types.ModuleType(name)
+    package.__path__ = [plugin_dir]
+    sys.modules[name] = package
+
+
+register_plugin_package(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
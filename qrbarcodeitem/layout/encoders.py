@@ -0,0 +1,517 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+Name                 : Barcode encoders
+Description          : Qt-independent functions for encoding barcodes as
+                       SVG documents or drawing geometry, suitable for use
+                       in worker processes.
+Date                 : 17-10-2026
+copyright            : (C) 2026 by John Gitau
+email                : gkahiu@gmail.com
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 3 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+import io
+import multiprocessing
+import os
+import runpy
+import sys
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from qrbarcodeitem.extlibs import (
+    barcode,
+    segno
+)
+from qrbarcodeitem.extlibs.barcode.errors import BarcodeError
+from qrbarcodeitem.extlibs.barcode.writer import (
+    BaseWriter,
+    CompactSVGWriter,
+    pt2mm
+)
+from qrbarcodeitem.extlibs.segno import (
+    consts as segno_consts,
+    encoder as segno_encoder
+)
+from qrbarcodeitem.extlibs.segno.encoder import (
+    get_error_name,
+    get_version_name
+)
+from qrbarcodeitem.extlibs.segno.utils import matrix_to_lines
+
+# Border, in modules, around the QR code
+QRCODE_BORDER = 1
+
+# Shapes of a barcode for painting it directly. Sizes are in the units of
+# the SVG document i.e. modules for QR codes and millimeters for linear
+# barcodes. 'rects' is a tuple of (x, y, width, height) tuples of the
+# modules drawn in the foreground color, 'texts' is a tuple of
+# (x, y, text) tuples anchored at the middle of the text baseline.
+BarcodeGeometry = namedtuple(
+    'BarcodeGeometry',
+    ['width', 'height', 'background', 'foreground', 'rects', 'texts',
+     'font_size']
+)
+
+
+class EncodingError(Exception):
+    """Exception when a value cannot be encoded."""
+    pass
+
+
+def _make_qrcode(value, options):
+    # Returns the encoded QR code, raises EncodingError if it fails.
+    version = options.get('version', None)
+    try:
+        # Encoded matrix is reused if the value has already been encoded
+        # e.g. with different colors. A fixed mask skips the evaluation of
+        # the mask patterns.
+        return segno.make_cached(
+            value,
+            error=options.get('error', None),
+            version=version,
+            mask=options.get('mask', None),
+            micro=options.get('micro', False),
+            boost_error=options.get('boost_error', True)
+        )
+    except segno.DataOverflowError as doe:
+        if version is not None:
+            msg = f'Data too large for version {version}.'
+        else:
+            msg = 'Data too large, change to standard QR code.'
+        raise EncodingError(msg) from doe
+    except ValueError as ve:
+        raise EncodingError(str(ve)) from ve
+
+
+def plan_qrcode(value, options):
+    """
+    Finds the minimal version of the QR code for each error level without
+    encoding the value, which is much cheaper than encoding it.
+    :param value: Computed value of the barcode.
+    :type value: str
+    :param options: Render options as specified by the QR code item.
+    :type options: dict
+    :return: Returns the minimal version, and remaining capacity, for each
+    error level and whether the value fits in a micro QR code.
+    :rtype: CapacityPlan
+    """
+    try:
+        return segno.plan_capacity(value, micro=options.get('micro', False))
+    except ValueError as ve:
+        raise EncodingError(str(ve)) from ve
+
+
+def _fit_qrcode_version(segments, version, error):
+    # Capacity of the given version, None if the segments do not fit.
+    if error is None and version != segno_consts.VERSION_M1:
+        error = segno_consts.ERROR_LEVEL_L
+    try:
+        capacity = segno_consts.SYMBOL_CAPACITY[version][error]
+    except KeyError as ke:
+        raise EncodingError(
+            f'Error level {get_error_name(error)} is not available for '
+            f'version {get_version_name(version)}.'
+        ) from ke
+    try:
+        bit_length = segments.bit_length_with_overhead(version, False)
+    except KeyError:
+        # Mode of the data is not supported by the micro version
+        return None
+    if capacity < bit_length:
+        return None
+
+    return segno_encoder.VersionFit(
+        version,
+        error,
+        capacity,
+        bit_length,
+        capacity - bit_length
+    )
+
+
+def fit_qrcode(value, options):
+    """
+    Finds the version and error level of the QR code that will be generated
+    for the value, including a fixed version and error boost, without
+    encoding the value.
+    :param value: Computed value of the barcode.
+    :type value: str
+    :param options: Render options as specified by the QR code item.
+    :type options: dict
+    :return: Returns the version, error level and remaining capacity or
+    None if the value does not fit in the QR code.
+    :rtype: VersionFit
+    """
+    micro = options.get('micro', False)
+    try:
+        segments = segno_encoder.prepare_data(value, None, None)
+        version = segno_encoder.normalize_version(options.get('version'))
+        error = segno_encoder.normalize_errorlevel(
+            options.get('error'),
+            accept_none=True
+        )
+    except ValueError as ve:
+        raise EncodingError(str(ve)) from ve
+
+    if version is None:
+        fit = segno_encoder.find_minimal_version(segments, error, micro=micro)
+    elif (version < 1) != micro:
+        raise EncodingError(
+            f'Version {get_version_name(version)} is not available for '
+            f'{"micro" if micro else "standard"} QR codes.'
+        )
+    else:
+        fit = _fit_qrcode_version(segments, version, error)
+
+    if fit is None or not options.get('boost_error', True):
+        return fit
+
+    boosted_error = segno_encoder.boost_error_level(
+        fit.version,
+        fit.error,
+        segments,
+        False
+    )
+    if boosted_error == fit.error:
+        return fit
+
+    capacity = segno_consts.SYMBOL_CAPACITY[fit.version][boosted_error]
+
+    return fit._replace(
+        error=boosted_error,
+        capacity=capacity,
+        remaining=capacity - fit.bit_length
+    )
+
+
+def qrcode_designator(fit):
+    """
+    :param fit: Version and error level of a QR code.
+    :type fit: VersionFit
+    :return: Returns the version and error level of the QR code as text
+    e.g. '5-M' or 'M1'.
+    :rtype: str
+    """
+    version = str(get_version_name(fit.version))
+    if fit.error is None:
+        return version
+
+    return f'{version}-{get_error_name(fit.error)}'
+
+
+def encode_qrcode_svg(value, options):
+    """
+    Encodes a value as a QR code.
+    :param value: Computed value of the barcode.
+    :type value: str
+    :param options: Render options as specified by the QR code item.
+    :type options: dict
+    :return: Returns the content of the SVG document.
+    :rtype: bytes
+    """
+    qr = _make_qrcode(value, options)
+    buffer = io.BytesIO()
+    try:
+        # Use options for compressing the output
+        qr.save(
+            buffer,
+            kind='svg',
+            scale=options.get('scale', 10),
+            dark=options.get('dark', '#000000'),
+            light=options.get('light', '#FFFFFF'),
+            border=QRCODE_BORDER,
+            xmldecl=False,
+            svgns=False,
+            nl=False
+        )
+    except ValueError as ve:
+        raise EncodingError(str(ve)) from ve
+
+    return buffer.getvalue()
+
+
+def encode_qrcode_geometry(value, options):
+    """
+    Encodes a value as a QR code for painting it directly.
+    :param value: Computed value of the barcode.
+    :type value: str
+    :param options: Render options as specified by the QR code item.
+    :type options: dict
+    :return: Returns the shapes of the QR code, in modules.
+    :rtype: BarcodeGeometry
+    """
+    qr = _make_qrcode(value, options)
+    width, height = qr.symbol_size(scale=1, border=QRCODE_BORDER)
+    # Each horizontal run of dark modules is a rectangle
+    rects = tuple(
+        (x1, y1, x2 - x1, 1)
+        for (x1, y1), (x2, _) in matrix_to_lines(
+            qr.matrix,
+            QRCODE_BORDER,
+            QRCODE_BORDER
+        )
+    )
+
+    return BarcodeGeometry(
+        width,
+        height,
+        options.get('light', '#FFFFFF'),
+        options.get('dark', '#000000'),
+        rects,
+        (),
+        0
+    )
+
+
+def _make_linear_barcode(value, options, writer):
+    # Returns the barcode and the writer options, raises EncodingError if
+    # the value is invalid.
+    build_opts = dict(options)
+    barcode_type = build_opts.pop('barcode_type')
+    # Options for the barcode writer
+    writer_options = {
+        'quiet_zone': 1.5,
+        'font_size': 4,
+        'background': build_opts.pop('background', '#FFFFFF'),
+        'foreground': build_opts.pop('foreground', '#000000'),
+        'write_text': build_opts.pop('write_text', True)
+    }
+
+    try:
+        linear_barcode = barcode.get(
+            barcode_type,
+            value,
+            writer=writer,
+            options=build_opts
+        )
+    except BarcodeError as bce:
+        raise EncodingError(str(bce)) from bce
+
+    return linear_barcode, writer_options
+
+
+def encode_linear_svg(value, options):
+    """
+    Encodes a value as a linear barcode.
+    :param value: Computed value of the barcode.
+    :type value: str
+    :param options: Render options as specified by the linear barcode
+    item.
+    :type options: dict
+    :return: Returns the content of the SVG document.
+    :rtype: bytes
+    """
+    # Compact writer does not build a DOM and produces a single path
+    linear_barcode, writer_options = _make_linear_barcode(
+        value,
+        options,
+        CompactSVGWriter()
+    )
+    buffer = io.BytesIO()
+    try:
+        linear_barcode.write(buffer, writer_options)
+    except BarcodeError as bce:
+        raise EncodingError(str(bce)) from bce
+
+    return buffer.getvalue()
+
+
+class _GeometryWriter(BaseWriter):
+    # Collects the bars and text of a linear barcode, sizes are similar to
+    # those of the SVG writer i.e. in millimeters.
+
+    def __init__(self):
+        BaseWriter.__init__(
+            self,
+            self._init,
+            self._add_module,
+            self._add_text,
+            self._finish
+        )
+        self._size = (0, 0)
+        self._rects = []
+        self._texts = []
+
+    def _init(self, code):
+        self._size = self.calculate_size(len(code[0]), len(code), 25.4)
+        self._rects = []
+        self._texts = []
+
+    def _add_module(self, xpos, ypos, width, color):
+        if color != self.background:
+            self._rects.append((xpos, ypos, width, self.module_height))
+
+    def _add_text(self, xpos, ypos):
+        text = self.human if self.human != '' else self.text
+        for sub_text in text.split('\n'):
+            self._texts.append((xpos, ypos, sub_text))
+            ypos += pt2mm(self.font_size) + self.text_line_distance
+
+    def _finish(self):
+        return BarcodeGeometry(
+            self._size[0],
+            self._size[1],
+            self.background,
+            self.foreground,
+            tuple(self._rects),
+            tuple(self._texts),
+            self.font_size
+        )
+
+    def save(self, filename, output):
+        # Geometry is only painted, it is never written to a file.
+        raise NotImplementedError('Barcode geometry cannot be saved.')
+
+
+def encode_linear_geometry(value, options):
+    """
+    Encodes a value as a linear barcode for painting it directly.
+    :param value: Computed value of the barcode.
+    :type value: str
+    :param options: Render options as specified by the linear barcode
+    item.
+    :type options: dict
+    :return: Returns the shapes of the linear barcode, in millimeters.
+    :rtype: BarcodeGeometry
+    """
+    linear_barcode, writer_options = _make_linear_barcode(
+        value,
+        options,
+        _GeometryWriter()
+    )
+    try:
+        return linear_barcode.render(writer_options)
+    except BarcodeError as bce:
+        raise EncodingError(str(bce)) from bce
+
+
+def _encode_value(args):
+    # Worker entry point, returns the value, SVG content and error message.
+    encoder, value, options = args
+    try:
+        return value, encoder(value, options), None
+    except EncodingError as ee:
+        return value, None, str(ee)
+
+
+# Run in spawned worker processes before the encoders are imported
+_WORKER_SCRIPT = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    'encode_worker.py'
+)
+
+
+def _has_qt_application():
+    # True if a Qt application, such as QGIS, is running in the process.
+    # Qt is not imported here as the encoders can be used without it.
+    qt_core = sys.modules.get('qgis.PyQt.QtCore')
+    if qt_core is None:
+        return False
+
+    return qt_core.QCoreApplication.instance() is not None
+
+
+def _python_executable():
+    # Interpreter for spawned worker processes. Inside QGIS, the
+    # executable of the process can be QGIS itself rather than Python.
+    if os.path.basename(sys.executable).lower().startswith('python'):
+        return sys.executable
+
+    if sys.platform == 'win32':
+        names = ('python.exe', os.path.join('bin', 'python.exe'))
+    else:
+        names = (
+            os.path.join(
+                'bin',
+                f'python{sys.version_info.major}.{sys.version_info.minor}'
+            ),
+            os.path.join('bin', f'python{sys.version_info.major}')
+        )
+    for name in names:
+        path = os.path.join(sys.exec_prefix, name)
+        if os.path.isfile(path):
+            return path
+
+    return None
+
+
+def _pool_context():
+    # Start method of the worker processes and the interpreter, None for
+    # the current one. Forking is not safe once a Qt application is
+    # running, as its threads (e.g. of the task manager) are not copied
+    # to the child process and can leave locks held, hence a new
+    # interpreter is spawned which only imports the encoders.
+    if sys.platform.startswith('linux') and not _has_qt_application():
+        return multiprocessing.get_context('fork'), None
+
+    return multiprocessing.get_context('spawn'), _python_executable()
+
+
+def supports_process_pool():
+    """
+    Worker processes are forked outside a Qt application, such as in
+    scripts and benchmarks. Inside QGIS, or the headless export, they are
+    spawned using the Python interpreter of the installation and only
+    import the encoders and the vendored libraries.
+    :return: Returns True if values can be encoded in worker processes.
+    :rtype: bool
+    """
+    context, executable = _pool_context()
+    if context.get_start_method() == 'fork':
+        return True
+
+    return executable is not None
+
+
+def encode_many(encoder, values, options, max_workers=None):
+    """
+    Encodes the values in a pool of worker processes. The values are
+    encoded serially in the current process if worker processes are not
+    supported, e.g. the Python interpreter of the QGIS installation cannot
+    be found, or only one worker is requested.
+    :param encoder: Module-level encoding function such as
+    'encode_qrcode_svg'.
+    :type encoder: callable
+    :param values: Computed values of the barcodes.
+    :type values: list
+    :param options: Render options passed to the encoder.
+    :type options: dict
+    :param max_workers: Maximum number of worker processes, defaults to
+    the number of CPUs.
+    :type max_workers: int
+    :return: Returns a generator of tuples containing the value, SVG
+    content (or None) and the error message (or None), in the same order
+    as the values.
+    :rtype: generator
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = min(max_workers, len(values))
+    args = ((encoder, value, options) for value in values)
+
+    if max_workers <= 1 or not supports_process_pool():
+        yield from map(_encode_value, args)
+        return
+
+    # Larger chunks reduce the inter-process overhead
+    chunk_size = max(1, len(values) // (max_workers * 4))
+    context, executable = _pool_context()
+    if executable is not None:
+        # Sets the interpreter of all spawned processes, not only the pool
+        context.set_executable(executable)
+    with ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=context,
+            initializer=runpy.run_path,
+            initargs=(_WORKER_SCRIPT,)
+    ) as executor:
+        yield from executor.map(_encode_value, args, chunksize=chunk_size)
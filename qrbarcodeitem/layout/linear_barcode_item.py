@@ -25,11 +25,12 @@ from qgis.core import (
     QgsLayoutItemRegistry
 )
 
-from qrbarcodeitem.extlibs import barcode
-from qrbarcodeitem.extlibs.barcode.errors import BarcodeError
 from qrbarcodeitem.layout.abstract_barcode import (
-    AbstractBarcodeLayoutItem,
-    BarcodeException
+    AbstractBarcodeLayoutItem
+)
+from qrbarcodeitem.layout.encoders import (
+    encode_linear_geometry,
+    encode_linear_svg
 )
 from qrbarcodeitem.utils import (
     get_icon
@@ -159,38 +160,39 @@ class LinearBarcodeLayoutItem(AbstractBarcodeLayoutItem):
 
         return opts
 
+    def render_options(self):
+        """
+        :return: Returns the options for generating the linear barcode.
+        :rtype: dict
+        """
+        opts = self.barcode_gen_options()
+        opts.update({
+            'barcode_type': self._barcode_type,
+            'background': self._background_color,
+            'foreground': self._foreground_color,
+            'write_text': self._render_text
+        })
+
+        return opts
+
     def icon(self):
         """Return item's icon."""
         return get_icon('barcode.svg')
 
-    def _gen_image(self, file_path):
-        """Generate QR Code based on the computed value."""
-        # Options for the barcode SVG writer
-        writer_options = {
-            'quiet_zone': 1.5,
-            'font_size': 4,
-            'background': self._background_color,
-            'foreground': self._foreground_color,
-            'write_text': self._render_text
-        }
-        build_opts = self.barcode_gen_options()
-
-        try:
-            linear_barcode = barcode.get(
-                self._barcode_type,
-                self.computed_value(),
-                options=build_opts
-            )
+    def svg_encoder(self):
+        """
+        :return: Returns the function for encoding the linear barcode.
+        :rtype: callable
+        """
+        return encode_linear_svg
 
-            # barcode lib automatically add '.svg' suffix
-            linear_barcode.save(
-                file_path.replace('.svg', ''),
-                writer_options
-            )
-        except BarcodeError as bce:
-            raise BarcodeException(
-                str(bce)
-            ) from bce
+    def geometry_encoder(self):
+        """
+        :return: Returns the function for encoding the linear barcode for
+        painting it directly.
+        :rtype: callable
+        """
+        return encode_linear_geometry
 
     def type(self):
         """Return item's unique type identifier."""
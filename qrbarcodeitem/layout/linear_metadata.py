@@ -17,8 +17,13 @@ email                : gkahiu@gmail.com
  *                                                                         *
  ***************************************************************************/
 """
+import re
+import string
 from abc import ABC
-from collections import OrderedDict
+from collections import (
+    namedtuple,
+    OrderedDict
+)
 from qgis.PyQt.QtCore import QCoreApplication
 
 from qrbarcodeitem.extlibs.barcode.charsets.code39 import REF as c39_chars
@@ -26,11 +31,135 @@ from qrbarcodeitem.extlibs.barcode.charsets.code128 import ALL as c128_chars
 from qrbarcodeitem.utils import Singleton
 
 
+# Result of validating barcode data, the sanitized text excludes the
+# characters at the invalid positions.
+ValidationResult = namedtuple(
+    'ValidationResult',
+    ['sanitized', 'invalid_positions']
+)
+
+
+class CharacterValidator:
+    """
+    Validates and sanitizes barcode data in a single pass using a compiled
+    regular expression that matches the characters which are not in the
+    allowed set. A predicate is used, one character at a time, for
+    metadata types that do not specify their allowed characters.
+    """
+
+    def __init__(self, allowed_chars=None, predicate=None):
+        """
+        :param allowed_chars: Characters allowed in the barcode data, None
+        if all characters are allowed.
+        :type allowed_chars: iterable
+        :param predicate: Function that returns True if a character is
+        allowed, only used if allowed_chars is None.
+        :type predicate: callable
+        """
+        self._allowed = None
+        self._pattern = None
+        self._predicate = None
+        if allowed_chars is not None:
+            self._allowed = frozenset(allowed_chars)
+            if self._allowed:
+                chars = ''.join(re.escape(c) for c in sorted(self._allowed))
+                self._pattern = re.compile(f'[^{chars}]')
+            else:
+                self._pattern = re.compile('.', re.DOTALL)
+        elif predicate is not None:
+            self._predicate = predicate
+
+    @property
+    def allowed_characters(self):
+        """
+        :return: Returns the allowed characters or None if they have not
+        been specified.
+        :rtype: frozenset
+        """
+        return self._allowed
+
+    def is_allowed(self, data_char):
+        """
+        :param data_char: Character to evaluate if allowed.
+        :type data_char: str
+        :return: Returns True if the character is allowed, else False.
+        :rtype: bool
+        """
+        if self._allowed is not None:
+            return data_char in self._allowed
+        if self._predicate is not None:
+            return self._predicate(data_char)
+
+        return True
+
+    def invalid_positions(self, text):
+        """
+        :param text: Barcode data to validate.
+        :type text: str
+        :return: Returns the positions of the characters that are not
+        allowed.
+        :rtype: list
+        """
+        if self._pattern is not None:
+            return [m.start() for m in self._pattern.finditer(text)]
+        if self._predicate is not None:
+            return [
+                i for i, ch in enumerate(text) if not self._predicate(ch)
+            ]
+
+        return []
+
+    def is_valid(self, text):
+        """
+        :param text: Barcode data to validate.
+        :type text: str
+        :return: Returns True if all the characters are allowed, else False.
+        :rtype: bool
+        """
+        if self._pattern is not None:
+            return self._pattern.search(text) is None
+
+        return not self.invalid_positions(text)
+
+    def sanitize(self, text):
+        """
+        :param text: Barcode data to sanitize.
+        :type text: str
+        :return: Returns the text without the characters that are not
+        allowed.
+        :rtype: str
+        """
+        if self._pattern is not None:
+            return self._pattern.sub('', text)
+        if self._predicate is not None:
+            return ''.join(filter(self._predicate, text))
+
+        return text
+
+    def validate(self, text):
+        """
+        Validates and sanitizes the barcode data.
+        :param text: Barcode data to validate.
+        :type text: str
+        :return: Returns the sanitized text and the positions of the
+        characters that are not allowed.
+        :rtype: ValidationResult
+        """
+        positions = self.invalid_positions(text)
+        if not positions:
+            return ValidationResult(text, positions)
+
+        return ValidationResult(self.sanitize(text), positions)
+
+
 class AbstractLinearBarcodeMetadata(ABC):
     """
     Abstract class that provides a standard interface for defining the
     properties of different linear barcode types.
     """
+    def __init__(self):
+        self._validator = None
+
     def display_name(self):
         """
         :return: Returns a friendly name of the linear barcode type.
@@ -71,6 +200,43 @@ class AbstractLinearBarcodeMetadata(ABC):
         """
         return -1
 
+    def min_input_length(self):
+        """
+        :return: Returns the minimum number of characters required for the
+        given barcode type.
+        :rtype: int
+        """
+        return 0
+
+    def calculate_checksum(self, data):
+        """
+        Computes the check digit of the given data, excluding the checksum.
+        Only applicable for barcode types with a fixed length whose checksum
+        can also be included in the barcode data.
+        :param data: Barcode data without the checksum.
+        :type data: str
+        :return: Returns the check digit or None if the barcode type does
+        not support a user-specified checksum.
+        :rtype: str
+        """
+        return None
+
+    def allowed_characters(self):
+        """
+        :return: Returns the characters allowed by the linear barcode type,
+        None if there is no restriction.
+        :rtype: iterable
+        """
+        return None
+
+    def restricts_characters(self):
+        """
+        :return: Returns True if the linear barcode type specifies its
+        allowed characters, else False.
+        :rtype: bool
+        """
+        return self.allowed_characters() is not None
+
     def is_character_allowed(self, data_char):
         """
         Evaluates if the given character is allowed.
@@ -80,7 +246,40 @@ class AbstractLinearBarcodeMetadata(ABC):
         else False.
         :rtype: bool
         """
-        return True
+        if not self.restricts_characters():
+            return True
+
+        return data_char in self.allowed_characters()
+
+    def compile_validator(self):
+        """
+        Builds the validator for the barcode data. Subclasses that override
+        'is_character_allowed' without specifying the allowed characters
+        are validated one character at a time.
+        :return: Returns the validator for the barcode data.
+        :rtype: CharacterValidator
+        """
+        is_overridden = type(self).is_character_allowed is not \
+            AbstractLinearBarcodeMetadata.is_character_allowed
+        if not self.restricts_characters() and is_overridden:
+            self._validator = CharacterValidator(
+                predicate=self.is_character_allowed
+            )
+        else:
+            self._validator = CharacterValidator(self.allowed_characters())
+
+        return self._validator
+
+    def validator(self):
+        """
+        :return: Returns the validator for the barcode data, it is compiled
+        on first use if the metadata has not been registered.
+        :rtype: CharacterValidator
+        """
+        if self._validator is None:
+            self.compile_validator()
+
+        return self._validator
 
 
 def tr(text):
@@ -115,6 +314,7 @@ class LinearBarcodeMetadataRegistry:
         if not isinstance(metadata, AbstractLinearBarcodeMetadata):
             return False
 
+        metadata.compile_validator()
         self._metadata[metadata.type_id()] = metadata
 
         return True
@@ -206,12 +406,9 @@ class Code39Metadata(AbstractLinearBarcodeMetadata):
     def max_input_length(self):
         return -1
 
-    def is_character_allowed(self, data_char):
-        # Check from collection defined in barcode lib.
-        if data_char not in c39_chars:
-            return False
-
-        return True
+    def allowed_characters(self):
+        # Collection defined in barcode lib.
+        return c39_chars
 
 
 class Code128Metadata(AbstractLinearBarcodeMetadata):
@@ -234,12 +431,9 @@ class Code128Metadata(AbstractLinearBarcodeMetadata):
     def max_input_length(self):
         return -1
 
-    def is_character_allowed(self, data_char):
-        # Check from collection defined in barcode lib.
-        if data_char not in c128_chars:
-            return False
-
-        return True
+    def allowed_characters(self):
+        # Collection defined in barcode lib.
+        return c128_chars
 
 
 class Gs1_128Metadata(Code128Metadata):
@@ -274,8 +468,22 @@ class Ean8Metadata(AbstractLinearBarcodeMetadata):
     def max_input_length(self):
         return 7
 
-    def is_character_allowed(self, data_char):
-        return data_char.isdigit()
+    def min_input_length(self):
+        # Data has a fixed length.
+        return self.max_input_length()
+
+    def calculate_checksum(self, data):
+        # Weights of 3 and 1 from the rightmost digit.
+        total = sum(
+            int(digit) * (3 if i % 2 == 0 else 1)
+            for i, digit in enumerate(reversed(data))
+        )
+
+        return str((10 - total % 10) % 10)
+
+    def allowed_characters(self):
+        # Only ASCII digits can be encoded.
+        return string.digits
 
 
 class Ean13Metadata(Ean8Metadata):
@@ -0,0 +1,311 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+Name                 : Preflight
+Description          : Validates the values of barcode items for all atlas
+                       features before a layout is exported.
+Date                 : 17-10-2026
+copyright            : (C) 2026 by John Gitau
+email                : gkahiu@gmail.com
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 3 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+from collections import namedtuple
+
+from qgis.PyQt.QtCore import QCoreApplication
+
+from qrbarcodeitem.layout.abstract_barcode import (
+    AbstractBarcodeLayoutItem,
+    BarcodeException
+)
+from qrbarcodeitem.layout.batch_renderer import atlas_feature_values
+from qrbarcodeitem.layout.linear_barcode_item import (
+    LinearBarcodeLayoutItem
+)
+from qrbarcodeitem.layout.linear_metadata import (
+    LinearBarcodeMetadataRegistry
+)
+from qrbarcodeitem.layout.qrcode_item import QrCodeLayoutItem
+
+# Result of validating the value of a single feature, 'errors' is empty if
+# the value is valid. The feature id is None for static values.
+PreflightResult = namedtuple(
+    'PreflightResult',
+    ['feature_id', 'value', 'errors', 'invalid_positions']
+)
+
+
+def tr(text):
+    """
+    Get the translation for a string using Qt translation API.
+    :param text: Text to translate.
+    :type text: str
+    :return: Returns the translated version of the input text.
+    :rtype: str
+    """
+    return QCoreApplication.translate('Preflight', text)
+
+
+def validate_linear_value(metadata, value):
+    """
+    Validates a value against the rules of a linear barcode type i.e.
+    allowed characters, length and check digit.
+    :param metadata: Metadata of the linear barcode type.
+    :type metadata: AbstractLinearBarcodeMetadata
+    :param value: Computed value of the barcode.
+    :type value: str
+    :return: Returns a tuple containing the list of error messages and the
+    positions of the invalid characters.
+    :rtype: tuple
+    """
+    if not value:
+        return [tr('Value is empty.')], []
+
+    errors = []
+    sanitized, positions = metadata.validator().validate(value)
+    if positions:
+        errors.append(
+            tr('Invalid characters at position(s) {0}.').format(
+                ', '.join(str(p + 1) for p in positions)
+            )
+        )
+
+    length = len(sanitized)
+    max_length = metadata.max_input_length()
+    min_length = metadata.min_input_length()
+    checksum = None
+    # Check digit can be included after the maximum number of characters
+    if max_length != -1 and length == max_length + 1:
+        checksum = metadata.calculate_checksum(sanitized[:max_length])
+
+    if checksum is not None:
+        if sanitized[-1] != checksum:
+            errors.append(
+                tr(
+                    'Check digit {0} does not match the computed check '
+                    'digit {1}.'
+                ).format(sanitized[-1], checksum)
+            )
+    elif max_length != -1 and length > max_length:
+        errors.append(
+            tr('Exceeds the maximum length of {0} characters.').format(
+                max_length
+            )
+        )
+    elif length < min_length:
+        errors.append(
+            tr('Requires at least {0} characters.').format(min_length)
+        )
+
+    return errors, positions
+
+
+def validate_qrcode_value(item, value):
+    """
+    Validates that a value fits in the QR code of the given item, using
+    the capacity of the QR code versions without encoding the value.
+    :param item: QR code item.
+    :type item: QrCodeLayoutItem
+    :param value: Computed value of the barcode.
+    :type value: str
+    :return: Returns a tuple containing the list of error messages and the
+    positions of the invalid characters, which is always empty.
+    :rtype: tuple
+    """
+    if not value:
+        return [tr('Value is empty.')], []
+
+    try:
+        fit = item.version_fit(value)
+    except BarcodeException as bc_ex:
+        return [str(bc_ex)], []
+
+    if fit is None:
+        return [tr('Data too large for the QR code.')], []
+
+    return [], []
+
+
+def item_value_validator(item):
+    """
+    Gets the function for validating the computed values of the given item.
+    :param item: Barcode item.
+    :type item: AbstractBarcodeLayoutItem
+    :return: Returns a function that is called with a computed value and
+    returns a tuple containing the list of error messages and the positions
+    of the invalid characters.
+    :rtype: callable
+    """
+    if isinstance(item, LinearBarcodeLayoutItem):
+        metadata = LinearBarcodeMetadataRegistry.instance(). \
+            metadata_by_typeid(item.barcode_type)
+        if metadata is None:
+            error = tr('Linear barcode type {0} is not registered.').format(
+                item.barcode_type
+            )
+            return lambda value: ([error], [])
+
+        return lambda value: validate_linear_value(metadata, value)
+
+    if isinstance(item, QrCodeLayoutItem):
+        return lambda value: validate_qrcode_value(item, value)
+
+    def validate_value(value):
+        # Only an empty value cannot be encoded by any barcode type.
+        if not value:
+            return [tr('Value is empty.')], []
+
+        return [], []
+
+    return validate_value
+
+
+def iter_preflight(item, atlas=None, failures_only=True):
+    """
+    Evaluates the code value of the item for each feature in the atlas
+    coverage layer and validates the result. Features are streamed, with
+    only the referenced attributes, hence memory use does not depend on
+    the number of features.
+    :param item: Barcode item whose code value will be validated.
+    :type item: AbstractBarcodeLayoutItem
+    :param atlas: Atlas whose coverage features will be used, defaults to
+    the atlas of the item's layout.
+    :type atlas: QgsLayoutAtlas
+    :param failures_only: True to only generate the results of invalid
+    values.
+    :type failures_only: bool
+    :return: Returns a generator of the result for each feature.
+    :rtype: generator
+    """
+    validator = item_value_validator(item)
+    for feature_id, value in atlas_feature_values(item, atlas):
+        errors, positions = validator(value)
+        if errors or not failures_only:
+            yield PreflightResult(feature_id, value, errors, positions)
+
+
+class PreflightReport:
+    """
+    Summary of the validation of the values of a barcode item for all atlas
+    features. Only the first failures, up to a maximum number, are kept so
+    that the report remains small for large coverage layers.
+    """
+    DEF_MAX_FAILURES = 1000
+
+    def __init__(self, item, max_failures=DEF_MAX_FAILURES):
+        """
+        :param item: Barcode item whose values have been validated.
+        :type item: AbstractBarcodeLayoutItem
+        :param max_failures: Maximum number of failures to keep.
+        :type max_failures: int
+        """
+        self._item = item
+        self._max_failures = max_failures
+        self._failures = []
+        self._count = 0
+        self._failure_count = 0
+
+    @property
+    def item(self):
+        """
+        :return: Returns the barcode item whose values have been validated.
+        :rtype: AbstractBarcodeLayoutItem
+        """
+        return self._item
+
+    @property
+    def count(self):
+        """
+        :return: Returns the number of validated values.
+        :rtype: int
+        """
+        return self._count
+
+    @property
+    def failure_count(self):
+        """
+        :return: Returns the number of invalid values, including those that
+        are not kept in the report.
+        :rtype: int
+        """
+        return self._failure_count
+
+    @property
+    def failures(self):
+        """
+        :return: Returns the results of the first invalid values.
+        :rtype: list
+        """
+        return self._failures
+
+    def is_valid(self):
+        """
+        :return: Returns True if all the values are valid, else False.
+        :rtype: bool
+        """
+        return self._failure_count == 0
+
+    def add(self, result):
+        """
+        Adds the result of validating the value of a feature.
+        :param result: Validation result.
+        :type result: PreflightResult
+        """
+        self._count += 1
+        if not result.errors:
+            return
+
+        self._failure_count += 1
+        if len(self._failures) < self._max_failures:
+            self._failures.append(result)
+
+
+def preflight_item(item, atlas=None, max_failures=None):
+    """
+    Validates the values of a barcode item for all atlas features.
+    :param item: Barcode item whose code value will be validated.
+    :type item: AbstractBarcodeLayoutItem
+    :param atlas: Atlas whose coverage features will be used, defaults to
+    the atlas of the item's layout.
+    :type atlas: QgsLayoutAtlas
+    :param max_failures: Maximum number of failures kept in the report.
+    :type max_failures: int
+    :return: Returns the validation report.
+    :rtype: PreflightReport
+    """
+    if max_failures is None:
+        max_failures = PreflightReport.DEF_MAX_FAILURES
+    report = PreflightReport(item, max_failures)
+    for result in iter_preflight(item, atlas, failures_only=False):
+        report.add(result)
+
+    return report
+
+
+def preflight_layout(layout, atlas=None, max_failures=None):
+    """
+    Validates the values of all the barcode items in the layout for all
+    atlas features.
+    :param layout: Layout containing the barcode items.
+    :type layout: QgsLayout
+    :param atlas: Atlas whose coverage features will be used, defaults to
+    the atlas of the layout.
+    :type atlas: QgsLayoutAtlas
+    :param max_failures: Maximum number of failures kept in each report.
+    :type max_failures: int
+    :return: Returns a list containing the report of each barcode item.
+    :rtype: list
+    """
+    return [
+        preflight_item(item, atlas, max_failures)
+        for item in layout.items()
+        if isinstance(item, AbstractBarcodeLayoutItem)
+    ]
@@ -25,11 +25,17 @@ from qgis.core import (
     QgsLayoutItemRegistry
 )
 
-from qrbarcodeitem.extlibs import segno
 from qrbarcodeitem.layout.abstract_barcode import (
     AbstractBarcodeLayoutItem,
     BarcodeException
 )
+from qrbarcodeitem.layout.encoders import (
+    encode_qrcode_geometry,
+    encode_qrcode_svg,
+    EncodingError,
+    fit_qrcode,
+    plan_qrcode
+)
 from qrbarcodeitem.utils import (
     get_icon
 )
@@ -43,6 +49,10 @@ class QrCodeLayoutItem(AbstractBarcodeLayoutItem):
     _ATTR_MICRO = 'isMicro'
     _ATTR_BG_COLOR = 'codeBackgroundColor'
     _ATTR_DATA_COLOR = 'dataColor'
+    _ATTR_VERSION = 'qrVersion'
+    _ATTR_ERROR_LEVEL = 'errorLevel'
+    _ATTR_BOOST_ERROR = 'boostError'
+    _ATTR_MASK = 'mask'
     _DEF_BG_COLOR = '#FFFFFF'
     _DEF_DATA_COLOR = '#000000'
 
@@ -52,6 +62,11 @@ class QrCodeLayoutItem(AbstractBarcodeLayoutItem):
         self._bg_color = self._DEF_BG_COLOR
         self._data_color = self._DEF_DATA_COLOR
         self._scale = 10
+        # Version, error level and mask are automatically chosen if None
+        self._version = None
+        self._error_level = None
+        self._boost_error = True
+        self._mask = None
 
     @property
     def is_micro(self):
@@ -111,34 +126,170 @@ class QrCodeLayoutItem(AbstractBarcodeLayoutItem):
             self._data_color = clr
             self.update_item()
 
+    @property
+    def version(self):
+        """
+        :return: Returns the version of the QR code i.e. '1' to '40' for a
+        standard QR code or 'M1' to 'M4' for a micro QR code. None if the
+        minimal version for the value is used.
+        :rtype: str
+        """
+        return self._version
+
+    @version.setter
+    def version(self, version):
+        """
+        Sets a fixed version of the QR code so that all codes have the same
+        size irrespective of the length of their values.
+        :param version: Version of the QR code or None to use the minimal
+        version for the value.
+        :type version: str
+        """
+        if version is not None:
+            version = str(version).upper()
+        if self._version != version:
+            self._version = version
+            self.update_item()
+
+    @property
+    def error_level(self):
+        """
+        :return: Returns the error correction level i.e. 'L', 'M', 'Q' or
+        'H'. None if the lowest level is used, which is also the only level
+        supported by an M1 micro QR code.
+        :rtype: str
+        """
+        return self._error_level
+
+    @error_level.setter
+    def error_level(self, level):
+        """
+        Sets the error correction level of the QR code.
+        :param level: Error correction level or None for the lowest level.
+        :type level: str
+        """
+        if level is not None:
+            level = level.upper()
+        if self._error_level != level:
+            self._error_level = level
+            self.update_item()
+
+    @property
+    def boost_error(self):
+        """
+        :return: Returns True if the error correction level is increased
+        when the value still fits in the same version, else False.
+        :rtype: bool
+        """
+        return self._boost_error
+
+    @boost_error.setter
+    def boost_error(self, status):
+        """
+        Set True to increase the error correction level when the value still
+        fits in the same version, else False to use the specified level.
+        :param status: True to boost the error correction level.
+        :type status: bool
+        """
+        if self._boost_error != status:
+            self._boost_error = status
+            self.update_item()
+
+    @property
+    def mask(self):
+        """
+        :return: Returns the data mask pattern i.e. 0 to 7 for a standard QR
+        code or 0 to 3 for a micro QR code. None if the best pattern is
+        evaluated for each value.
+        :rtype: int
+        """
+        return self._mask
+
+    @mask.setter
+    def mask(self, mask):
+        """
+        Sets a fixed data mask pattern, this skips the evaluation of all the
+        patterns which accounts for most of the encoding time.
+        :param mask: Data mask pattern or None to evaluate the best pattern.
+        :type mask: int
+        """
+        if self._mask != mask:
+            self._mask = mask
+            self.update_item()
+
     def icon(self):
         """Return item's icon."""
         return get_icon('qrcode.svg')
 
-    def _gen_image(self, file_path):
-        """Generate QR Code based on the computed value."""
+    def render_options(self):
+        """
+        :return: Returns the options for generating the QR code.
+        :rtype: dict
+        """
+        return {
+            'micro': self._is_micro,
+            'version': self._version,
+            'error': self._error_level,
+            'boost_error': self._boost_error,
+            'mask': self._mask,
+            'dark': self._data_color,
+            'light': self._bg_color,
+            'scale': self._scale
+        }
+
+    def svg_encoder(self):
+        """
+        :return: Returns the function for encoding the QR code.
+        :rtype: callable
+        """
+        return encode_qrcode_svg
+
+    def geometry_encoder(self):
+        """
+        :return: Returns the function for encoding the QR code for
+        painting it directly.
+        :rtype: callable
+        """
+        return encode_qrcode_geometry
+
+    def capacity_plan(self, value=None):
+        """
+        Finds the minimal version of the QR code for the value without
+        encoding it e.g. for checking if the value fits.
+        :param value: Computed value of the barcode, it will be evaluated
+        from the code_value if not specified.
+        :type value: str
+        :return: Returns the minimal version, and remaining capacity, for
+        each error level and whether the value fits in a micro QR code.
+        :rtype: CapacityPlan
+        """
+        if value is None:
+            value = self.computed_value()
+
         try:
-            qr = segno.make(
-                self.computed_value(),
-                micro=self._is_micro
-            )
-            # Use options for compressing the output file
-            qr.save(
-                file_path,
-                scale=self._scale,
-                dark=self._data_color,
-                light=self._bg_color,
-                border=1,
-                xmldecl=False,
-                svgns=False,
-                nl=False
-            )
-        except segno.DataOverflowError as doe:
-            raise BarcodeException(
-                'Data too large, change to standard QR code.'
-            ) from doe
-        except ValueError as ve:
-            raise BarcodeException(str(ve)) from ve
+            return plan_qrcode(value, self.render_options())
+        except EncodingError as ee:
+            raise BarcodeException(str(ee)) from ee
+
+    def version_fit(self, value=None):
+        """
+        Finds the version and error level of the QR code that will be
+        generated for the value using the current options of the item,
+        without encoding the value.
+        :param value: Computed value of the barcode, it will be evaluated
+        from the code_value if not specified.
+        :type value: str
+        :return: Returns the version, error level and remaining capacity
+        or None if the value does not fit in the QR code.
+        :rtype: VersionFit
+        """
+        if value is None:
+            value = self.computed_value()
+
+        try:
+            return fit_qrcode(value, self.render_options())
+        except EncodingError as ee:
+            raise BarcodeException(str(ee)) from ee
 
     def type(self):
         """Return item's unique identifier."""
@@ -149,6 +300,13 @@ class QrCodeLayoutItem(AbstractBarcodeLayoutItem):
         el.setAttribute(self._ATTR_MICRO, str(self._is_micro))
         el.setAttribute(self._ATTR_BG_COLOR, str(self._bg_color))
         el.setAttribute(self._ATTR_DATA_COLOR, str(self._data_color))
+        el.setAttribute(self._ATTR_VERSION, self._version or '')
+        el.setAttribute(self._ATTR_ERROR_LEVEL, self._error_level or '')
+        el.setAttribute(self._ATTR_BOOST_ERROR, str(self._boost_error))
+        el.setAttribute(
+            self._ATTR_MASK,
+            '' if self._mask is None else str(self._mask)
+        )
 
         return True
 
@@ -163,6 +321,13 @@ class QrCodeLayoutItem(AbstractBarcodeLayoutItem):
         self._data_color = str(
             el.attribute(self._ATTR_DATA_COLOR, self._DEF_DATA_COLOR)
         )
+        self._version = el.attribute(self._ATTR_VERSION, '') or None
+        self._error_level = el.attribute(self._ATTR_ERROR_LEVEL, '') or None
+        self._boost_error = self._str_to_bool(
+            el.attribute(self._ATTR_BOOST_ERROR, 'True')
+        )
+        mask = el.attribute(self._ATTR_MASK, '')
+        self._mask = int(mask) if mask.isdigit() else None
         self.update_item()
 
         return True
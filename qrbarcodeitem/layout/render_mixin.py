@@ -0,0 +1,334 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+Name                 : BarcodeRenderMixin
+Description          : Encoding, caching and background rendering of the
+                       content of barcode layout items.
+Date                 : 17-10-2026
+copyright            : (C) 2026 by John Gitau
+email                : gkahiu@gmail.com
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 3 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+import base64
+
+from qgis.PyQt.QtCore import QCoreApplication
+from qgis.PyQt import sip
+from qgis.core import (
+    QgsApplication,
+    QgsLayoutItemPicture
+)
+
+from qrbarcodeitem.layout.barcode_painter import BarcodeShapeCache
+from qrbarcodeitem.layout.encode_task import BarcodeEncodeTask
+from qrbarcodeitem.layout.encoders import EncodingError
+from qrbarcodeitem.layout.svg_cache import (
+    SvgCache,
+    svg_cache_key
+)
+from qrbarcodeitem.layout.svg_tracker import SvgFileTracker
+
+
+class BarcodeRenderMixin:
+    """
+    Encodes the barcode of a layout item, in the current thread or in a
+    background task, and caches the resulting SVG content and shapes in
+    the process-wide caches. It is used by AbstractBarcodeLayoutItem which
+    sets the encoded content in the picture item.
+    """
+    # Pending background encoding and the number of the latest request
+    _encode_task = None
+    _encode_request = 0
+    # Pending background encoding of the shape of a designer preview and
+    # the key of the last shape that could not be encoded.
+    _shape_task = None
+    _shape_key = None
+    _shape_error_key = None
+
+    def render_options(self):
+        """
+        Options, in addition to the computed value, that determine the
+        content of the generated barcode. Used as part of the key for
+        caching the generated SVG content hence subclasses should include
+        all their render options.
+        :return: Returns the render options of the item.
+        :rtype: dict
+        """
+        return {}
+
+    def svg_encoder(self):
+        """
+        Function for encoding the barcode as an SVG document. It is called
+        with the computed value and render options and should raise an
+        EncodingError if the value cannot be encoded. It should be defined
+        at module level so that it can be used in worker processes.
+        Subclasses should implement this.
+        :return: Returns the encoding function.
+        :rtype: callable
+        """
+        raise NotImplementedError
+
+    def geometry_encoder(self):
+        """
+        Function for encoding the barcode as a BarcodeGeometry for painting
+        it directly. It is called with the computed value and render
+        options and should raise an EncodingError if the value cannot be
+        encoded. Subclasses should implement this.
+        :return: Returns the encoding function.
+        :rtype: callable
+        """
+        raise NotImplementedError
+
+    def render_key(self, value):
+        """
+        Computes the key of the SVG content for the given value based on
+        the current render options of the item.
+        :param value: Computed value of the barcode.
+        :type value: str
+        :return: Returns the content key of the barcode.
+        :rtype: str
+        """
+        return svg_cache_key(self.type(), value, self.render_options())
+
+    def cached_svg(self, key):
+        """
+        Gets previously generated SVG content from the process-wide cache.
+        :param key: Content key as computed by 'render_key'.
+        :type key: str
+        :return: Returns the SVG document if the item is rendered in
+        memory, else the path to the SVG file. None if there is no
+        corresponding entry in the cache.
+        :rtype: object
+        """
+        cache = SvgCache.instance()
+        if self._in_memory:
+            return cache.svg_data(key)
+
+        return cache.svg_path(key)
+
+    def is_cached(self, key):
+        """
+        Checks whether SVG content exists in the cache for the given key
+        without affecting the cache statistics.
+        :param key: Content key as computed by 'render_key'.
+        :type key: str
+        :return: Returns True if the content has already been cached.
+        :rtype: bool
+        """
+        return SvgCache.instance().has_entry(key, self._in_memory)
+
+    def cache_svg(self, key, svg_data):
+        """
+        Adds generated SVG content to the process-wide cache. The content
+        is written to a file in the temp dir if the item is not rendered in
+        memory.
+        :param key: Content key as computed by 'render_key'.
+        :type key: str
+        :param svg_data: Content of the SVG document.
+        :type svg_data: bytes
+        :return: Returns the SVG document if the item is rendered in
+        memory, else the path to the SVG file.
+        :rtype: object
+        """
+        cache = SvgCache.instance()
+        if self._in_memory:
+            cache.add_data(key, svg_data)
+            return svg_data
+
+        svg_path = self._gen_svg_path(key)
+        with open(svg_path, 'wb') as svg_file:
+            svg_file.write(svg_data)
+        # Add to the tracker first so that it is also evicted from there
+        SvgFileTracker.instance().add_file(svg_path, shared=True)
+        cache.add(key, svg_path)
+
+        return svg_path
+
+    def set_svg_data(self, svg_data):
+        """
+        Set the item picture from an in-memory SVG document.
+        :param svg_data: Content of the SVG document.
+        :type svg_data: bytes
+        """
+        b64_data = base64.b64encode(svg_data).decode('ascii')
+        self.setPicturePath(
+            f'base64:{b64_data}',
+            QgsLayoutItemPicture.FormatSVG
+        )
+
+    def cached_shape(self, key, value):
+        """
+        Gets the shape for painting the barcode directly from the
+        process-wide cache, it is generated and cached if it does not exist.
+        :param key: Content key as computed by 'render_key'.
+        :type key: str
+        :param value: Computed value of the barcode.
+        :type value: str
+        :return: Returns the shape of the barcode.
+        :rtype: BarcodeShape
+        """
+        cache = BarcodeShapeCache.instance()
+        shape = cache.shape(key)
+        if shape is None:
+            shape = cache.add(key, self.render_geometry(value))
+
+        return shape
+
+    def generate_code_async(self, value=None):
+        """
+        Encodes the barcode in a background task so that the GUI does not
+        block. A placeholder is shown while the task is running and the
+        barcode is set once it has finished. Pending tasks are cancelled,
+        and their results discarded, when a newer value is specified. The
+        barcode is set immediately if it has already been cached.
+        :param value: Computed value of the barcode, it will be evaluated
+        from the code_value if not specified.
+        :type value: str
+        """
+        if value is None:
+            value = self.computed_value()
+
+        is_painted = self.is_painted()
+        encoder = self.geometry_encoder() if is_painted \
+            else self.svg_encoder()
+        if not value:
+            self.generate_code(value)
+            return
+
+        key = self.render_key(value)
+        if key == self._render_key:
+            self.cancel_encoding()
+            return
+        if is_painted:
+            is_cached = key in BarcodeShapeCache.instance()
+        else:
+            is_cached = self.is_cached(key)
+        if is_cached:
+            self.generate_code(value)
+            return
+
+        self.cancel_encoding()
+        self._encode_request += 1
+        request = self._encode_request
+        self._encode_task = BarcodeEncodeTask(
+            QCoreApplication.translate(
+                'QrBarCodeLayoutItem',
+                'Encoding barcode'
+            ),
+            encoder,
+            value,
+            self.render_options(),
+            lambda task: self._on_encode_finished(request, key, task)
+        )
+        self.set_text_image(
+            QCoreApplication.translate('QrBarCodeLayoutItem', 'Encoding...')
+        )
+        QgsApplication.taskManager().addTask(self._encode_task)
+
+    def is_encoding(self):
+        """
+        :return: Returns True if the barcode is being encoded in a
+        background task.
+        :rtype: bool
+        """
+        return self._encode_task is not None
+
+    def cancel_encoding(self):
+        """
+        Cancels the pending background encoding, if any. Its result is
+        discarded even if the task has already finished.
+        """
+        if self._encode_task is None:
+            return
+
+        self._encode_request += 1
+        self._encode_task.cancel()
+        self._encode_task = None
+
+    def _on_encode_finished(self, request, key, task):
+        # Sets the barcode once the background encoding has finished,
+        # results of superseded requests and deleted items are discarded.
+        if sip.isdeleted(self) or request != self._encode_request:
+            return
+
+        self._encode_task = None
+        if task.error is not None or task.result is None:
+            self._set_encoding_error(
+                EncodingError(task.error or 'Encoding failed.')
+            )
+            return
+
+        if self.is_painted():
+            BarcodeShapeCache.instance().add(key, task.result)
+            self._set_shape(key, task.value)
+        else:
+            self._set_svg(key, task.value, self.cache_svg(key, task.result))
+        self.invalidateCache()
+
+    def _is_preview_render(self):
+        # True if the item is being rendered in the layout designer.
+        layout = self.layout()
+
+        return layout is not None and \
+            layout.renderContext().isPreviewRender()
+
+    def _preview_shape(self):
+        # Shape of the current SVG picture for repainting it in the
+        # designer without re-rendering the SVG document. The shape is not
+        # encoded while painting, if it has not been cached then it is
+        # encoded in the background and None is returned.
+        key = self._render_key
+        if key is None:
+            return None
+
+        shape = BarcodeShapeCache.instance().shape(key)
+        if shape is None and key != self._shape_error_key:
+            self._encode_shape_async(key, self._render_value)
+
+        return shape
+
+    def _encode_shape_async(self, key, value):
+        # Encodes the shape in a background task, the item is repainted
+        # once it has been added to the shape cache.
+        if self._shape_task is not None:
+            if self._shape_key == key:
+                return
+            self._shape_task.cancel()
+
+        self._shape_task = BarcodeEncodeTask(
+            QCoreApplication.translate(
+                'QrBarCodeLayoutItem',
+                'Encoding barcode preview'
+            ),
+            self.geometry_encoder(),
+            value,
+            self.render_options(),
+            lambda task: self._on_shape_finished(key, task)
+        )
+        self._shape_key = key
+        QgsApplication.taskManager().addTask(self._shape_task)
+
+    def _on_shape_finished(self, key, task):
+        # Adds the shape to the cache and repaints the item if it still
+        # shows the corresponding barcode.
+        if sip.isdeleted(self) or task is not self._shape_task:
+            return
+
+        self._shape_task = None
+        self._shape_key = None
+        if task.error is not None or task.result is None:
+            # Keep drawing the picture rather than retrying on each paint
+            self._shape_error_key = key
+            return
+
+        BarcodeShapeCache.instance().add(key, task.result)
+        if key == self._render_key:
+            self.update()
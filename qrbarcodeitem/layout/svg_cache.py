@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+Name                 : SvgCache
+Description          : Process-wide, content-addressed cache of the SVG
+                       content generated for barcode items.
+Date                 : 17-10-2026
+copyright            : (C) 2026 by John Gitau
+email                : gkahiu@gmail.com
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 3 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+import hashlib
+from collections import OrderedDict
+
+from qgis.PyQt.QtCore import (
+    QFile,
+    QFileInfo
+)
+
+from qrbarcodeitem.layout.svg_tracker import SvgFileTracker
+from qrbarcodeitem.utils import Singleton
+
+
+def svg_cache_key(item_type, value, options):
+    """
+    Computes the key of a generated barcode based on its content.
+    :param item_type: Unique type identifier of the layout item.
+    :type item_type: int
+    :param value: Computed value of the barcode.
+    :type value: str
+    :param options: Options used for rendering the barcode.
+    :type options: dict
+    :return: Returns a hex digest that uniquely identifies the SVG
+    content.
+    :rtype: str
+    """
+    opts = ';'.join(
+        f'{name}={options[name]!r}' for name in sorted(options)
+    )
+    content = f'{item_type}\x1f{value}\x1f{opts}'
+
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+@Singleton
+class SvgCache:
+    """
+    Maps content keys to already generated SVG files or in-memory SVG
+    documents so that barcodes with the same value and render options are
+    only encoded once. Least recently used entries are removed once either
+    the maximum number of entries or bytes is exceeded.
+    """
+    DEF_MAX_ENTRIES = 1000
+    DEF_MAX_BYTES = 64 * 1024 * 1024
+
+    def __init__(self):
+        # [key] = (file path, SVG bytes, size in bytes), either the file
+        # path or the SVG bytes will be None.
+        self._entries = OrderedDict()
+        self._size = 0
+        self._max_entries = self.DEF_MAX_ENTRIES
+        self._max_bytes = self.DEF_MAX_BYTES
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def max_entries(self):
+        """
+        :return: Returns the maximum number of entries in the cache.
+        :rtype: int
+        """
+        return self._max_entries
+
+    @max_entries.setter
+    def max_entries(self, count):
+        """
+        Sets the maximum number of entries in the cache and evicts the least
+        recently used entries if the limit is exceeded.
+        :param count: Maximum number of entries.
+        :type count: int
+        """
+        self._max_entries = count
+        self._evict()
+
+    @property
+    def max_bytes(self):
+        """
+        :return: Returns the maximum size, in bytes, of the cached files
+        and in-memory SVG documents.
+        :rtype: int
+        """
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, size):
+        """
+        Sets the maximum size of the cached content and evicts the least
+        recently used entries if the limit is exceeded.
+        :param size: Maximum size in bytes.
+        :type size: int
+        """
+        self._max_bytes = size
+        self._evict()
+
+    @property
+    def size(self):
+        """
+        :return: Returns the total size, in bytes, of the cached content.
+        :rtype: int
+        """
+        return self._size
+
+    def svg_path(self, key):
+        """
+        Gets the path of the SVG file corresponding to the given key.
+        :param key: Content key as computed by 'svg_cache_key'.
+        :type key: str
+        :return: Returns the path to the SVG file or None if there is no
+        file entry for the key or the file no longer exists.
+        :rtype: str
+        """
+        entry = self._entries.get(key, None)
+        if entry is not None and entry[0] is not None \
+                and not QFile.exists(entry[0]):
+            self._remove_entry(key, False)
+            entry = None
+
+        if entry is None or entry[0] is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+
+        return entry[0]
+
+    def svg_data(self, key):
+        """
+        Gets the in-memory SVG document corresponding to the given key.
+        :param key: Content key as computed by 'svg_cache_key'.
+        :type key: str
+        :return: Returns the SVG document or None if there is no in-memory
+        entry for the key.
+        :rtype: bytes
+        """
+        entry = self._entries.get(key, None)
+        if entry is None or entry[1] is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+
+        return entry[1]
+
+    def has_entry(self, key, in_memory=False):
+        """
+        Checks whether there is an entry for the given key without updating
+        the hit/miss counters or the order of use.
+        :param key: Content key as computed by 'svg_cache_key'.
+        :type key: str
+        :param in_memory: True to check for an in-memory SVG document, else
+        False to check for an SVG file.
+        :type in_memory: bool
+        :return: Returns True if there is a corresponding entry.
+        :rtype: bool
+        """
+        entry = self._entries.get(key, None)
+        if entry is None:
+            return False
+
+        if in_memory:
+            return entry[1] is not None
+
+        return entry[0] is not None and QFile.exists(entry[0])
+
+    def add(self, key, file_path):
+        """
+        Adds an SVG file to the cache.
+        :param key: Content key as computed by 'svg_cache_key'.
+        :type key: str
+        :param file_path: Path to the generated SVG file.
+        :type file_path: str
+        """
+        self._add_entry(key, file_path, None, QFileInfo(file_path).size())
+
+    def add_data(self, key, data):
+        """
+        Adds an in-memory SVG document to the cache.
+        :param key: Content key as computed by 'svg_cache_key'.
+        :type key: str
+        :param data: Generated SVG document.
+        :type data: bytes
+        """
+        self._add_entry(key, None, data, len(data))
+
+    def _add_entry(self, key, file_path, data, size):
+        # Add or replace an entry and evict if limits are exceeded.
+        if key in self._entries:
+            self._remove_entry(key, False)
+
+        self._entries[key] = (file_path, data, size)
+        self._size += size
+        self._evict()
+
+    def remove(self, key):
+        """
+        Removes the entry with the given key and deletes the SVG file, if
+        any. A file that is still shown by an item is deleted once it is no
+        longer shown.
+        :param key: Content key.
+        :type key: str
+        :return: Returns True if the entry existed, else False.
+        :rtype: bool
+        """
+        if key not in self._entries:
+            return False
+
+        self._remove_entry(key, True)
+
+        return True
+
+    def _remove_entry(self, key, delete_file):
+        # Remove entry and optionally delete the corresponding file. Files
+        # still shown by an item are only deleted by the tracker once they
+        # are no longer shown.
+        file_path, _, size = self._entries.pop(key)
+        self._size -= size
+        if delete_file and file_path is not None and \
+                not SvgFileTracker.instance().release_file(file_path) and \
+                QFile.exists(file_path):
+            QFile.remove(file_path)
+
+    def _evict(self):
+        # Remove least recently used entries until within limits.
+        while self._entries and (
+                len(self._entries) > self._max_entries or
+                self._size > self._max_bytes
+        ):
+            key = next(iter(self._entries))
+            self._remove_entry(key, True)
+
+    def clear(self):
+        """
+        Removes all entries and deletes the cached SVG files.
+        """
+        for key in list(self._entries):
+            self._remove_entry(key, True)
+
+    def reset_stats(self):
+        """Resets the hit and miss counters."""
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        """
+        :return: Returns the number of hits, misses, entries and bytes in
+        the cache.
+        :rtype: dict
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self._entries),
+            'bytes': self._size
+        }
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
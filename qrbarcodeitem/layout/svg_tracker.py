@@ -2,8 +2,10 @@
 """
 /***************************************************************************
 Name                 : SvgFileTracker
-Description          : Clears SVG files - used to render barcode items - in
-                       the temp directory when plugin is being unloaded.
+Description          : Bounded store of the SVG files - used to render
+                       barcode items - in the temp directory. Files are
+                       deleted when superseded, evicted by size and age and
+                       cleared when plugin is being unloaded.
 Date                 : 12-01-2021
 copyright            : (C) 2021 by John Gitau
 email                : gkahiu@gmail.com
@@ -18,18 +20,79 @@ email                : gkahiu@gmail.com
  *                                                                         *
  ***************************************************************************/
 """
-from qgis.PyQt.QtCore import QFile
+import os
+import uuid
+from collections import OrderedDict
+
+from qgis.PyQt.QtCore import (
+    QDateTime,
+    QDir,
+    QFile,
+    QFileInfo,
+    QStandardPaths
+)
 
 from qrbarcodeitem.utils import Singleton
 
 
+# Sub-directory of the SVG files generated by this process. The temp dir is
+# shared by QGIS sessions and export worker processes, which generate files
+# with the same content-based names.
+_SESSION_DIR = f'{os.getpid()}-{uuid.uuid4().hex}'
+
+
+def svg_temp_root():
+    """
+    :return: Returns the temp dir containing the sub-directories of the
+    SVG files generated by each process.
+    :rtype: str
+    """
+    temp_location = QStandardPaths.writableLocation(
+        QStandardPaths.StandardLocation.TempLocation
+    )
+
+    return f'{temp_location}/qrbarbarcode'
+
+
+def svg_temp_dir():
+    """
+    :return: Returns the temp dir where the generated SVG files of the
+    current process are saved.
+    :rtype: str
+    """
+    return f'{svg_temp_root()}/{_SESSION_DIR}'
+
+
+def _now():
+    # Current time in seconds since the epoch.
+    return QDateTime.currentSecsSinceEpoch()
+
+
 @Singleton
 class SvgFileTracker:
     """
     Used to track and delete SVG files used to render the barcode items.
+    Files are indexed by path in order of creation. A file that is no
+    longer shown by any item is deleted unless it is shared i.e. it may be
+    reused by other items through the SVG cache. The oldest files that are
+    not shown by any item are deleted once either the maximum number of
+    files, bytes or age is exceeded.
     """
+    DEF_MAX_FILES = 2000
+    DEF_MAX_BYTES = 128 * 1024 * 1024
+    DEF_MAX_AGE = 24 * 60 * 60
+
     def __init__(self):
-        self._files = []
+        # [file path] = (size in bytes, creation time, shared)
+        self._files = OrderedDict()
+        # [item id] = path of the file shown by the item
+        self._item_files = {}
+        # [file path] = number of items showing the file
+        self._file_users = {}
+        self._size = 0
+        self._max_files = self.DEF_MAX_FILES
+        self._max_bytes = self.DEF_MAX_BYTES
+        self._max_age = self.DEF_MAX_AGE
 
     @property
     def files(self):
@@ -38,22 +101,266 @@ class SvgFileTracker:
         deleted when plugin is being unloaded.
         :rtype: list
         """
-        return self._files
+        return list(self._files)
+
+    @property
+    def size(self):
+        """
+        :return: Returns the total size, in bytes, of the tracked files.
+        :rtype: int
+        """
+        return self._size
+
+    @property
+    def max_files(self):
+        """
+        :return: Returns the maximum number of tracked files.
+        :rtype: int
+        """
+        return self._max_files
+
+    @max_files.setter
+    def max_files(self, count):
+        """
+        Sets the maximum number of tracked files and deletes the oldest
+        files if the limit is exceeded.
+        :param count: Maximum number of files.
+        :type count: int
+        """
+        self._max_files = count
+        self.evict()
 
-    def add_file(self, file_path):
+    @property
+    def max_bytes(self):
+        """
+        :return: Returns the maximum size, in bytes, of the tracked files.
+        :rtype: int
+        """
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, size):
+        """
+        Sets the maximum size of the tracked files and deletes the oldest
+        files if the limit is exceeded.
+        :param size: Maximum size in bytes.
+        :type size: int
+        """
+        self._max_bytes = size
+        self.evict()
+
+    @property
+    def max_age(self):
+        """
+        :return: Returns the maximum age, in seconds, of the tracked files.
+        :rtype: int
+        """
+        return self._max_age
+
+    @max_age.setter
+    def max_age(self, seconds):
+        """
+        Sets the maximum age of the tracked files and deletes the files
+        that are older.
+        :param seconds: Maximum age in seconds.
+        :type seconds: int
+        """
+        self._max_age = seconds
+        self.evict()
+
+    def add_file(self, file_path, shared=False):
         """
         Add file path to the collection.
         :param file_path: Path to SVG file.
         :type file_path: str
+        :param shared: True if the file can be shown by several items e.g.
+        if it has been added to the SVG cache, such a file is not deleted
+        when it is no longer shown by an item.
+        :type shared: bool
+        """
+        if file_path in self._files:
+            self._size -= self._files.pop(file_path)[0]
+
+        size = QFileInfo(file_path).size()
+        self._files[file_path] = (size, _now(), shared)
+        self._size += size
+        self.evict()
+
+    def set_item_file(self, item_id, file_path):
+        """
+        Sets the file shown by an item. The file previously shown by the
+        item is deleted if it is no longer shown by any item and is not
+        shared.
+        :param item_id: Unique identifier of the item.
+        :type item_id: str
+        :param file_path: Path to the SVG file or None if the item no
+        longer shows a file.
+        :type file_path: str
+        """
+        previous_path = self._item_files.pop(item_id, None)
+        if previous_path == file_path:
+            if file_path is not None:
+                self._item_files[item_id] = file_path
+            return
+
+        if file_path is not None:
+            self._item_files[item_id] = file_path
+            self._file_users[file_path] = \
+                self._file_users.get(file_path, 0) + 1
+
+        if previous_path is None:
+            return
+
+        users = self._file_users.pop(previous_path) - 1
+        if users > 0:
+            self._file_users[previous_path] = users
+            return
+
+        entry = self._files.get(previous_path, None)
+        if entry is not None and not entry[2]:
+            self.remove_file(previous_path)
+
+    def is_in_use(self, file_path):
+        """
+        :param file_path: Path to SVG file.
+        :type file_path: str
+        :return: Returns True if the file is shown by an item.
+        :rtype: bool
+        """
+        return file_path in self._file_users
+
+    def remove_file(self, file_path):
+        """
+        Deletes a tracked file.
+        :param file_path: Path to SVG file.
+        :type file_path: str
+        :return: Returns True if the file was tracked, else False.
+        :rtype: bool
+        """
+        entry = self._files.pop(file_path, None)
+        if entry is None:
+            return False
+
+        self._size -= entry[0]
+        if QFile.exists(file_path):
+            QFile.remove(file_path)
+
+        return True
+
+    def release_file(self, file_path):
+        """
+        Marks a shared file as no longer shared e.g. when it has been
+        evicted from the SVG cache. The file is deleted if it is not shown
+        by any item, else once it is no longer shown by any item.
+        :param file_path: Path to SVG file.
+        :type file_path: str
+        :return: Returns True if the file is tracked, else False.
+        :rtype: bool
         """
-        if file_path not in self._files:
-            self._files.append(file_path)
+        entry = self._files.get(file_path, None)
+        if entry is None:
+            return False
+
+        if not self.is_in_use(file_path):
+            return self.remove_file(file_path)
+
+        self._files[file_path] = (entry[0], entry[1], False)
+
+        return True
+
+    def evict(self):
+        """
+        Deletes the oldest files, that are not shown by any item, until
+        the number, size and age of the tracked files are within limits.
+        :return: Returns the number of deleted files.
+        :rtype: int
+        """
+        count = 0
+        expiry_time = _now() - self._max_age
+        for file_path, (_, created, _) in list(self._files.items()):
+            within_limits = len(self._files) <= self._max_files and \
+                self._size <= self._max_bytes
+            if within_limits and created >= expiry_time:
+                break
+            if self.is_in_use(file_path):
+                continue
+
+            self.remove_file(file_path)
+            count += 1
+
+        return count
+
+    def sweep(self, dir_path=None, max_age=None):
+        """
+        Deletes untracked SVG files in the temp dir, and its
+        sub-directories, that are older than the given age e.g. those left
+        behind by sessions that did not exit cleanly. Recent files are kept
+        as they may belong to other running sessions. Sub-directories of
+        other sessions are removed once they are empty.
+        :param dir_path: Directory containing the SVG files, defaults to
+        the temp root of the barcode items.
+        :type dir_path: str
+        :param max_age: Minimum age, in seconds, of the deleted files.
+        Defaults to the maximum age of the tracked files.
+        :type max_age: int
+        :return: Returns the number of deleted files.
+        :rtype: int
+        """
+        if dir_path is None:
+            dir_path = svg_temp_root()
+        if max_age is None:
+            max_age = self._max_age
+
+        svg_dir = QDir(dir_path)
+        if not svg_dir.exists():
+            return 0
+
+        expiry_time = _now() - max_age
+        count = self._sweep_dir(svg_dir, expiry_time)
+        session_dir = QDir(svg_temp_dir()).absolutePath()
+        for dir_info in svg_dir.entryInfoList(
+                QDir.Filter.Dirs | QDir.Filter.NoDotAndDotDot
+        ):
+            sub_dir = QDir(dir_info.absoluteFilePath())
+            # Deleting the files updates the modification time of the dir
+            is_stale = sub_dir.absolutePath() != session_dir and \
+                dir_info.lastModified().toSecsSinceEpoch() < expiry_time
+            count += self._sweep_dir(sub_dir, expiry_time)
+            if is_stale:
+                # Only removed if empty
+                svg_dir.rmdir(dir_info.fileName())
+
+        return count
+
+    def _sweep_dir(self, svg_dir, expiry_time):
+        # Deletes the untracked SVG files in the directory that were last
+        # modified before the expiry time.
+        count = 0
+        for file_info in svg_dir.entryInfoList(['*.svg'], QDir.Filter.Files):
+            file_path = file_info.absoluteFilePath()
+            if file_path in self._files:
+                continue
+            if file_info.lastModified().toSecsSinceEpoch() >= expiry_time:
+                continue
+            if QFile.remove(file_path):
+                count += 1
+
+        return count
 
     def clean_up(self):
         """
         Deletes all the tracked SVG files. Usually called when the plugin is
         being unloaded.
         """
-        for sf in self._files:
-            if QFile.exists(sf):
-                QFile.remove(sf)
+        for sf in list(self._files):
+            self.remove_file(sf)
+        self._item_files.clear()
+        self._file_users.clear()
+        # Only removed if empty
+        QDir().rmdir(svg_temp_dir())
+
+    def __contains__(self, file_path):
+        return file_path in self._files
+
+    def __len__(self):
+        return len(self._files)
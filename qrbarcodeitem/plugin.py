@@ -29,6 +29,7 @@ from qgis.PyQt.QtCore import (
 from qrbarcodeitem.layout.registry import register_barcode_items
 from qrbarcodeitem.layout.linear_metadata import \
     register_linear_barcode_metadata
+from qrbarcodeitem.layout.svg_cache import SvgCache
 from qrbarcodeitem.layout.svg_tracker import SvgFileTracker
 from qrbarcodeitem.gui.registry import register_items_gui_metadata
 
@@ -87,6 +88,10 @@ class QRBarCodePluginLoader:
         # Register metadata for the different linear barcode types
         register_linear_barcode_metadata()
 
+        # Delete SVG files left behind by sessions that did not exit cleanly
+        SvgFileTracker.instance().sweep()
+
     def unload(self):
         """Clear SVG files in temp directory."""
+        SvgCache.instance().clear()
         SvgFileTracker.instance().clean_up()
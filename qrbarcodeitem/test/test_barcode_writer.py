@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+Name                 : Test barcode writer
+Description          : Unit tests for the compact SVG writer of linear
+                       barcodes
+Date                 : 17-10-2026
+copyright            : (C) 2026 by John Gitau
+email                : gkahiu@gmail.com
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 3 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+import io
+import re
+import unittest
+from xml.etree import ElementTree
+
+from qrbarcodeitem.extlibs import barcode
+from qrbarcodeitem.extlibs.barcode.writer import CompactSVGWriter
+
+_SVG_NS = '{http://www.w3.org/2000/svg}'
+_BAR_RX = re.compile(
+    r'M([\d.]+) ([\d.]+)h([\d.]+)v([\d.]+)h-([\d.]+)z'
+)
+
+
+def _render(writer, barcode_type='code128', value='Text <&> 123'):
+    # Returns the root element of the SVG document.
+    options = {
+        'quiet_zone': 1.5,
+        'font_size': 4,
+        'background': '#FFFFFF',
+        'foreground': '#000000'
+    }
+    buffer = io.BytesIO()
+    barcode.get(barcode_type, value, writer=writer).write(buffer, options)
+
+    return ElementTree.fromstring(buffer.getvalue())
+
+
+def _dark_bars(root):
+    # Returns the position and size of the bars in the default writer.
+    return [
+        tuple(
+            round(float(rect.get(attr)), 3)
+            for attr in ('x', 'y', 'width', 'height')
+        )
+        for rect in root.iter(_SVG_NS + 'rect')
+        if rect.get('style') == 'fill:#000000;'
+    ]
+
+
+class CompactSVGWriterTests(unittest.TestCase):
+    """Tests for CompactSVGWriter."""
+
+    def test_same_geometry(self):
+        """Test bars and text are similar to the default writer."""
+        for barcode_type, value in [
+            ('code128', 'Text <&> 123'),
+            ('ean13', '5901234123457'),
+            ('code39', 'ABC123')
+        ]:
+            default_root = _render(None, barcode_type, value)
+            compact_root = _render(CompactSVGWriter(), barcode_type, value)
+            self.assertEqual(compact_root.get('width'), default_root.get('width'))
+            self.assertEqual(compact_root.get('height'), default_root.get('height'))
+
+            paths = list(compact_root.iter(_SVG_NS + 'path'))
+            self.assertEqual(len(paths), 1)
+            bars = []
+            for match in _BAR_RX.finditer(paths[0].get('d')):
+                x, y, width, height, width_back = map(float, match.groups())
+                self.assertEqual(width, width_back)
+                bars.append((x, y, width, height))
+            self.assertEqual(bars, _dark_bars(default_root))
+
+            default_texts = [
+                t.text for t in default_root.iter(_SVG_NS + 'text')
+            ]
+            compact_texts = [
+                t.text for t in compact_root.iter(_SVG_NS + 'text')
+            ]
+            self.assertEqual(compact_texts, default_texts)
+
+
+if __name__ == '__main__':
+    unittest.main()
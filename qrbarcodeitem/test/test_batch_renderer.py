@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+Name                 : Test batch renderer
+Description          : Unit tests for generating barcodes in bulk
+Date                 : 17-10-2026
+copyright            : (C) 2026 by John Gitau
+email                : gkahiu@gmail.com
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 3 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+import unittest
+
+from qgis.core import (
+    QgsExpressionContextUtils,
+    QgsFeature,
+    QgsVectorLayer
+)
+
+from qrbarcodeitem.layout.batch_renderer import (
+    atlas_feature_values,
+    BarcodeBatchRenderer
+)
+from qrbarcodeitem.layout.encoders import (
+    encode_many,
+    encode_qrcode_svg,
+    supports_process_pool
+)
+from qrbarcodeitem.layout.qrcode_item import QrCodeLayoutItem
+from qrbarcodeitem.layout.svg_cache import SvgCache
+from qrbarcodeitem.test.utilities import (
+    create_layout
+)
+
+
+class BarcodeBatchRendererTests(unittest.TestCase):
+    """Tests for BarcodeBatchRenderer."""
+
+    def setUp(self) -> None:
+        """Clear the SVG cache."""
+        self._cache = SvgCache.instance()
+        self._cache.clear()
+        self._cache.reset_stats()
+
+    def tearDown(self) -> None:
+        """Remove cached content."""
+        self._cache.clear()
+
+    def test_render(self):
+        """Test rendering of values in order and errors."""
+        layout = create_layout('Test Batch Render')
+        item = QrCodeLayoutItem(layout)
+        item.is_micro = True
+        renderer = BarcodeBatchRenderer(item)
+        values = ['A1', 'B2', 'X' * 100]
+        results = renderer.render(values)
+        self.assertEqual([r.value for r in results], values)
+        self.assertEqual(results[0].svg_data, item.render_svg('A1'))
+        self.assertIsNone(results[0].error)
+        # Value is too large for a micro QR code
+        self.assertIsNone(results[2].svg_data)
+        self.assertIsNotNone(results[2].error)
+        self.assertEqual(len(self._cache), 2)
+
+    def test_atlas_values(self):
+        """Test values are evaluated for each atlas feature."""
+        layer = QgsVectorLayer(
+            'None?field=name:string&field=code:string',
+            'codes',
+            'memory'
+        )
+        features = []
+        for code in ('A1', 'B2', 'C3'):
+            feature = QgsFeature(layer.fields())
+            feature.setAttributes(['Name', code])
+            features.append(feature)
+        layer.dataProvider().addFeatures(features)
+
+        layout = create_layout('Test Batch Atlas Values')
+        layout.atlas().setCoverageLayer(layer)
+        layout.atlas().setEnabled(True)
+        item = QrCodeLayoutItem(layout)
+        item.code_value = '[% "code" %]-[% @atlas_featureid %]'
+        self.assertEqual(
+            [value for _, value in atlas_feature_values(item)],
+            [
+                f'{feature["code"]}-{feature.id()}'
+                for feature in layer.getFeatures()
+            ]
+        )
+
+        # Filter using a layout variable, sort order and page names
+        QgsExpressionContextUtils.setLayoutVariable(layout, 'skip', 'B2')
+        atlas = layout.atlas()
+        atlas.setFilterFeatures(True)
+        atlas.setFilterExpression('"code" <> @skip')
+        atlas.setSortFeatures(True)
+        atlas.setSortAscending(False)
+        atlas.setSortExpression('"code"')
+        atlas.setPageNameExpression('lower("code")')
+        item.code_value = '[% @atlas_featurenumber %]-[% @atlas_pagename %]'
+        self.assertEqual(
+            [value for _, value in atlas_feature_values(item)],
+            ['1-c3', '2-a1']
+        )
+
+    def test_prewarm(self):
+        """Test items reuse the pre-rendered content."""
+        layout = create_layout('Test Batch Prewarm')
+        item = QrCodeLayoutItem(layout)
+        renderer = BarcodeBatchRenderer(item)
+        count = renderer.prewarm(['A1', 'B2', 'A1', ''])
+        self.assertEqual(count, 2)
+        self.assertEqual(renderer.prewarm(['A1']), 0)
+
+        item.code_value = 'B2'
+        self.assertEqual(self._cache.hits, 1)
+        self.assertEqual(self._cache.misses, 0)
+
+    def test_prewarm_workers(self):
+        """Test values are encoded in spawned worker processes."""
+        # Workers are spawned as forking the QGIS application is not safe
+        self.assertTrue(supports_process_pool())
+        layout = create_layout('Test Batch Prewarm Workers')
+        item = QrCodeLayoutItem(layout)
+        renderer = BarcodeBatchRenderer(item)
+        values = [f'Value {i}' for i in range(20)]
+        count = renderer.prewarm(values, workers=2)
+        self.assertEqual(count, 20)
+        for value in values:
+            key = item.render_key(value)
+            self.assertEqual(item.cached_svg(key), item.render_svg(value))
+
+    def test_encode_many(self):
+        """Test worker results are in order and include errors."""
+        values = ['A1', 'X' * 100, 'B2']
+        options = {'micro': True, 'scale': 10}
+        results = list(encode_many(encode_qrcode_svg, values, options, 2))
+        self.assertEqual([value for value, _, _ in results], values)
+        self.assertEqual(
+            results[0][1],
+            encode_qrcode_svg('A1', options)
+        )
+        self.assertIsNone(results[1][1])
+        self.assertIsNotNone(results[1][2])
+        self.assertIsNotNone(results[2][1])
+
+
+if __name__ == '__main__':
+    unittest.main()
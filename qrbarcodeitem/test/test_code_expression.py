@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+Name                 : Test compiled code value
+Description          : Unit tests for the compiled code value expressions
+Date                 : 17-10-2026
+copyright            : (C) 2026 by John Gitau
+email                : gkahiu@gmail.com
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 3 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+import unittest
+
+from qgis.PyQt.QtCore import QVariant
+from qgis.core import (
+    QgsExpression,
+    QgsExpressionContext,
+    QgsExpressionContextScope,
+    QgsFeature,
+    QgsField,
+    QgsFields
+)
+
+from qrbarcodeitem.layout.code_expression import CompiledCodeValue
+
+
+class CompiledCodeValueTests(unittest.TestCase):
+    """Tests for CompiledCodeValue."""
+
+    def setUp(self) -> None:
+        """Create expression context with custom variables."""
+        scope = QgsExpressionContextScope()
+        scope.setVariable('code', 'ABC')
+        scope.setVariable('num', 12)
+        self._ctx = QgsExpressionContext()
+        self._ctx.appendScope(scope)
+
+    def test_static_value(self):
+        """Test text without expressions."""
+        compiled = CompiledCodeValue('QR Code 2020')
+        self.assertTrue(compiled.is_static())
+        self.assertEqual(compiled.evaluate(self._ctx), 'QR Code 2020')
+
+    def test_matches_replace_expression_text(self):
+        """Test result is similar to QgsExpression.replaceExpressionText."""
+        texts = [
+            '[% @code %]',
+            'ID: [% @code %]-[%@num * 2%] end',
+            '[% 1.5 + 1 %][% NULL %]',
+            'Bad [% 1 + %] and [% @code %]',
+            'Eval error [% 1/to_int(\'x\') %]',
+            'Unclosed [% @code',
+            '[%\n@code\n%]'
+        ]
+        for text in texts:
+            compiled = CompiledCodeValue(text)
+            self.assertEqual(
+                compiled.evaluate(self._ctx),
+                QgsExpression.replaceExpressionText(text, self._ctx),
+                text
+            )
+
+    def test_field_order(self):
+        """Test field references are resolved for each layer's fields."""
+        def feature_context(names, values):
+            # Context with a feature whose fields are in the given order
+            fields = QgsFields()
+            for name in names:
+                fields.append(QgsField(name, QVariant.String))
+            feature = QgsFeature(fields)
+            feature.setAttributes(values)
+            ctx = QgsExpressionContext()
+            ctx.setFields(fields)
+            ctx.setFeature(feature)
+
+            return ctx
+
+        compiled = CompiledCodeValue('[% "code" %]-[% "name" %]')
+        first_ctx = feature_context(['code', 'name'], ['A1', 'First'])
+        second_ctx = feature_context(['name', 'code'], ['Second', 'B2'])
+        self.assertEqual(compiled.evaluate(first_ctx), 'A1-First')
+        self.assertEqual(compiled.evaluate(second_ctx), 'B2-Second')
+        self.assertEqual(compiled.evaluate(first_ctx), 'A1-First')
+
+    def test_atlas_features(self):
+        """Test static atlas variables are not cached across features."""
+        fields = QgsFields()
+        fields.append(QgsField('code', QVariant.String))
+
+        def atlas_context(fid, code):
+            # Context with static atlas variables, as in the layout scope
+            feature = QgsFeature(fields, fid)
+            feature.setAttributes([code])
+            scope = QgsExpressionContextScope('Atlas')
+            for name, value in (
+                    ('atlas_feature', feature),
+                    ('atlas_featureid', fid)
+            ):
+                scope.addVariable(
+                    QgsExpressionContextScope.StaticVariable(
+                        name,
+                        value,
+                        True,
+                        True
+                    )
+                )
+            ctx = QgsExpressionContext()
+            ctx.appendScope(scope)
+            ctx.setFields(fields)
+            ctx.setFeature(feature)
+
+            return ctx
+
+        compiled = CompiledCodeValue(
+            '[% @atlas_featureid %]-'
+            '[% attribute(@atlas_feature, \'code\') %]'
+        )
+        self.assertEqual(compiled.evaluate(atlas_context(1, 'A1')), '1-A1')
+        self.assertEqual(compiled.evaluate(atlas_context(2, 'B2')), '2-B2')
+
+
+if __name__ == '__main__':
+    unittest.main()
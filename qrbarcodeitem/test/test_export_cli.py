@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+Name                 : Test export CLI
+Description          : Unit tests for the headless layout export tool
+Date                 : 17-10-2026
+copyright            : (C) 2026 by John Gitau
+email                : gkahiu@gmail.com
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 3 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+import os
+import tempfile
+import unittest
+
+from qgis.PyQt.QtCore import QRectF
+from qgis.core import (
+    QgsFeature,
+    QgsProject,
+    QgsVectorLayer
+)
+
+from qrbarcodeitem.export_cli import (
+    export_atlas,
+    export_layout,
+    ExportOptions,
+    parse_args,
+    split_range
+)
+from qrbarcodeitem.layout.qrcode_item import QrCodeLayoutItem
+from qrbarcodeitem.test.utilities import (
+    create_layout
+)
+
+
+class ExportCliTests(unittest.TestCase):
+    """Tests for the export command-line tool."""
+
+    def test_split_range(self):
+        """Test atlas features are split into contiguous ranges."""
+        self.assertEqual(
+            split_range(10, 3),
+            [(0, 4), (4, 7), (7, 10)]
+        )
+        # No empty ranges if there are more workers than features
+        self.assertEqual(split_range(2, 4), [(0, 1), (1, 2)])
+        self.assertEqual(split_range(5, 1), [(0, 5)])
+
+    def test_parse_args(self):
+        """Test default and explicit arguments."""
+        args = parse_args(['project.qgz', '--layout', 'Labels'])
+        self.assertEqual(args.format, 'pdf')
+        self.assertEqual(args.workers, 1)
+        self.assertFalse(args.atlas)
+        self.assertFalse(args.preflight)
+        self.assertIsNone(args.render_mode)
+
+        args = parse_args([
+            'project.qgz', '--layout', 'Labels', '--atlas', '--format',
+            'png', '--workers', '0', '--render-mode', 'painter',
+            '--preflight'
+        ])
+        self.assertTrue(args.atlas)
+        self.assertEqual(args.format, 'png')
+        self.assertGreaterEqual(args.workers, 1)
+        self.assertEqual(args.render_mode, 'painter')
+        self.assertTrue(args.preflight)
+
+        args = parse_args(
+            ['project.qgz', '--layout', 'Labels', '--atlas', '--prewarm']
+        )
+        self.assertTrue(args.prewarm)
+        # Prewarming is only supported with a single worker
+        with self.assertRaises(SystemExit):
+            parse_args([
+                'project.qgz', '--layout', 'Labels', '--atlas', '--prewarm',
+                '--workers', '2'
+            ])
+
+    def test_export_atlas(self):
+        """Test feature ranges of the workers export every page once."""
+        layer = QgsVectorLayer(
+            'None?field=code:string',
+            'export_codes',
+            'memory'
+        )
+        features = []
+        for i in range(5):
+            feature = QgsFeature(layer.fields())
+            feature.setAttributes([f'CODE-{i}'])
+            features.append(feature)
+        layer.dataProvider().addFeatures(features)
+        QgsProject.instance().addMapLayer(layer)
+        self.addCleanup(QgsProject.instance().removeMapLayer, layer.id())
+
+        layout = create_layout('Test Export Atlas')
+        item = QrCodeLayoutItem(layout)
+        item.attemptSetSceneRect(QRectF(20, 20, 50, 50))
+        item.code_value = '[% "code" %]'
+        layout.addLayoutItem(item)
+        atlas = layout.atlas()
+        atlas.setCoverageLayer(layer)
+        atlas.setEnabled(True)
+        atlas.setFilenameExpression("'page_' || @atlas_featurenumber")
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            layout_timings = export_layout(
+                layout,
+                ExportOptions(output_dir, 'svg', None)
+            )
+            self.assertEqual([t.status for t in layout_timings], ['ok'])
+            self.assertTrue(os.path.exists(layout_timings[0].path))
+
+            atlas_dir = os.path.join(output_dir, 'atlas')
+            os.makedirs(atlas_dir)
+            options = ExportOptions(atlas_dir, 'svg', None)
+            timings = []
+            for start, end in split_range(5, 2):
+                timings.extend(export_atlas(layout, options, start, end))
+            self.assertEqual(sorted(t.page for t in timings), [1, 2, 3, 4, 5])
+            self.assertTrue(all(t.status == 'ok' for t in timings))
+            self.assertEqual(
+                sorted(os.listdir(atlas_dir)),
+                [f'page_{i}.svg' for i in range(1, 6)]
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
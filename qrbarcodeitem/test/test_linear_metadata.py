@@ -21,6 +21,10 @@ import unittest
 
 
 from qrbarcodeitem.layout.linear_metadata import (
+    AbstractLinearBarcodeMetadata,
+    CharacterValidator,
+    Code39Metadata,
+    Ean8Metadata,
     LinearBarcodeMetadataRegistry,
     register_linear_barcode_metadata
 )
@@ -47,6 +51,40 @@ class LinearBarcodeMetadataTests(unittest.TestCase):
         registry.clear()
         self.assertEqual(len(registry), 0)
 
+    def test_character_validator(self):
+        # Test whole strings are validated and sanitized
+        validator = Code39Metadata().validator()
+        self.assertTrue(validator.is_valid('CODE 39'))
+        result = validator.validate('Co*de-39')
+        self.assertEqual(result.sanitized, 'C-39')
+        self.assertEqual(result.invalid_positions, [1, 2, 3, 4])
+        self.assertTrue(validator.is_allowed('$'))
+        self.assertFalse(validator.is_allowed('a'))
+
+        # Only ASCII digits are allowed in EAN
+        ean_meta = Ean8Metadata()
+        self.assertEqual(ean_meta.validator().sanitize('12\u00b23a4'), '1234')
+        self.assertFalse(ean_meta.is_character_allowed('\u0663'))
+        self.assertTrue(ean_meta.restricts_characters())
+
+        # No restriction
+        self.assertEqual(CharacterValidator().validate('abc'), ('abc', []))
+        self.assertEqual(CharacterValidator('').sanitize('abc'), '')
+
+    def test_predicate_validator(self):
+        # Test metadata that only overrides is_character_allowed
+        class VowelMetadata(AbstractLinearBarcodeMetadata):
+            """Allows vowels only."""
+            def is_character_allowed(self, data_char):
+                return data_char in 'aeiou'
+
+        self.assertFalse(VowelMetadata().restricts_characters())
+        validator = VowelMetadata().validator()
+        self.assertEqual(
+            validator.validate('bead'),
+            ('ea', [0, 3])
+        )
+
 
 if __name__ == '__main__':
     suite = unittest.makeSuite(LinearBarcodeMetadataTests)
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+Name                 : Test preflight
+Description          : Unit tests for validating atlas values of barcode
+                       items before exporting.
+Date                 : 17-10-2026
+copyright            : (C) 2026 by John Gitau
+email                : gkahiu@gmail.com
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 3 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+import unittest
+
+from qgis.core import (
+    QgsFeature,
+    QgsVectorLayer
+)
+
+from qrbarcodeitem.layout.linear_barcode_item import LinearBarcodeLayoutItem
+from qrbarcodeitem.layout.linear_metadata import (
+    Code39Metadata,
+    Ean13Metadata,
+    register_linear_barcode_metadata
+)
+from qrbarcodeitem.layout.preflight import (
+    iter_preflight,
+    preflight_item,
+    validate_linear_value
+)
+from qrbarcodeitem.test.utilities import (
+    create_layout
+)
+
+
+class PreflightTests(unittest.TestCase):
+    """Tests for preflight validation of barcode values."""
+
+    def setUp(self) -> None:
+        """Register linear barcode metadata."""
+        register_linear_barcode_metadata()
+
+    def test_validate_linear_value(self):
+        """Test characters, length and check digit rules."""
+        ean_meta = Ean13Metadata()
+        self.assertEqual(validate_linear_value(ean_meta, '590123412345')[0], [])
+        # Correct check digit is allowed
+        self.assertEqual(
+            validate_linear_value(ean_meta, '5901234123457')[0],
+            []
+        )
+        errors, _ = validate_linear_value(ean_meta, '5901234123450')
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(len(validate_linear_value(ean_meta, '59012')[0]), 1)
+        self.assertEqual(
+            len(validate_linear_value(ean_meta, '59012341234567')[0]),
+            1
+        )
+
+        errors, positions = validate_linear_value(Code39Metadata(), 'AB-c1')
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(positions, [3])
+        self.assertEqual(len(validate_linear_value(Code39Metadata(), '')[0]), 1)
+
+    def test_preflight_atlas(self):
+        """Test values are validated for each atlas feature."""
+        layer = QgsVectorLayer(
+            'None?field=code:string&field=name:string',
+            'codes',
+            'memory'
+        )
+        features = []
+        for code in ('590123412345', '5901234', '400638133393'):
+            feature = QgsFeature(layer.fields())
+            feature.setAttributes([code, 'Name'])
+            features.append(feature)
+        layer.dataProvider().addFeatures(features)
+
+        layout = create_layout('Test Preflight Atlas')
+        layout.atlas().setCoverageLayer(layer)
+        layout.atlas().setEnabled(True)
+        item = LinearBarcodeLayoutItem(layout)
+        item.barcode_type = 'ean13'
+        item.code_value = '[% "code" %]'
+
+        failures = list(iter_preflight(item))
+        self.assertEqual(len(failures), 1)
+        self.assertEqual(failures[0].value, '5901234')
+
+        report = preflight_item(item)
+        self.assertEqual(report.count, 3)
+        self.assertEqual(report.failure_count, 1)
+        self.assertFalse(report.is_valid())
+
+        report = preflight_item(item, max_failures=0)
+        self.assertEqual(report.failure_count, 1)
+        self.assertEqual(report.failures, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -17,22 +17,40 @@ email                : gkahiu@gmail.com
  *                                                                         *
  ***************************************************************************/
 """
+import time
 import unittest
 
 from qgis.core import (
     QgsApplication,
     QgsReadWriteContext
 )
-from qgis.PyQt.QtCore import QRectF
+from qgis.PyQt.QtCore import (
+    QCoreApplication,
+    QRectF
+)
 from qgis.PyQt.QtXml import (
     QDomDocument
 )
+from qgis.PyQt import sip
 
+from qrbarcodeitem.layout.abstract_barcode import (
+    RENDER_MODE_PAINTER,
+    RENDER_MODE_SVG
+)
+from qrbarcodeitem.layout.barcode_painter import BarcodeShapeCache
+from qrbarcodeitem.layout.encode_task import BarcodeEncodeTask
+from qrbarcodeitem.layout.encoders import (
+    _make_qrcode,
+    EncodingError,
+    qrcode_designator
+)
 from qrbarcodeitem.layout.qrcode_item import (
     QR_CODE_TYPE,
     QrCodeLayoutItem
 )
 from qrbarcodeitem.layout.registry import register_barcode_items
+from qrbarcodeitem.layout.svg_cache import SvgCache
+from qrbarcodeitem.layout.svg_tracker import SvgFileTracker
 from qrbarcodeitem.test.utilities import (
     create_layout
 )
@@ -66,6 +84,10 @@ class QRCodeItemTests(unittest.TestCase):
         self.assertFalse(item.is_micro)
         self.assertEqual(item.bg_color, '#FFFFFF')
         self.assertEqual(item.data_color, '#000000')
+        self.assertIsNone(item.version)
+        self.assertIsNone(item.error_level)
+        self.assertTrue(item.boost_error)
+        self.assertIsNone(item.mask)
 
     def test_read_write(self):
         """Test read/write of custom properties from/to XML."""
@@ -80,6 +102,10 @@ class QRCodeItemTests(unittest.TestCase):
         item.is_micro = is_micro
         item.bg_color = bg_color
         item.data_color = data_color
+        item.version = 'm3'
+        item.error_level = 'M'
+        item.boost_error = False
+        item.mask = 2
 
         # Test write
         status = item.writeXml(el, doc, QgsReadWriteContext())
@@ -96,6 +122,185 @@ class QRCodeItemTests(unittest.TestCase):
         self.assertEqual(read_item.is_micro, is_micro)
         self.assertEqual(read_item.bg_color, bg_color)
         self.assertEqual(read_item.data_color, data_color)
+        self.assertEqual(read_item.version, 'M3')
+        self.assertEqual(read_item.error_level, 'M')
+        self.assertFalse(read_item.boost_error)
+        self.assertEqual(read_item.mask, 2)
+
+    def test_refresh_unchanged_value(self):
+        """Test refresh is a no-op if the evaluated value is unchanged."""
+        layout = create_layout('Test QR Code Item Refresh')
+        item = QrCodeLayoutItem(layout)
+        item.code_value = 'QR Code Refresh'
+        picture_path = item.picturePath()
+        cache = SvgCache.instance()
+        stats = cache.stats()
+        item.refresh()
+        item.refreshPicture()
+        self.assertEqual(item.picturePath(), picture_path)
+        self.assertEqual(cache.stats(), stats)
+
+        # Changing a render option regenerates the code
+        item.data_color = '#B20EC2'
+        self.assertNotEqual(item.picturePath(), picture_path)
+
+    def test_removed_item_files(self):
+        """Test files of removed and deleted items are no longer in use."""
+        layout = create_layout('Test QR Code Item Removed')
+        item = QrCodeLayoutItem(layout)
+        item.in_memory = False
+        item.code_value = 'QR Code Removed'
+        layout.addLayoutItem(item)
+        tracker = SvgFileTracker.instance()
+        path = item.picturePath()
+        self.assertTrue(tracker.is_in_use(path))
+
+        layout.removeItem(item)
+        self.assertFalse(tracker.is_in_use(path))
+        layout.addItem(item)
+        self.assertTrue(tracker.is_in_use(path))
+
+        sip.delete(item)
+        self.assertFalse(tracker.is_in_use(path))
+
+    def test_batched_update(self):
+        """Test the code is generated once when several properties change."""
+        layout = create_layout('Test QR Code Item Batched Update')
+        item = QrCodeLayoutItem(layout)
+        item.code_value = 'QR Code Batch'
+        picture_path = item.picturePath()
+        item.begin_update()
+        item.is_micro = True
+        item.version = 'M4'
+        self.assertEqual(item.picturePath(), picture_path)
+        item.end_update()
+        self.assertNotEqual(item.picturePath(), picture_path)
+        self.assertTrue(item.is_cached(item.render_key('QR Code Batch')))
+
+    def test_painter_mode(self):
+        """Test barcode is painted directly without an SVG picture."""
+        layout = create_layout('Test QR Code Item Painter')
+        item = QrCodeLayoutItem(layout)
+        self.assertEqual(item.render_mode, RENDER_MODE_SVG)
+        item.render_mode = RENDER_MODE_PAINTER
+        item.code_value = 'QR Code Painter'
+        self.assertTrue(item.is_painted())
+        self.assertEqual(item.picturePath(), '')
+        key = item.render_key('QR Code Painter')
+        self.assertIn(key, BarcodeShapeCache.instance())
+        shape = item.cached_shape(key, 'QR Code Painter')
+        self.assertIs(item.cached_shape(key, 'QR Code Painter'), shape)
+        self.assertFalse(shape.path.isEmpty())
+
+        # Switching back generates the SVG picture
+        item.render_mode = RENDER_MODE_SVG
+        self.assertFalse(item.is_painted())
+        self.assertNotEqual(item.picturePath(), '')
+        with self.assertRaises(ValueError):
+            item.render_mode = 'raster'
+
+        # Render mode is persisted
+        item.render_mode = RENDER_MODE_PAINTER
+        doc = QDomDocument('QRCodeProperties')
+        el = doc.createElement('Items')
+        self.assertTrue(item.writeXml(el, doc, QgsReadWriteContext()))
+        read_item = QrCodeLayoutItem(create_layout('Test XML read'))
+        read_item.readXml(
+            el.firstChildElement(),
+            doc,
+            QgsReadWriteContext()
+        )
+        self.assertEqual(read_item.render_mode, RENDER_MODE_PAINTER)
+
+    def test_capacity_plan(self):
+        """Test version is found without encoding the value."""
+        layout = create_layout('Test QR Code Item Capacity')
+        item = QrCodeLayoutItem(layout)
+        item.is_micro = True
+        self.assertEqual(qrcode_designator(item.version_fit('12345')), 'M1')
+        self.assertIsNone(item.version_fit('X' * 100))
+
+        item.is_micro = False
+        plan = item.capacity_plan('X' * 100)
+        self.assertFalse(plan.micro)
+        fit = plan.levels[None]
+        self.assertEqual(qrcode_designator(fit), '4-L')
+        self.assertEqual(fit.remaining, fit.capacity - fit.bit_length)
+
+    def test_fixed_encoding_options(self):
+        """Test codes use the fixed version, error level and mask."""
+        layout = create_layout('Test QR Code Item Fixed Options')
+        item = QrCodeLayoutItem(layout)
+        item.version = 10
+        item.error_level = 'Q'
+        item.boost_error = False
+        item.mask = 5
+        options = item.render_options()
+        for value in ('A1', 'QR Code 2020' * 5):
+            qr = _make_qrcode(value, options)
+            self.assertEqual(qr.designator, '10-Q')
+            self.assertEqual(qr.mask, 5)
+            self.assertEqual(
+                qrcode_designator(item.version_fit(value)),
+                '10-Q'
+            )
+
+        # Value does not fit in the fixed version
+        item.version = 1
+        self.assertIsNone(item.version_fit('X' * 100))
+        with self.assertRaises(EncodingError):
+            _make_qrcode('X' * 100, item.render_options())
+
+        # Render options are part of the content key
+        key = item.render_key('A1')
+        item.mask = None
+        self.assertNotEqual(item.render_key('A1'), key)
+
+    def test_background_encoding(self):
+        """Test stale background requests are dropped."""
+        layout = create_layout('Test QR Code Item Background')
+        item = QrCodeLayoutItem(layout)
+        item.set_code_value('QR Code Stale', background=True)
+        self.assertTrue(item.is_encoding())
+        item.set_code_value('QR Code Latest', background=True)
+
+        timeout = time.time() + 10
+        while item.is_encoding() and time.time() < timeout:
+            QCoreApplication.processEvents()
+        self.assertFalse(item.is_encoding())
+        self.assertTrue(item.is_cached(item.render_key('QR Code Latest')))
+        self.assertFalse(item.is_cached(item.render_key('QR Code Stale')))
+
+        # Cached values are set immediately
+        item.set_code_value('QR Code Stale')
+        item.set_code_value('QR Code Latest', background=True)
+        self.assertFalse(item.is_encoding())
+
+    def test_preview_shape(self):
+        """Test designer preview shapes are encoded in the background."""
+        layout = create_layout('Test QR Code Item Preview')
+        item = QrCodeLayoutItem(layout)
+        item.code_value = 'QR Code Preview'
+        key = item.render_key('QR Code Preview')
+        BarcodeShapeCache.instance().clear()
+        self.assertIsNone(item._preview_shape())
+        self.assertNotIn(key, BarcodeShapeCache.instance())
+
+        timeout = time.time() + 10
+        while key not in BarcodeShapeCache.instance() and \
+                time.time() < timeout:
+            QCoreApplication.processEvents()
+        self.assertIsNotNone(item._preview_shape())
+
+    def test_encode_task_errors(self):
+        """Test encoder exceptions are reported through the task error."""
+        def failing_encoder(value, options):
+            raise KeyError(value)
+
+        task = BarcodeEncodeTask('Encode', failing_encoder, 'QR', {}, None)
+        self.assertFalse(task.run())
+        self.assertIsNone(task.result)
+        self.assertIn('KeyError', task.error)
 
     def test_qrcode_render(self):
         """Test rendering of QR code in layout and compare image."""
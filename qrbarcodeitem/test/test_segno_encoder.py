@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+Name                 : Test segno encoder
+Description          : Unit tests for the optimizations in the vendored
+                       segno encoder
+Date                 : 17-10-2026
+copyright            : (C) 2026 by John Gitau
+email                : gkahiu@gmail.com
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 3 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+import io
+import random
+import threading
+import unittest
+
+from qrbarcodeitem.extlibs import segno
+from qrbarcodeitem.extlibs.segno import (
+    consts,
+    encoder,
+    utils
+)
+
+
+def _random_values(count, seed=2020):
+    # Returns reproducible values of varying length.
+    rnd = random.Random(seed)
+    chars = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 abc-./'
+
+    return [
+        ''.join(rnd.choice(chars) for _ in range(rnd.randint(1, 300)))
+        for _ in range(count)
+    ]
+
+
+class SegnoEncoderTests(unittest.TestCase):
+    """Tests for the segno encoder."""
+
+    def setUp(self) -> None:
+        """Keep the current engine setting."""
+        self._use_numpy = encoder.USE_NUMPY
+
+    def tearDown(self) -> None:
+        """Restore the engine setting."""
+        encoder.USE_NUMPY = self._use_numpy
+
+    def _encode(self, value, use_numpy, **kwargs):
+        # Encodes the value using the given mask evaluation engine.
+        encoder.USE_NUMPY = use_numpy
+        qr = segno.make(value, micro=False, **kwargs)
+
+        return qr.mask, [bytes(row) for row in qr.matrix]
+
+    def test_version_template(self):
+        """Test template masks are similar to applying the mask functions."""
+        for version in (consts.VERSION_M2, 1, 7, 40):
+            template = encoder.get_version_template(version)
+            self.assertIs(template, encoder.get_version_template(version))
+            is_micro = version < 1
+            size = len(template.matrix)
+            mask_functions = encoder.get_data_mask_functions(is_micro)
+            for mask_function, mask_rows in zip(
+                    mask_functions, template.masks
+            ):
+                matrix = [bytearray(size) for _ in range(size)]
+                encoder.apply_mask(
+                    matrix,
+                    mask_function,
+                    size,
+                    lambda i, j: template.matrix[i][j] > 0x1
+                )
+                self.assertEqual(
+                    [int.from_bytes(row, 'big') for row in matrix],
+                    list(mask_rows)
+                )
+
+    def test_codeword_placement(self):
+        """Test placement order covers each module of the encoding region."""
+        for version in (consts.VERSION_M1, consts.VERSION_M3, 1, 40):
+            template = encoder.get_version_template(version)
+            size = len(template.matrix)
+            region = [
+                i * size + j
+                for i, row in enumerate(template.matrix)
+                for j, module in enumerate(row) if module == 0x2
+            ]
+            self.assertEqual(sorted(template.placement), region)
+
+    def test_code_cache(self):
+        """Test memoized codes are similar to uncached ones."""
+        encoder.clear_code_cache()
+        qr = segno.make_cached('QR Code 2020', micro=False)
+        self.assertIs(
+            segno.make_cached('QR Code 2020', micro=False).matrix,
+            qr.matrix
+        )
+        uncached = segno.make('QR Code 2020', micro=False)
+        self.assertEqual([bytes(row) for row in uncached.matrix],
+                         list(qr.matrix))
+        self.assertEqual(uncached.mask, qr.mask)
+        # Different parameters are not served from the cache
+        self.assertIsNot(
+            segno.make_cached('QR Code 2020', micro=False, error='H').matrix,
+            qr.matrix
+        )
+
+    def test_code_cache_threads(self):
+        """Test the cache can be used from several threads."""
+        encoder.clear_code_cache()
+        cache_size = encoder.CODE_CACHE_SIZE
+        # Small cache so that entries are evicted while being looked up
+        encoder.CODE_CACHE_SIZE = 4
+        values = _random_values(12, seed=21)
+        errors = []
+
+        def encode_values():
+            try:
+                for _ in range(20):
+                    for value in values:
+                        segno.make_cached(value, micro=False)
+            except Exception as ex:  # pylint: disable=broad-except
+                errors.append(ex)
+
+        threads = [threading.Thread(target=encode_values) for _ in range(4)]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            encoder.CODE_CACHE_SIZE = cache_size
+            encoder.clear_code_cache()
+        self.assertEqual(errors, [])
+
+    def test_capacity_plan(self):
+        """Test planned versions are similar to those of encoded codes."""
+        errors = {
+            consts.ERROR_LEVEL_L: 'L',
+            consts.ERROR_LEVEL_M: 'M',
+            consts.ERROR_LEVEL_Q: 'Q',
+            consts.ERROR_LEVEL_H: 'H'
+        }
+        for value in _random_values(20) + ['1', 'A' * 1500]:
+            for micro in (None, False):
+                plan = segno.plan_capacity(value, micro=micro)
+                for error, name in errors.items():
+                    fit = plan.levels[error]
+                    try:
+                        qr = segno.make(
+                            value,
+                            error=name,
+                            micro=micro,
+                            boost_error=False
+                        )
+                    except segno.DataOverflowError:
+                        self.assertIsNone(fit)
+                        continue
+                    self.assertEqual(
+                        encoder.get_version_name(fit.version),
+                        qr.version
+                    )
+                    self.assertEqual(
+                        fit.remaining,
+                        fit.capacity - fit.bit_length
+                    )
+                    self.assertGreaterEqual(fit.remaining, 0)
+
+        self.assertTrue(segno.plan_capacity('12345').micro)
+        self.assertFalse(segno.plan_capacity('A' * 100).micro)
+        self.assertIsNone(
+            segno.plan_capacity('9' * 7090).levels[consts.ERROR_LEVEL_L]
+        )
+
+    def test_buffer(self):
+        """Test packed bit buffer."""
+        buff = encoder.Buffer([1, 0, 1])
+        buff.append_bits(0x3c, 6)
+        buff.append_bytes(b'\x81')
+        self.assertEqual(len(buff), 17)
+        self.assertEqual(
+            list(buff.getbits()),
+            [1, 0, 1, 1, 1, 1, 1, 0, 0, 1, 0, 0, 0, 0, 0, 0, 1]
+        )
+        # Last integer is padded with zeros
+        self.assertEqual(list(buff.toints()), [0xbe, 0x40, 0x80])
+        merged = buff + encoder.Buffer([1, 1])
+        self.assertEqual(len(merged), 19)
+        self.assertEqual(len(buff), 17)
+        self.assertEqual(merged[-3:], bytearray([1, 1, 1]))
+
+    def test_error_correction(self):
+        """Test error correction codewords of the ISO/IEC 18004 example."""
+        buff = encoder.Buffer()
+        for codeword in (16, 32, 12, 86, 97, 128, 236, 17,
+                         236, 17, 236, 17, 236, 17, 236, 17):
+            buff.append_bits(codeword, 8)
+        data_blocks, error_blocks = encoder.make_blocks(
+            consts.ECC[1][consts.ERROR_LEVEL_M],
+            buff
+        )
+        self.assertEqual(list(data_blocks[0]), list(buff.toints()))
+        self.assertEqual(
+            list(error_blocks[0]),
+            [165, 36, 212, 193, 237, 54, 199, 135, 44, 85]
+        )
+
+    def test_svg_output(self):
+        """Test streamed SVG output of a two-color code."""
+        qr = segno.make('1234', micro=True)
+        buffer = io.BytesIO()
+        qr.save(
+            buffer,
+            kind='svg',
+            dark='#000000',
+            light='#FFFFFF',
+            border=1,
+            xmldecl=False,
+            svgns=False,
+            nl=False
+        )
+        self.assertEqual(
+            buffer.getvalue(),
+            b'<svg width="13" height="13" class="segno"><path fill="#fff" '
+            b'd="M0 0h13v13h-13z"/><path class="qrline" stroke="#000" '
+            b'd="M1 1.5h7m1 0h1m1 0h1m-11 1h1m5 0h1m1 0h1m-9 1h1m1 0h3m1 '
+            b'0h1m1 0h3m-11 1h1m1 0h3m1 0h1m-7 1h1m1 0h3m1 0h1m1 0h3m-11 '
+            b'1h1m5 0h1m2 0h2m-11 1h7m1 0h1m0 1h2m-11 1h2m2 0h3m2 0h2m-10 '
+            b'1h1m5 0h1m2 0h1m-11 1h5m2 0h1m1 0h2"/></svg>'
+        )
+
+    def test_module_types(self):
+        """Test module types of the verbose iterator."""
+        qr = segno.make('Hello', micro=False, version=7)
+        rows = list(utils.matrix_iter_verbose(qr.matrix, qr.version, border=1))
+        self.assertEqual(len(rows), 47)
+        self.assertTrue(all(t == consts.TYPE_QUIET_ZONE for t in rows[0]))
+        self.assertEqual(rows[1][1], consts.TYPE_FINDER_PATTERN_DARK)
+        self.assertEqual(rows[8][1], consts.TYPE_SEPARATOR)
+        self.assertEqual(rows[-9][9], consts.TYPE_DARKMODULE)
+        # Module types are computed once for each version and border
+        self.assertIs(
+            utils._get_module_types(qr.version, 1),
+            utils._get_module_types(qr.version, 1)
+        )
+        dark_types = {
+            consts.TYPE_DATA_DARK,
+            consts.TYPE_TIMING_DARK,
+            consts.TYPE_FORMAT_DARK,
+            consts.TYPE_VERSION_DARK,
+            consts.TYPE_FINDER_PATTERN_DARK,
+            consts.TYPE_ALIGNMENT_PATTERN_DARK,
+            consts.TYPE_DARKMODULE
+        }
+        for row, bits in zip(rows[1:-1], qr.matrix):
+            self.assertEqual(
+                [int(t in dark_types) for t in row[1:-1]],
+                list(bits)
+            )
+
+    @unittest.skipIf(encoder._np is None, 'NumPy is not installed')
+    def test_numpy_mask_choice(self):
+        """Test NumPy engine chooses the same mask as the pure engine."""
+        for value in _random_values(60):
+            self.assertEqual(
+                self._encode(value, True),
+                self._encode(value, False),
+                value
+            )
+        for version in (1, 7, 20, 40):
+            self.assertEqual(
+                self._encode('QR Code 2020', True, version=version),
+                self._encode('QR Code 2020', False, version=version)
+            )
+
+    @unittest.skipIf(encoder._np is None, 'NumPy is not installed')
+    def test_numpy_mask_scores(self):
+        """Test NumPy penalty scores, including overlapping patterns."""
+        np = encoder._np
+        rnd = random.Random(2020)
+        size = 25
+        pattern = (1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1)
+        for _ in range(20):
+            matrix = [
+                bytearray(rnd.randint(0, 1) for _ in range(size))
+                for _ in range(size)
+            ]
+            pos = rnd.randint(0, size - len(pattern))
+            matrix[0][pos:pos + len(pattern)] = bytearray(pattern)
+            candidates = np.frombuffer(
+                b''.join(matrix), dtype=np.uint8
+            ).reshape(1, size, size)
+            self.assertEqual(
+                encoder._np_mask_scores(candidates)[0],
+                encoder.mask_scores(matrix, size)
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
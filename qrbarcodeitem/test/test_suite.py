@@ -23,6 +23,14 @@ import sys
 from qrbarcodeitem.test.test_qrcode_item import QRCodeItemTests
 from qrbarcodeitem.test.test_linear_barcode_item import LinearBarcodeItemTests
 from qrbarcodeitem.test.test_linear_metadata import LinearBarcodeMetadataTests
+from qrbarcodeitem.test.test_svg_cache import SvgCacheTests
+from qrbarcodeitem.test.test_code_expression import CompiledCodeValueTests
+from qrbarcodeitem.test.test_batch_renderer import BarcodeBatchRendererTests
+from qrbarcodeitem.test.test_segno_encoder import SegnoEncoderTests
+from qrbarcodeitem.test.test_barcode_writer import CompactSVGWriterTests
+from qrbarcodeitem.test.test_svg_tracker import SvgFileTrackerTests
+from qrbarcodeitem.test.test_export_cli import ExportCliTests
+from qrbarcodeitem.test.test_preflight import PreflightTests
 
 
 def run_all():
@@ -31,6 +39,14 @@ def run_all():
     suite.addTests(unittest.makeSuite(QRCodeItemTests))
     suite.addTests(unittest.makeSuite(LinearBarcodeItemTests))
     suite.addTests(unittest.makeSuite(LinearBarcodeMetadataTests))
+    suite.addTests(unittest.makeSuite(SvgCacheTests))
+    suite.addTests(unittest.makeSuite(CompiledCodeValueTests))
+    suite.addTests(unittest.makeSuite(BarcodeBatchRendererTests))
+    suite.addTests(unittest.makeSuite(SegnoEncoderTests))
+    suite.addTests(unittest.makeSuite(CompactSVGWriterTests))
+    suite.addTests(unittest.makeSuite(SvgFileTrackerTests))
+    suite.addTests(unittest.makeSuite(ExportCliTests))
+    suite.addTests(unittest.makeSuite(PreflightTests))
 
     runner = unittest.TextTestRunner(verbosity=2, stream=sys.stdout)
     runner.run(suite)
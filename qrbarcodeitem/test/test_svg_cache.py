@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+Name                 : Test SVG cache
+Description          : Unit tests for the content-addressed SVG cache
+Date                 : 17-10-2026
+copyright            : (C) 2026 by John Gitau
+email                : gkahiu@gmail.com
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 3 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+import os
+import tempfile
+import unittest
+
+from qrbarcodeitem.layout.svg_cache import (
+    SvgCache,
+    svg_cache_key
+)
+from qrbarcodeitem.layout.svg_tracker import SvgFileTracker
+
+
+class SvgCacheTests(unittest.TestCase):
+    """Tests for the SVG cache."""
+
+    def setUp(self) -> None:
+        """Create temp dir for the SVG files."""
+        self._temp_dir = tempfile.mkdtemp()
+        self._cache = SvgCache.instance()
+        self._cache.clear()
+        self._cache.reset_stats()
+        self._cache.max_entries = self._cache.DEF_MAX_ENTRIES
+        self._cache.max_bytes = self._cache.DEF_MAX_BYTES
+
+    def tearDown(self) -> None:
+        """Remove cached files."""
+        self._cache.clear()
+
+    def _create_file(self, name, size=10):
+        # Creates a file with the given number of bytes.
+        path = os.path.join(self._temp_dir, f'{name}.svg')
+        with open(path, 'wb') as f:
+            f.write(b'0' * size)
+
+        return path
+
+    def test_cache_key(self):
+        """Test key is independent of option order but not values."""
+        key = svg_cache_key(1, 'A', {'dark': '#000', 'micro': False})
+        self.assertEqual(
+            key,
+            svg_cache_key(1, 'A', {'micro': False, 'dark': '#000'})
+        )
+        self.assertNotEqual(
+            key,
+            svg_cache_key(1, 'A', {'micro': True, 'dark': '#000'})
+        )
+        self.assertNotEqual(
+            key,
+            svg_cache_key(2, 'A', {'micro': False, 'dark': '#000'})
+        )
+
+    def test_hits_and_misses(self):
+        """Test hit/miss counters."""
+        self.assertIsNone(self._cache.svg_path('a'))
+        path = self._create_file('a')
+        self._cache.add('a', path)
+        self.assertEqual(self._cache.svg_path('a'), path)
+        stats = self._cache.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['entries'], 1)
+        self.assertEqual(stats['bytes'], 10)
+
+        # Deleted files are treated as a miss
+        os.remove(path)
+        self.assertIsNone(self._cache.svg_path('a'))
+        self.assertEqual(len(self._cache), 0)
+
+    def test_in_memory_entries(self):
+        """Test caching of in-memory SVG documents."""
+        self._cache.add_data('a', b'<svg/>')
+        self.assertEqual(self._cache.svg_data('a'), b'<svg/>')
+        # No file has been cached for the key
+        self.assertIsNone(self._cache.svg_path('a'))
+        self.assertEqual(self._cache.size, 6)
+
+    def test_lru_eviction(self):
+        """Test least recently used files are evicted."""
+        self._cache.max_entries = 2
+        path_a = self._create_file('a')
+        path_b = self._create_file('b')
+        path_c = self._create_file('c')
+        self._cache.add('a', path_a)
+        self._cache.add('b', path_b)
+        # Make 'b' the least recently used entry
+        self._cache.svg_path('a')
+        self._cache.add('c', path_c)
+        self.assertNotIn('b', self._cache)
+        self.assertFalse(os.path.exists(path_b))
+        self.assertIn('a', self._cache)
+
+        # Evict by size
+        self._cache.max_bytes = 15
+        self.assertEqual(len(self._cache), 1)
+        self.assertIn('c', self._cache)
+
+    def test_eviction_of_shown_files(self):
+        """Test files shown by an item are deleted once released."""
+        tracker = SvgFileTracker.instance()
+        path_a = self._create_file('a')
+        path_b = self._create_file('b')
+        for key, path in (('a', path_a), ('b', path_b)):
+            tracker.add_file(path, shared=True)
+            self._cache.add(key, path)
+        tracker.set_item_file('item', path_a)
+
+        self._cache.max_entries = 0
+        self.assertEqual(len(self._cache), 0)
+        self.assertTrue(os.path.exists(path_a))
+        self.assertFalse(os.path.exists(path_b))
+
+        # Deleted once the item no longer shows it
+        tracker.set_item_file('item', None)
+        self.assertFalse(os.path.exists(path_a))
+        self.assertNotIn(path_a, tracker)
+
+
+if __name__ == '__main__':
+    unittest.main()
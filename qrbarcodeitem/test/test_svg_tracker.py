@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+Name                 : Test SVG file tracker
+Description          : Unit tests for the bounded store of SVG files
+Date                 : 17-10-2026
+copyright            : (C) 2026 by John Gitau
+email                : gkahiu@gmail.com
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 3 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+import os
+import tempfile
+import time
+import unittest
+
+from qrbarcodeitem.layout.svg_tracker import (
+    SvgFileTracker,
+    svg_temp_dir,
+    svg_temp_root
+)
+
+
+class SvgFileTrackerTests(unittest.TestCase):
+    """Tests for SvgFileTracker."""
+
+    def setUp(self) -> None:
+        """Create temp dir for the SVG files."""
+        self._temp_dir = tempfile.mkdtemp()
+        self._tracker = SvgFileTracker.instance()
+        self._tracker.clean_up()
+        self._tracker.max_files = self._tracker.DEF_MAX_FILES
+        self._tracker.max_bytes = self._tracker.DEF_MAX_BYTES
+        self._tracker.max_age = self._tracker.DEF_MAX_AGE
+
+    def tearDown(self) -> None:
+        """Remove tracked files."""
+        self._tracker.clean_up()
+
+    def _create_file(self, name, size=10, dir_name=''):
+        # Creates a file with the given number of bytes.
+        dir_path = os.path.join(self._temp_dir, dir_name)
+        os.makedirs(dir_path, exist_ok=True)
+        path = os.path.join(dir_path, f'{name}.svg')
+        with open(path, 'wb') as f:
+            f.write(b'0' * size)
+
+        return path
+
+    def test_superseded_files(self):
+        """Test files no longer shown by an item are deleted."""
+        path_a = self._create_file('a')
+        path_b = self._create_file('b')
+        path_c = self._create_file('c')
+        self._tracker.add_file(path_a)
+        self._tracker.add_file(path_b)
+        self._tracker.add_file(path_c, shared=True)
+        self.assertEqual(self._tracker.size, 30)
+
+        self._tracker.set_item_file('item1', path_a)
+        self._tracker.set_item_file('item2', path_a)
+        self._tracker.set_item_file('item1', path_b)
+        # Still shown by item2
+        self.assertTrue(os.path.exists(path_a))
+        self._tracker.set_item_file('item2', None)
+        self.assertFalse(os.path.exists(path_a))
+        self.assertNotIn(path_a, self._tracker)
+
+        # Shared files are kept for reuse
+        self._tracker.set_item_file('item1', path_c)
+        self.assertFalse(os.path.exists(path_b))
+        self._tracker.set_item_file('item1', None)
+        self.assertTrue(os.path.exists(path_c))
+        self.assertEqual(self._tracker.files, [path_c])
+
+    def test_eviction(self):
+        """Test oldest files not in use are evicted."""
+        paths = [self._create_file(name) for name in 'abc']
+        for path in paths:
+            self._tracker.add_file(path, shared=True)
+        self._tracker.set_item_file('item1', paths[0])
+        self._tracker.max_files = 2
+        # Oldest file is in use so the next one is deleted
+        self.assertEqual(self._tracker.files, [paths[0], paths[2]])
+        self.assertFalse(os.path.exists(paths[1]))
+
+        self._tracker.max_bytes = 10
+        self.assertEqual(self._tracker.files, [paths[0]])
+
+        self._tracker.set_item_file('item1', None)
+        self._tracker.max_age = -1
+        self.assertEqual(len(self._tracker), 0)
+        self.assertFalse(os.path.exists(paths[0]))
+
+    def test_sweep(self):
+        """Test stale untracked files are deleted."""
+        stale_path = self._create_file('stale')
+        old_time = time.time() - 2 * self._tracker.DEF_MAX_AGE
+        os.utime(stale_path, (old_time, old_time))
+        recent_path = self._create_file('recent')
+        tracked_path = self._create_file('tracked')
+        os.utime(tracked_path, (old_time, old_time))
+        self._tracker.add_file(tracked_path)
+
+        self.assertEqual(self._tracker.sweep(self._temp_dir), 1)
+        self.assertFalse(os.path.exists(stale_path))
+        self.assertTrue(os.path.exists(recent_path))
+        self.assertTrue(os.path.exists(tracked_path))
+
+    def test_sweep_sessions(self):
+        """Test stale files of other sessions are deleted."""
+        self.assertEqual(
+            os.path.dirname(svg_temp_dir()),
+            svg_temp_root()
+        )
+        old_time = time.time() - 2 * self._tracker.DEF_MAX_AGE
+        stale_path = self._create_file('a', dir_name='stale')
+        os.utime(stale_path, (old_time, old_time))
+        stale_dir = os.path.dirname(stale_path)
+        os.utime(stale_dir, (old_time, old_time))
+        recent_path = self._create_file('a', dir_name='recent')
+
+        self.assertEqual(self._tracker.sweep(self._temp_dir), 1)
+        self.assertFalse(os.path.exists(stale_dir))
+        self.assertTrue(os.path.exists(recent_path))
+
+
+if __name__ == '__main__':
+    unittest.main()